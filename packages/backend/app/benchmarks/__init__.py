@@ -0,0 +1 @@
+"""Package contains modules for benchmarking the backend."""
@@ -0,0 +1,248 @@
+"""Cold-start benchmark of the backend process, checked against a time budget.
+
+Run it from the backend directory, on the target hardware:
+
+    python -m app.benchmarks.cold_start --runs 3
+
+Every run measures, in a fresh interpreter, the import time of `app.main`,
+then starts uvicorn and measures the time to the first `/health` answer, to
+the first `/ready` answer and to the first rendered label. The medians are
+compared with the budget, and the exit code is 1 if any of them exceeds it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+from app.services.warmup.warmup import WARMUP_LABELS
+
+BACKEND_DIR = Path(__file__).parents[2]
+
+# Budget in seconds, sized for the Raspberry Pi 2 the labels are printed from.
+COLD_START_BUDGET = {
+    "import": 3.0,
+    "health": 5.0,
+    "ready": 10.0,
+    "first_label": 10.0,
+}
+
+POLL_INTERVAL_SECONDS = 0.02
+STARTUP_TIMEOUT_SECONDS = 60
+
+IMPORT_SNIPPET = (
+    "import sys, time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start); "
+    "print(int(any(name.split('.')[0] in {'fpdf', 'fontTools', 'PIL'} "
+    "for name in sys.modules)))"
+)
+
+
+def measure_import() -> tuple[float, bool]:
+    """Measure the import time of the application in a fresh interpreter.
+
+    Returns
+    -------
+        tuple[float, bool]: The import time, in seconds, and whether the
+            rendering dependencies were imported along with the application.
+
+    """
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    import_time, renderer_imported = completed.stdout.split()
+
+    return float(import_time), renderer_imported == "1"
+
+
+def _get_free_port() -> int:
+    """Get a free TCP port on the loopback interface.
+
+    Returns
+    -------
+        int: The port number.
+
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _request(
+    url: str,
+    payload: dict[str, Any] | None = None,
+) -> int | None:
+    """Send a request to the backend.
+
+    Args:
+    ----
+        url (str): The URL of the endpoint.
+        payload (dict[str, Any] | None, optional): The JSON body. If None, a
+            GET request is sent. Defaults to None.
+
+    Returns:
+    -------
+        int | None: The status code, or None if the server is not listening yet.
+
+    """
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(  # noqa: S310
+        url,
+        data=data,
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=STARTUP_TIMEOUT_SECONDS) as res:  # noqa: S310
+            return int(res.status)
+    except urllib.error.HTTPError as error:
+        return error.code
+    except OSError:
+        return None
+
+
+def _wait_for(
+    url: str,
+    start: float,
+    payload: dict[str, Any] | None = None,
+) -> float:
+    """Poll an endpoint until it answers with a success status.
+
+    Args:
+    ----
+        url (str): The URL of the endpoint.
+        start (float): The `perf_counter` time the server was started at.
+        payload (dict[str, Any] | None, optional): The JSON body. If None, a
+            GET request is sent. Defaults to None.
+
+    Raises:
+    ------
+        TimeoutError: If the endpoint does not succeed within the timeout.
+
+    Returns:
+    -------
+        float: The time elapsed since the server was started, in seconds.
+
+    """
+    while time.perf_counter() - start < STARTUP_TIMEOUT_SECONDS:
+        status = _request(url, payload)
+        if status is not None and status < 400:  # noqa: PLR2004
+            return time.perf_counter() - start
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+    error_message = f"{url} did not succeed within {STARTUP_TIMEOUT_SECONDS}s."
+    raise TimeoutError(error_message)
+
+
+def measure_startup() -> dict[str, float]:
+    """Start uvicorn and measure the time to the first answers.
+
+    Labels are written to a temporary directory, which is removed afterwards.
+
+    Returns
+    -------
+        dict[str, float]: The time to the first `/health`, `/ready` and
+            rendered label, in seconds.
+
+    """
+    port = _get_free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        env = {**os.environ, "FREEDOM_LABEL_PDF_OUTPUT_DIR": output_dir}
+        start = time.perf_counter()
+        server = subprocess.Popen(  # noqa: S603
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--port",
+                str(port),
+                "--log-level",
+                "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            health = _wait_for(f"{base_url}/health", start)
+            first_label = _wait_for(
+                f"{base_url}/label/create",
+                start,
+                payload=WARMUP_LABELS[0],
+            )
+            ready = _wait_for(f"{base_url}/ready", start)
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {"health": health, "ready": ready, "first_label": first_label}
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the cold-start benchmark and compare it with the budget.
+
+    Args:
+    ----
+        argv (list[str] | None, optional): The command line arguments.
+            Defaults to None.
+
+    Returns:
+    -------
+        int: The exit code, 1 if the budget is exceeded.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Amount of runs.")
+    for name, budget in COLD_START_BUDGET.items():
+        parser.add_argument(
+            f"--budget-{name.replace('_', '-')}",
+            dest=f"budget_{name}",
+            type=float,
+            default=budget,
+            help=f"Budget of the {name} time, in seconds.",
+        )
+    args = parser.parse_args(argv)
+
+    samples: dict[str, list[float]] = {name: [] for name in COLD_START_BUDGET}
+    renderer_imported = False
+    for _ in range(args.runs):
+        import_time, imported = measure_import()
+        renderer_imported |= imported
+        samples["import"].append(import_time)
+        for name, value in measure_startup().items():
+            samples[name].append(value)
+
+    over_budget = renderer_imported
+    for name, values in samples.items():
+        median = statistics.median(values)
+        budget = getattr(args, f"budget_{name}")
+        status = "ok" if median <= budget else "OVER BUDGET"
+        over_budget |= median > budget
+        print(f"{name:<12} {median:7.3f}s  budget {budget:6.2f}s  {status}")  # noqa: T201
+
+    if renderer_imported:
+        print("app.main imports the rendering dependencies eagerly")  # noqa: T201
+
+    return int(over_budget)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,427 @@
+"""Load test of a running backend, with synthetic prescriptions.
+
+Run it against the target, e.g. a Raspberry Pi serving on port 8000:
+
+    python -m app.benchmarks.load_test --url http://pi:8000 --out run.json
+
+Every request sends a random label, single or double lens, with or without
+the toric values and the batch, and names and descriptions up to their
+maximum length. Requests go to `/label/create` and to `/label/create-print`
+with `debug=no-print`, either from a fixed amount of clients sending their
+next request once answered (`--concurrency`), or at an open-loop arrival
+rate (`--rate`) whatever the latency. The throughput, the p50/p95/p99
+latency and the error rate of every endpoint are printed, and written to
+the output file along with the parameters of the run, for comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+# Paths of the endpoints driven by the load test.
+ENDPOINTS = {
+    "create": "/label/create",
+    "create-print": "/label/create-print?debug=no-print",
+}
+
+REQUEST_TIMEOUT_SECONDS = 60.0
+
+# Time given to the requests in flight to complete once the run is over.
+DRAIN_TIMEOUT_SECONDS = 60.0
+
+# Maximum lengths of the texts, as validated by `LabelData`.
+MAX_NAME_LENGTH = 30
+MAX_DESCRIPTION_LENGTH = 24
+MAX_BATCH_LENGTH = 7
+
+# Share of the labels with texts of extreme length, the widest to lay out.
+EDGE_LENGTH_RATE = 0.2
+
+NAMES = ("Anna", "Marco", "Giulia", "Luca", "Francesca", "Alessandro", "Bo")
+SURNAMES = ("Rossi", "Bianchi", "Esposito", "Colombo", "Dell'Acqua", "De Luca")
+DESCRIPTIONS = (
+    "Lente sclerale",
+    "Scleral lens F2mid",
+    "Lente morbida mensile",
+    "Ortho-K notturna",
+    "RGP toric",
+    "",
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def _edge_text(rng: random.Random, max_length: int) -> str:
+    """Get a text of the maximum length, of wide letters or of mixed ones."""
+    letters = rng.choice(("WM", "Wàéìòù", "abcdefghij"))
+
+    return "".join(rng.choice(letters) for _ in range(max_length))
+
+
+def _decimal(rng: random.Random, low: float, high: float, signed: bool) -> str:
+    """Get a value with two decimals in steps of 0.25, as written on a label."""
+    value = round(rng.uniform(low, high) * 4) / 4
+
+    return f"{value:+.2f}" if signed else f"{value:.2f}"
+
+
+def generate_lens(rng: random.Random) -> dict[str, str]:
+    """Generate the specifications of a lens, toric or not.
+
+    Args:
+    ----
+        rng (random.Random): The random generator.
+
+    Returns:
+    -------
+        dict[str, str]: The lens specifications, as in `LensDataSpecs`.
+
+    """
+    toric = rng.random() < 0.3  # noqa: PLR2004
+    bc = _decimal(rng, 7.2, 9.2, signed=False)
+    sag = str(rng.randint(3500, 5200))
+    lens = {
+        "bc": bc,
+        "dia": _decimal(rng, 9.5, 17, signed=False),
+        "pwr": _decimal(rng, -12, 8, signed=True),
+        "cyl": _decimal(rng, -4, -0.5, signed=True) if toric else "",
+        "ax": str(rng.randrange(0, 181, 5)) if toric else "",
+        "add": _decimal(rng, 0.75, 3, signed=True) if rng.random() < 0.3 else "",  # noqa: PLR2004
+        "sag": sag,
+    }
+    if toric:
+        lens["bc_toric"] = _decimal(rng, 7.2, 9.2, signed=False)
+        lens["sag_toric"] = str(int(sag) + rng.randint(-150, 150))
+    if rng.random() < 0.7:  # noqa: PLR2004
+        lens["batch"] = "".join(
+            rng.choice("0123456789-") for _ in range(rng.randint(1, MAX_BATCH_LENGTH))
+        )
+
+    return lens
+
+
+def generate_label(rng: random.Random) -> dict[str, Any]:
+    """Generate a realistic random label payload.
+
+    Args:
+    ----
+        rng (random.Random): The random generator.
+
+    Returns:
+    -------
+        dict[str, Any]: The label payload, as in `LabelData`.
+
+    """
+    edge = rng.random() < EDGE_LENGTH_RATE
+    production = datetime.date(2025, 1, 1) + datetime.timedelta(rng.randrange(365))
+    due = production + datetime.timedelta(days=rng.choice((30, 90, 180, 365)))
+    sides = rng.choice((("left",), ("right",), ("left", "right")))
+
+    return {
+        "patient_info": {
+            "name": _edge_text(rng, MAX_NAME_LENGTH) if edge else rng.choice(NAMES),
+            "surname": (
+                _edge_text(rng, MAX_NAME_LENGTH) if edge else rng.choice(SURNAMES)
+            ),
+        },
+        "description": (
+            _edge_text(rng, MAX_DESCRIPTION_LENGTH)
+            if edge
+            else rng.choice(DESCRIPTIONS)
+        ),
+        "production_date": production.strftime("%d/%m/%Y"),
+        "due_date": due.strftime("%d/%m/%Y"),
+        "lens_specs": {side: generate_lens(rng) for side in sides},
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class RequestResult:
+    """The outcome of a request of the load test.
+
+    Attributes
+    ----------
+        endpoint (str): The name of the endpoint, e.g. "create".
+        status (int | None): The status code, None if the request failed.
+        latency (float): The time to the end of the response, in seconds.
+
+    """
+
+    endpoint: str
+    status: int | None
+    latency: float
+
+    @property
+    def ok(self) -> bool:
+        """Whether the request succeeded."""
+        return self.status is not None and self.status < 400  # noqa: PLR2004
+
+
+async def post_json(url: str, body: bytes) -> int:
+    """Send a POST request over a new connection and read the whole response.
+
+    Args:
+    ----
+        url (str): The URL of the endpoint.
+        body (bytes): The JSON body.
+
+    Returns:
+    -------
+        int: The status code.
+
+    """
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        writer.write(
+            (
+                f"POST {path} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + body,
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+    finally:
+        writer.close()
+
+    return int(status_line.split()[1])
+
+
+class LoadTest:
+    """Run of the load test, recording the outcome of every request.
+
+    Attributes
+    ----------
+        base_url (str): The URL of the backend.
+        endpoints (list[str]): The names of the endpoints driven.
+        results (list[RequestResult]): The outcome of the completed requests.
+
+    """
+
+    def __init__(self, base_url: str, endpoints: list[str], seed: int) -> None:
+        """Initialise the LoadTest.
+
+        Args:
+        ----
+            base_url (str): The URL of the backend.
+            endpoints (list[str]): The names of the endpoints driven.
+            seed (int): The seed of the random labels and arrivals.
+
+        """
+        self.base_url = base_url.rstrip("/")
+        self.endpoints = endpoints
+        self.results: list[RequestResult] = []
+        self._rng = random.Random(seed)  # noqa: S311
+
+    async def send(self) -> None:
+        """Send a random label to a random endpoint and record the outcome."""
+        endpoint = self._rng.choice(self.endpoints)
+        body = json.dumps(generate_label(self._rng)).encode()
+        start = time.perf_counter()
+        try:
+            status: int | None = await asyncio.wait_for(
+                post_json(self.base_url + ENDPOINTS[endpoint], body),
+                REQUEST_TIMEOUT_SECONDS,
+            )
+        except (OSError, TimeoutError, ValueError, IndexError):
+            status = None
+        self.results.append(
+            RequestResult(endpoint, status, time.perf_counter() - start),
+        )
+
+    async def run_closed_loop(self, concurrency: int, duration: float) -> None:
+        """Send requests from clients waiting for their answer before the next.
+
+        Args:
+        ----
+            concurrency (int): The amount of clients.
+            duration (float): The time new requests are sent for, in seconds.
+
+        """
+        deadline = time.perf_counter() + duration
+
+        async def client() -> None:
+            while time.perf_counter() < deadline:
+                await self.send()
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    async def run_open_loop(self, rate: float, duration: float) -> None:
+        """Send requests at Poisson arrivals, whether the previous are answered.
+
+        Args:
+        ----
+            rate (float): The average arrivals per second.
+            duration (float): The time new requests are sent for, in seconds.
+
+        """
+        start = time.perf_counter()
+        arrival = 0.0
+        in_flight: set[asyncio.Task[None]] = set()
+        while True:
+            arrival += self._rng.expovariate(rate)
+            if arrival >= duration:
+                break
+            await asyncio.sleep(max(start + arrival - time.perf_counter(), 0))
+            task = asyncio.create_task(self.send())
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=DRAIN_TIMEOUT_SECONDS)
+
+
+def percentile(latencies: list[float], rank: int) -> float:
+    """Get a percentile of the latencies, by linear interpolation.
+
+    Args:
+    ----
+        latencies (list[float]): The latencies, in seconds.
+        rank (int): The percentile, between 1 and 99.
+
+    Returns:
+    -------
+        float: The latency of the percentile, in seconds, 0 if there is none.
+
+    """
+    if len(latencies) < 2:  # noqa: PLR2004
+        return latencies[0] if latencies else 0.0
+
+    return statistics.quantiles(latencies, n=100, method="inclusive")[rank - 1]
+
+
+def summarize(results: list[RequestResult], elapsed: float) -> dict[str, Any]:
+    """Summarise the outcome of the requests by endpoint.
+
+    Args:
+    ----
+        results (list[RequestResult]): The outcome of the requests.
+        elapsed (float): The duration of the run, in seconds.
+
+    Returns:
+    -------
+        dict[str, Any]: The requests, the throughput of the successful ones,
+            their latency percentiles in milliseconds, the error rate and the
+            status codes, by endpoint and for all of them.
+
+    """
+    groups: dict[str, list[RequestResult]] = {"all": results}
+    for result in results:
+        groups.setdefault(result.endpoint, []).append(result)
+
+    summary: dict[str, Any] = {}
+    for name, group in groups.items():
+        latencies = [result.latency for result in group if result.ok]
+        errors = sum(not result.ok for result in group)
+        statuses: dict[str, int] = {}
+        for result in group:
+            key = str(result.status) if result.status is not None else "failed"
+            statuses[key] = statuses.get(key, 0) + 1
+        summary[name] = {
+            "requests": len(group),
+            "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+            **{
+                f"p{rank}_ms": percentile(latencies, rank) * 1000
+                for rank in PERCENTILES
+            },
+            "error_rate": errors / len(group) if group else 0.0,
+            "statuses": statuses,
+        }
+
+    return summary
+
+
+def print_summary(summary: dict[str, Any]) -> None:
+    """Print the summary of a run, a line per endpoint.
+
+    Args:
+    ----
+        summary (dict[str, Any]): The summary of the requests, by endpoint.
+
+    """
+    for name, stats in summary.items():
+        print(  # noqa: T201
+            f"{name:<20} {stats['requests']:6d} req  "
+            f"{stats['throughput_rps']:7.2f} req/s  "
+            f"p50 {stats['p50_ms']:8.1f}ms  p95 {stats['p95_ms']:8.1f}ms  "
+            f"p99 {stats['p99_ms']:8.1f}ms  errors {stats['error_rate']:6.1%}",
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the load test and write its summary.
+
+    Args:
+    ----
+        argv (list[str] | None, optional): The command line arguments.
+            Defaults to None.
+
+    Returns:
+    -------
+        int: The exit code, 1 if no request succeeded.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Backend.")
+    parser.add_argument(
+        "--endpoint",
+        dest="endpoints",
+        action="append",
+        choices=sorted(ENDPOINTS),
+        help="Endpoint driven, can be repeated. Defaults to all of them.",
+    )
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=4, help="Clients.")
+    load.add_argument("--rate", type=float, help="Open-loop arrivals per second.")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--out", type=Path, required=True, help="Summary file.")
+    args = parser.parse_args(argv)
+
+    load_test = LoadTest(args.url, args.endpoints or sorted(ENDPOINTS), args.seed)
+    started_at = datetime.datetime.now(tz=datetime.UTC).isoformat()
+    start = time.perf_counter()
+    if args.rate is not None:
+        asyncio.run(load_test.run_open_loop(args.rate, args.duration))
+    else:
+        asyncio.run(load_test.run_closed_loop(args.concurrency, args.duration))
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(load_test.results, elapsed)
+    report = {
+        "started_at": started_at,
+        "url": args.url,
+        "endpoints": load_test.endpoints,
+        "mode": "open" if args.rate is not None else "closed",
+        "rate": args.rate,
+        "concurrency": None if args.rate is not None else args.concurrency,
+        "duration_seconds": elapsed,
+        "seed": args.seed,
+        "results": summary,
+    }
+    args.out.write_text(json.dumps(report, indent=2) + "\n")
+
+    print_summary(summary)
+
+    return int(not any(result.ok for result in load_test.results))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
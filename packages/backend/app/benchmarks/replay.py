@@ -0,0 +1,190 @@
+"""Replay of captured traffic against a backend, at its original pace or faster.
+
+Run it against a local instance with the fake printer:
+
+    FREEDOM_LABEL_PRINTER_BACKEND=fake uvicorn app.main:app --port 8000
+    python -m app.benchmarks.replay capture.ndjson --speed 1 --out replay.json
+
+The requests of the capture, written with `FREEDOM_LABEL_CAPTURE_PATH`, are
+sent in the order they arrived, their spacing divided by `--speed`, or as
+fast as the backend answers with `--speed max`. The summary has the format
+of the load test one, by endpoint.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from app.benchmarks.load_test import (
+    REQUEST_TIMEOUT_SECONDS,
+    RequestResult,
+    post_json,
+    print_summary,
+    summarize,
+)
+
+
+def load_capture(path: Path) -> list[dict[str, Any]]:
+    """Load the captured requests, in their order of arrival.
+
+    Args:
+    ----
+        path (Path): The capture file.
+
+    Returns:
+    -------
+        list[dict[str, Any]]: The captured requests.
+
+    """
+    with path.open(encoding="utf-8") as capture_file:
+        records = [json.loads(line) for line in capture_file if line.strip()]
+
+    return sorted(records, key=lambda record: record["arrival"])
+
+
+def parse_speed(value: str) -> float | None:
+    """Parse the replay speed, a factor or "max".
+
+    Args:
+    ----
+        value (str): The speed, e.g. "1", "10" or "max".
+
+    Raises:
+    ------
+        argparse.ArgumentTypeError: If the speed is not a positive factor.
+
+    Returns:
+    -------
+        float | None: The speed factor, None for the maximum speed.
+
+    """
+    if value == "max":
+        return None
+
+    try:
+        speed = float(value)
+    except ValueError:
+        speed = 0
+    if speed <= 0:
+        error_message = f"invalid speed {value!r}, expected a factor or 'max'"
+        raise argparse.ArgumentTypeError(error_message)
+
+    return speed
+
+
+async def replay(
+    base_url: str,
+    records: list[dict[str, Any]],
+    speed: float | None,
+    max_in_flight: int,
+) -> list[RequestResult]:
+    """Send the captured requests at their arrival times, scaled by the speed.
+
+    Args:
+    ----
+        base_url (str): The URL of the backend.
+        records (list[dict[str, Any]]): The captured requests, in their order
+            of arrival.
+        speed (float | None): The speed factor, None to send the requests
+            as fast as they are answered.
+        max_in_flight (int): The maximum amount of requests in flight.
+
+    Returns:
+    -------
+        list[RequestResult]: The outcome of the requests, by path.
+
+    """
+    base_url = base_url.rstrip("/")
+    slots = asyncio.Semaphore(max_in_flight)
+    results: list[RequestResult] = []
+
+    async def send(record: dict[str, Any]) -> None:
+        body = json.dumps(record["body"]).encode()
+        start = time.perf_counter()
+        try:
+            status: int | None = await asyncio.wait_for(
+                post_json(base_url + record["path"], body),
+                REQUEST_TIMEOUT_SECONDS,
+            )
+        except (OSError, TimeoutError, ValueError, IndexError):
+            status = None
+        finally:
+            slots.release()
+        endpoint = record["path"].split("?", 1)[0]
+        results.append(RequestResult(endpoint, status, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    first_arrival = records[0]["arrival"] if records else 0.0
+    tasks = []
+    for record in records:
+        if speed is not None:
+            offset = (record["arrival"] - first_arrival) / speed
+            await asyncio.sleep(max(start + offset - time.perf_counter(), 0))
+        await slots.acquire()
+        tasks.append(asyncio.create_task(send(record)))
+    await asyncio.gather(*tasks)
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Replay a capture and write the summary of its requests.
+
+    Args:
+    ----
+        argv (list[str] | None, optional): The command line arguments.
+            Defaults to None.
+
+    Returns:
+    -------
+        int: The exit code, 1 if no request succeeded.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path, help="Capture file.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Backend.")
+    parser.add_argument(
+        "--speed",
+        type=parse_speed,
+        default=1.0,
+        help='Speed factor of the replay, or "max". Defaults to 1.',
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=32,
+        help="Maximum requests in flight.",
+    )
+    parser.add_argument("--out", type=Path, required=True, help="Summary file.")
+    args = parser.parse_args(argv)
+
+    records = load_capture(args.capture)
+    start = time.perf_counter()
+    results = asyncio.run(
+        replay(args.url, records, args.speed, args.max_in_flight),
+    )
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed)
+    report = {
+        "capture": str(args.capture),
+        "url": args.url,
+        "speed": args.speed or "max",
+        "max_in_flight": args.max_in_flight,
+        "duration_seconds": elapsed,
+        "results": summary,
+    }
+    args.out.write_text(json.dumps(report, indent=2) + "\n")
+    print_summary(summary)
+
+    return int(not any(result.ok for result in results))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
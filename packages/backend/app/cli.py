@@ -0,0 +1,293 @@
+"""Command line interface of the backend, for offline work without HTTP.
+
+Render a file of labels, one per line, from the backend directory:
+
+    python -m app.cli render input.ndjson --out DIR --jobs N
+
+Rows are read as they are rendered, by a pool of processes that warm up the
+fonts when they start. Progress goes to stderr, along with the rows that
+failed, and the summary is printed to stdout as JSON. The exit code is 1 if
+any row failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+from app.services.create.create_pdf import create_label_pdf
+from app.services.importer.bulk_import import (
+    ImportFormat,
+    create_render_executor,
+    iter_rows,
+    render_rows,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+    from app.models import LabelData
+
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+def render_row(
+    row_number: int,
+    label_data: LabelData,
+    output_dir: Path,
+    show_borders: bool = False,
+) -> str:
+    """Render a row into its PDF file, named after the row number.
+
+    Args:
+    ----
+        row_number (int): The row number.
+        label_data (LabelData): The complete label data.
+        output_dir (Path): The directory of the PDF files.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        str: The path of the PDF file.
+
+    """
+    return create_label_pdf(
+        f"label-{row_number:06d}.pdf",
+        label_data,
+        show_borders=show_borders,
+        output_dir=output_dir,
+    )
+
+
+async def iter_input_lines(lines: TextIO) -> AsyncIterator[str]:
+    """Read the lines of the input, one at a time.
+
+    Args:
+    ----
+        lines (TextIO): The input.
+
+    Yields:
+    ------
+        str: The lines of the input, without line terminators.
+
+    """
+    for line in lines:
+        yield line.rstrip("\r\n")
+
+
+class RenderReport:
+    """Counters of a bulk render, reported as it progresses.
+
+    Attributes
+    ----------
+        total (int): The amount of rows read.
+        done (int): The amount of rows completed, rendered or failed.
+        failed (int): The amount of rows that failed.
+        start (float): The `perf_counter` time the render started at.
+
+    """
+
+    def __init__(self, output: TextIO) -> None:
+        """Initialise the RenderReport.
+
+        Args:
+        ----
+            output (TextIO): The stream of the progress and of the failures.
+
+        """
+        self._output = output
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._reported_at = self.start
+
+    @property
+    def rendered(self) -> int:
+        """Get the amount of rows rendered."""
+        return self.done - self.failed
+
+    def add_result(self, result: dict[str, Any]) -> None:
+        """Count a completed row, writing it out if it failed.
+
+        Args:
+        ----
+            result (dict[str, Any]): The result of the row.
+
+        """
+        self.done += 1
+        if result["status"] == "error":
+            self.failed += 1
+            self._output.write(f"{json.dumps(result)}\n")
+        self.report_progress()
+
+    def report_progress(self, force: bool = False) -> None:
+        """Write the progress, at most once per progress interval.
+
+        Args:
+        ----
+            force (bool, optional): Whether to write it regardless of the
+                interval. Defaults to False.
+
+        """
+        now = time.perf_counter()
+        if not force and now - self._reported_at < PROGRESS_INTERVAL_SECONDS:
+            return
+
+        self._reported_at = now
+        self._output.write(
+            f"{self.done} rows done, {self.failed} failed, "
+            f"{self.rate:.1f} labels/s\n",
+        )
+
+    @property
+    def elapsed(self) -> float:
+        """Get the time elapsed since the render started, in seconds."""
+        return time.perf_counter() - self.start
+
+    @property
+    def rate(self) -> float:
+        """Get the amount of rows completed per second."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        """Build the summary of the render.
+
+        Returns
+        -------
+            dict[str, Any]: The counters, elapsed time and throughput.
+
+        """
+        return {
+            "total": self.total,
+            "ok": self.rendered,
+            "failed": self.failed,
+            "seconds": round(self.elapsed, 3),
+            "labels_per_second": round(self.rate, 2),
+        }
+
+
+def render_labels(  # noqa: PLR0913
+    lines: TextIO,
+    import_format: ImportFormat,
+    output_dir: Path,
+    jobs: int,
+    report: RenderReport,
+    show_borders: bool = False,
+) -> None:
+    """Render the labels of the input over a pool of processes.
+
+    The rows go through the same window as the bulk import of the API: at
+    most two rows per process are in flight, so that the input is read as the
+    labels are rendered instead of being held in memory.
+
+    Args:
+    ----
+        lines (TextIO): The input.
+        import_format (ImportFormat): The format of the input.
+        output_dir (Path): The directory of the PDF files.
+        jobs (int): The amount of render processes.
+        report (RenderReport): The report of the render.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+
+    """
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        with create_render_executor(jobs) as executor:
+
+            async def render(row_number: int, label_data: LabelData) -> dict[str, Any]:
+                path = await loop.run_in_executor(
+                    executor,
+                    render_row,
+                    row_number,
+                    label_data,
+                    output_dir,
+                    show_borders,
+                )
+                return {"row": row_number, "status": "ok", "path": path}
+
+            async for result in render_rows(
+                iter_rows(iter_input_lines(lines), import_format),
+                render,
+                window=jobs * 2,
+            ):
+                report.total += 1
+                report.add_result(result)
+
+    asyncio.run(run())
+    report.report_progress(force=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line interface.
+
+    Args:
+    ----
+        argv (list[str] | None, optional): The command line arguments.
+            Defaults to None.
+
+    Returns:
+    -------
+        int: The exit code, 1 if any row failed.
+
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    render = commands.add_parser("render", help="Render a file of labels to PDF.")
+    render.add_argument("input", help="NDJSON or CSV file of labels, - for stdin.")
+    render.add_argument("--out", type=Path, required=True, help="Output directory.")
+    render.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Render processes, 0 means one per CPU core.",
+    )
+    render.add_argument(
+        "--format",
+        choices=[import_format.value for import_format in ImportFormat],
+        help="Format of the input, guessed from its suffix by default.",
+    )
+    render.add_argument(
+        "--debug-border",
+        action="store_true",
+        help="Show the debug borders.",
+    )
+    args = parser.parse_args(argv)
+
+    import_format = ImportFormat(
+        args.format
+        or (ImportFormat.csv if args.input.endswith(".csv") else ImportFormat.ndjson),
+    )
+    args.out.mkdir(parents=True, exist_ok=True)
+    report = RenderReport(sys.stderr)
+
+    if args.input == "-":
+        lines = sys.stdin
+    else:
+        lines = Path(args.input).open(encoding="utf-8-sig")  # noqa: SIM115
+    with lines:
+        render_labels(
+            lines,
+            import_format,
+            output_dir=args.out,
+            jobs=args.jobs or os.cpu_count() or 1,
+            report=report,
+            show_borders=args.debug_border,
+        )
+
+    print(json.dumps(report.summary()))  # noqa: T201
+
+    return int(report.failed > 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
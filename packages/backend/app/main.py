@@ -2,23 +2,71 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from typing import TYPE_CHECKING, Annotated
+import threading
+from typing import TYPE_CHECKING, Annotated, Any
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Body, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from loguru import logger
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.models import LabelData, PathData
 from app.service_layer import (
     create_label,
+    create_label_layout,
+    create_label_preview,
     create_print_label,
+    get_label_pdf,
+    get_label_preview,
     print_label,
+    render_label_output,
     validate_label_data,
 )
+from app.services.create.engines import OUTPUT_MEDIA_TYPES, OutputFormat
+from app.services.importer.bulk_import import (
+    get_import_format,
+    import_labels,
+    shutdown_import_executor,
+)
+from app.services.lifecycle.admission_control import OverloadedError
+from app.services.lifecycle.graceful_shutdown import (
+    ShuttingDownError,
+    get_render_tracker,
+)
+from app.services.lifecycle.worker_recycle import get_worker_recycler
+from app.services.preview.preview_png import (
+    DEFAULT_PREVIEW_DPI,
+    MAX_PREVIEW_DPI,
+    MIN_PREVIEW_DPI,
+)
+from app.services.print.print_pdf import PrintError
+from app.services.print.print_queue import get_print_queue
+from app.services.print.printer_status import (
+    PrinterUnavailableError,
+    get_printer_poller,
+)
+from app.services.profiling.loop_monitor import get_loop_monitor
+from app.services.profiling.memory import (
+    SnapshotNotFoundError,
+    get_memory_snapshots,
+)
+from app.services.profiling.middleware import RequestContextMiddleware
+from app.services.profiling.request_profile import get_profile_store
+from app.services.profiling.sampler import get_stack_sampler
+from app.services.traffic.capture import TrafficCaptureMiddleware
+from app.services.validate.label_validation import validate_label_payload
+from app.services.warmup.warmup import is_ready, mark_ready, run_warm_up
+from app.settings import get_settings
+from app.utils.blocking_io import shutdown_io_executor
+from app.utils.responses import DuplexStreamingResponse
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from app.models import LabelData, PathData
 
 logging.basicConfig(
@@ -26,6 +74,9 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
 )
 
+# Time for the replacement process to start, suggested to refused clients.
+SHUTDOWN_RETRY_AFTER_SECONDS = 5
+
 app = FastAPI()
 
 app.add_middleware(
@@ -34,27 +85,177 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "Server-Timing"],
 )
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(TrafficCaptureMiddleware)
 
 Instrumentator().instrument(app).expose(app)
 
 
 @app.on_event("startup")
 async def startup() -> None:
-    """Handle application startup events."""
+    """Handle application startup events.
+
+    The render pipeline is warmed up in the background, so that `/health`
+    answers right away while `/ready` waits for the warm-up to complete.
+    """
+    if get_settings().warm_up:
+        loop = asyncio.get_running_loop()
+        app.state.warm_up = loop.run_in_executor(None, run_warm_up)
+    else:
+        mark_ready()
+
+    if get_settings().profiler_enabled:
+        get_stack_sampler().start(event_loop_thread_id=threading.get_ident())
+
+    if get_loop_monitor().enabled:
+        get_loop_monitor().start()
+
+    if get_worker_recycler().enabled:
+        app.state.worker_recycle = asyncio.create_task(get_worker_recycler().run())
+
+    if get_printer_poller().enabled:
+        app.state.printer_poll = asyncio.create_task(get_printer_poller().run())
+
+    get_render_tracker().resume()
+    replayed_jobs = get_print_queue().start()
+    if replayed_jobs:
+        logger.info(f"Replaying {replayed_jobs} print jobs left by the last process")
+
     logger.info("Application started")
 
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
-    """Handle application shutdown events."""
+    """Handle application shutdown events.
+
+    New renders and print jobs are refused, then the renders in progress and
+    the print queue are drained within the shutdown deadline. Print jobs still
+    pending at the deadline stay in the print journal for the next process.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + get_settings().shutdown_deadline_seconds
+    for task_name in ("worker_recycle", "printer_poll"):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+
+    render_tracker = get_render_tracker()
+    render_tracker.stop_accepting()
+    renders_drained = await asyncio.to_thread(
+        render_tracker.wait_idle,
+        max(deadline - loop.time(), 0),
+    )
+    if not renders_drained:
+        logger.warning(
+            f"Shutting down with {render_tracker.in_flight} renders in progress",
+        )
+
+    pending_jobs = await get_print_queue().drain(max(deadline - loop.time(), 0))
+    if pending_jobs:
+        logger.warning(
+            f"Leaving {len(pending_jobs)} pending print jobs to the next process",
+        )
+
+    shutdown_import_executor()
+    shutdown_io_executor()
+    get_stack_sampler().stop()
+    get_loop_monitor().stop()
     logger.info("Application shutdown")
 
 
+@app.exception_handler(ShuttingDownError)
+async def shutting_down_handler(
+    _request: Request,
+    error: ShuttingDownError,
+) -> JSONResponse:
+    """Refuse new work while the application shuts down.
+
+    Args:
+    ----
+        _request (Request): The refused request.
+        error (ShuttingDownError): The error raised when refusing the work.
+
+    Returns:
+    -------
+        JSONResponse: The 503 response, asking the client to retry later.
+
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(error)},
+        headers={
+            "X-Error-Code": "SHUTTING_DOWN_ERROR",
+            "Retry-After": str(SHUTDOWN_RETRY_AFTER_SECONDS),
+        },
+    )
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(
+    _request: Request,
+    error: OverloadedError,
+) -> JSONResponse:
+    """Refuse new work while the render or print queue is full.
+
+    Args:
+    ----
+        _request (Request): The refused request.
+        error (OverloadedError): The error raised when refusing the work.
+
+    Returns:
+    -------
+        JSONResponse: The 429 response, asking the client to retry once the
+            backlog is worked through.
+
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(error)},
+        headers={
+            "X-Error-Code": "OVERLOADED_ERROR",
+            "Retry-After": str(error.retry_after),
+        },
+    )
+
+
+@app.exception_handler(PrinterUnavailableError)
+async def printer_unavailable_handler(
+    _request: Request,
+    error: PrinterUnavailableError,
+) -> JSONResponse:
+    """Refuse print requests while the printer is known to be unable to print.
+
+    Args:
+    ----
+        _request (Request): The refused request.
+        error (PrinterUnavailableError): The error raised when refusing the
+            print request.
+
+    Returns:
+    -------
+        JSONResponse: The 503 response, asking the client to retry after the
+            next poll of the printer.
+
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(error)},
+        headers={
+            "X-Error-Code": "PRINTER_UNAVAILABLE_ERROR",
+            "Retry-After": str(error.retry_after),
+        },
+    )
+
+
 @app.get("/health")
-def health_check() -> dict[str, str]:
+async def health_check() -> dict[str, str]:
     """Perform a health check.
 
+    The application is alive as long as it answers, however busy its event
+    loop: the saturation of the loop is checked by `/health/saturation`.
+
     Returns
     -------
         dict[str, str]: A dictionary with the status of the application.
@@ -63,6 +264,55 @@ def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/health/saturation")
+async def saturation_check() -> dict[str, Any]:
+    """Check whether the event loop keeps up with the work.
+
+    Raises
+    ------
+        HTTPException: If the lag of the event loop exceeded the saturation
+            lag within the last seconds.
+
+    Returns
+    -------
+        dict[str, Any]: A dictionary with the saturation of the application and
+            the lag of its event loop, in seconds.
+
+    """
+    loop_monitor = get_loop_monitor()
+    if loop_monitor.saturated:
+        raise HTTPException(
+            status_code=503,
+            detail=f"The event loop lags by {loop_monitor.lag:.3f}s.",
+            headers={"X-Error-Code": "EVENT_LOOP_SATURATED_ERROR"},
+        )
+
+    return {"status": "ok", "event_loop_lag_seconds": loop_monitor.lag}
+
+
+@app.get("/ready")
+async def readiness_check() -> dict[str, str]:
+    """Check whether the application has warmed up and can serve labels.
+
+    Raises
+    ------
+        HTTPException: If the render pipeline warm-up has not completed yet.
+
+    Returns
+    -------
+        dict[str, str]: A dictionary with the readiness of the application.
+
+    """
+    if not is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Application is warming up.",
+            headers={"X-Error-Code": "NOT_READY_ERROR"},
+        )
+
+    return {"status": "ready"}
+
+
 @app.post("/label/create")
 async def create_label_endpoint(
     label_data: LabelData,
@@ -128,6 +378,290 @@ async def create_label_endpoint(
     return {"status": "ok", "pdf_filename": pdf_filename}
 
 
+@app.post("/label/validate")
+def validate_label_endpoint(
+    body: Annotated[dict[str, Any] | list[Any], Body()],
+) -> dict[str, Any] | list[dict[str, Any]]:
+    """Endpoint to validate one or many labels, without rendering them.
+
+    Runs the model checks, the left/right lens presence rule and checks that
+    patient name, description and lens values fit their cell.
+
+    Args:
+    ----
+        body (dict[str, Any] | list[Any]): A label payload, with the same shape
+            as the body of `/label/create`, or a list of them.
+
+    Returns:
+    -------
+        dict[str, Any] | list[dict[str, Any]]: Whether the label is valid and
+            its field-level errors, or a list of them for a list of labels.
+
+    """
+    if isinstance(body, list):
+        return [validate_label_payload(payload) for payload in body]
+
+    return validate_label_payload(body)
+
+
+@app.get("/label/{label_id}/pdf")
+async def get_label_pdf_endpoint(label_id: str) -> Response:
+    """Endpoint to download the PDF of a stored label.
+
+    Labels stored as data are re-rendered on demand.
+
+    Args:
+    ----
+        label_id (str): The label id, i.e. the label filename with or without
+            the ".pdf" suffix.
+
+    Returns:
+    -------
+        Response: The PDF label.
+
+    """
+    try:
+        pdf_bytes = await get_label_pdf(label_id)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail=str(error),
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from ValueError
+    except FileNotFoundError as error:
+        raise HTTPException(
+            status_code=404,
+            detail=str(error),
+            headers={"X-Error-Code": "TEMPLATE_PDF_NOT_FOUND_ERROR"},
+        ) from FileNotFoundError
+
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": (
+                f'inline; filename="{label_id.removesuffix(".pdf")}.pdf"'
+            ),
+        },
+    )
+
+
+@app.get("/label/{label_id}/preview.png")
+async def get_label_preview_endpoint(
+    label_id: str,
+    dpi: Annotated[
+        int,
+        Query(ge=MIN_PREVIEW_DPI, le=MAX_PREVIEW_DPI),
+    ] = DEFAULT_PREVIEW_DPI,
+) -> Response:
+    """Endpoint to get the PNG thumbnail of a stored label.
+
+    Args:
+    ----
+        label_id (str): The label id, i.e. the label filename with or without
+            the ".pdf" suffix.
+        dpi (int, optional): The resolution of the thumbnail.
+            Defaults to DEFAULT_PREVIEW_DPI.
+
+    Returns:
+    -------
+        Response: The PNG thumbnail.
+
+    """
+    try:
+        png_bytes = await get_label_preview(label_id, dpi=dpi)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail=str(error),
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from ValueError
+    except FileNotFoundError as error:
+        raise HTTPException(
+            status_code=404,
+            detail=str(error),
+            headers={"X-Error-Code": "TEMPLATE_PDF_NOT_FOUND_ERROR"},
+        ) from FileNotFoundError
+    except RuntimeError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"X-Error-Code": "PREVIEW_UNAVAILABLE_ERROR"},
+        ) from RuntimeError
+
+    return Response(content=png_bytes, media_type="image/png")
+
+
+@app.post("/label/preview.png")
+async def create_label_preview_endpoint(
+    label_data: LabelData,
+    dpi: Annotated[
+        int,
+        Query(ge=MIN_PREVIEW_DPI, le=MAX_PREVIEW_DPI),
+    ] = DEFAULT_PREVIEW_DPI,
+    debug_border: Annotated[int | None, Query()] = None,
+) -> Response:
+    """Endpoint to get the PNG thumbnail of a label, without persisting it.
+
+    Args:
+    ----
+        label_data (LabelData): The request body containing label details.
+        dpi (int, optional): The resolution of the thumbnail.
+            Defaults to DEFAULT_PREVIEW_DPI.
+        debug_border (int | None, optional): If set to 1, the thumbnail will
+            have visible borders for debugging. Defaults to None.
+
+    Returns:
+    -------
+        Response: The PNG thumbnail.
+
+    """
+    try:
+        validate_label_data(label_data)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail=str(error),
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from ValueError
+
+    show_borders = debug_border == 1
+
+    try:
+        png_bytes = await create_label_preview(
+            label_data,
+            dpi=dpi,
+            show_borders=show_borders,
+        )
+    except TypeError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=400,
+            detail="Wrong template selection",
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from TypeError
+    except RuntimeError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"X-Error-Code": "PREVIEW_UNAVAILABLE_ERROR"},
+        ) from RuntimeError
+
+    return Response(content=png_bytes, media_type="image/png")
+
+
+@app.post("/label/layout")
+async def create_label_layout_endpoint(
+    label_data: LabelData,
+    debug_border: Annotated[int | None, Query()] = None,
+) -> dict[str, Any]:
+    """Endpoint to get the layout of a label, for a live preview on the client.
+
+    The templates lay the label out without rendering the PDF, and the boxes of
+    the text lines and images are returned with absolute coordinates, fitted
+    font sizes and text.
+
+    Args:
+    ----
+        label_data (LabelData): The request body containing label details.
+        debug_border (int | None, optional): If set to 1, the text boxes are
+            flagged with their debug borders. Defaults to None.
+
+    Raises:
+    ------
+        HTTPException: If the provided label data is invalid.
+
+    Returns:
+    -------
+        dict[str, Any]: The unit and size of the page, and its boxes.
+
+    """
+    try:
+        validate_label_data(label_data)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail=str(error),
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from ValueError
+
+    try:
+        return await create_label_layout(
+            label_data,
+            show_borders=debug_border == 1,
+        )
+    except TypeError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=400,
+            detail="Wrong template selection",
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from TypeError
+
+
+@app.post("/label/render")
+async def render_label_endpoint(
+    label_data: LabelData,
+    output_format: Annotated[OutputFormat, Query(alias="format")] = OutputFormat.pdf,
+    dpi: Annotated[
+        int,
+        Query(ge=MIN_PREVIEW_DPI, le=MAX_PREVIEW_DPI),
+    ] = DEFAULT_PREVIEW_DPI,
+    debug_border: Annotated[int | None, Query()] = None,
+) -> Response:
+    """Endpoint to render a label in an output format, without persisting it.
+
+    The label is laid out once and its layout cached, then drawn by the engine
+    of the format: `pdf`, `png`, `svg` or `json`.
+
+    Args:
+    ----
+        label_data (LabelData): The request body containing label details.
+        output_format (OutputFormat, optional): The output format.
+            Defaults to OutputFormat.pdf.
+        dpi (int, optional): The resolution of the `png` format.
+            Defaults to DEFAULT_PREVIEW_DPI.
+        debug_border (int | None, optional): If set to 1, the label will have
+            visible borders for debugging. Defaults to None.
+
+    Raises:
+    ------
+        HTTPException: If the provided label data is invalid.
+
+    Returns:
+    -------
+        Response: The rendered label.
+
+    """
+    try:
+        validate_label_data(label_data)
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail=str(error),
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from ValueError
+
+    try:
+        content = await render_label_output(
+            label_data,
+            output_format,
+            dpi=dpi,
+            show_borders=debug_border == 1,
+        )
+    except TypeError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=400,
+            detail="Wrong template selection",
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from TypeError
+
+    return Response(content=content, media_type=OUTPUT_MEDIA_TYPES[output_format])
+
+
 @app.post("/label/print")
 async def print_label_endpoint(body_data: PathData) -> dict[str, str]:
     """Endpoint to print a label by specifying its path.
@@ -143,6 +677,13 @@ async def print_label_endpoint(body_data: PathData) -> dict[str, str]:
     """
     try:
         pdf_path, pdf_filename = await print_label(pdf_path=body_data.pdf_path)
+    except PrintError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=502,
+            detail=str(error),
+            headers={"X-Error-Code": "PRINT_ERROR"},
+        ) from PrintError
     except FileNotFoundError as error:
         # TODO(nicobees): log error message as str(error)
         # https://github.com/nicobees/freedom-label/issues/2
@@ -165,6 +706,7 @@ async def create_print_label_endpoint(
     label_data: LabelData,
     debug: Annotated[str | None, Query()] = None,
     debug_border: Annotated[int | None, Query()] = None,
+    persist: Annotated[bool | None, Query()] = None,
 ) -> dict[str, str]:
     """Endpoint to create and optionally print a label.
 
@@ -175,6 +717,9 @@ async def create_print_label_endpoint(
             will be skipped. Defaults to None.
         debug_border (int | None, optional): If set to 1, the generated PDF
             will have visible borders for debugging. Defaults to None.
+        persist (bool | None, optional): Whether the label is persisted, in the
+            background. If None, the `persist_printed_labels` setting applies.
+            Defaults to None.
 
     Raises:
     ------
@@ -203,7 +748,15 @@ async def create_print_label_endpoint(
             label_data,
             print_disabled=print_disabled,
             show_borders=show_borders,
+            persist=persist,
         )
+    except PrintError as error:
+        logging.exception(msg=str(error))
+        raise HTTPException(
+            status_code=502,
+            detail=str(error),
+            headers={"X-Error-Code": "PRINT_ERROR"},
+        ) from PrintError
     except TypeError as error:
         logging.exception(msg=str(error))
         raise HTTPException(
@@ -233,3 +786,211 @@ async def create_print_label_endpoint(
     logging.info(msg=message)
 
     return {"status": "ok", "pdf_filename": pdf_filename}
+
+
+@app.get("/printers")
+async def get_printers_endpoint() -> list[dict[str, Any]]:
+    """Endpoint to get the cached status of the printers.
+
+    The status is the one of the last background poll, not read from CUPS on
+    request. It is unknown before the first poll, or once stale.
+
+    Returns
+    -------
+        list[dict[str, Any]]: The status of each printer.
+
+    """
+    return [get_printer_poller().current().to_dict()]
+
+
+@app.post("/label/import")
+async def import_labels_endpoint(
+    request: Request,
+    debug_border: Annotated[int | None, Query()] = None,
+) -> DuplexStreamingResponse:
+    """Endpoint to create labels in bulk from a streamed CSV or NDJSON body.
+
+    CSV columns are named after the label fields, e.g. `patient_info.name` or
+    `lens_specs.left.bc`; NDJSON lines have the same shape as the body of
+    `/label/create`. Rows are validated and rendered while the body is received.
+
+    Args:
+    ----
+        request (Request): The request, whose body is read as a stream.
+        debug_border (int | None, optional): If set to 1, the generated PDFs
+            will have visible borders for debugging. Defaults to None.
+
+    Raises:
+    ------
+        HTTPException: If the content type is not supported.
+
+    Returns:
+    -------
+        DuplexStreamingResponse: The NDJSON stream with the result of every row,
+            followed by a summary line.
+
+    """
+    try:
+        import_format = get_import_format(request.headers.get("content-type"))
+    except ValueError as error:
+        raise HTTPException(
+            status_code=415,
+            detail=str(error),
+            headers={"X-Error-Code": "VALIDATION_ERROR"},
+        ) from ValueError
+
+    if not get_render_tracker().accepting:
+        error_message = "The application is shutting down."
+        raise ShuttingDownError(error_message)
+
+    show_borders = debug_border == 1
+
+    async def results() -> AsyncIterator[str]:
+        # The whole import is tracked as a render, so that a shutdown waits for it.
+        with get_render_tracker().track():
+            async for result in import_labels(
+                request.stream(),
+                import_format,
+                show_borders=show_borders,
+            ):
+                yield json.dumps(result) + "\n"
+
+        logging.info(msg="[POST /label/import] - Bulk import completed")
+
+    return DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.get("/admin/profile/stacks")
+def get_profile_stacks_endpoint(
+    seconds: Annotated[int, Query(ge=1)] = 60,
+    endpoint: Annotated[str | None, Query()] = None,
+) -> PlainTextResponse:
+    """Endpoint to download the stack samples of a time window.
+
+    The samples are collapsed stacks, rooted at the endpoint and the render
+    stage, ready for `flamegraph.pl` or speedscope.
+
+    Args:
+    ----
+        seconds (int, optional): The length of the window, up to now, in
+            seconds. Defaults to 60.
+        endpoint (str | None, optional): The endpoint the samples are limited
+            to, e.g. "POST /label/create". Defaults to None.
+
+    Raises:
+    ------
+        HTTPException: If the profiler is not enabled.
+
+    Returns:
+    -------
+        PlainTextResponse: The collapsed stacks, one per line.
+
+    """
+    sampler = get_stack_sampler()
+    if not sampler.running:
+        raise HTTPException(
+            status_code=409,
+            detail="The profiler is not enabled.",
+            headers={"X-Error-Code": "PROFILER_DISABLED_ERROR"},
+        )
+
+    return PlainTextResponse(sampler.collapsed_stacks(seconds, endpoint=endpoint))
+
+
+@app.get("/admin/profile/requests/{request_id}")
+def get_request_profile_endpoint(request_id: str) -> dict[str, Any]:
+    """Endpoint to download the profile of a request.
+
+    Only the requests sent with the `profile=1` query parameter or the
+    `X-Profile: 1` header are profiled, the latest ones are kept.
+
+    Args:
+    ----
+        request_id (str): The `X-Request-ID` of the profiled request.
+
+    Raises:
+    ------
+        HTTPException: If no profile of the request is kept.
+
+    Returns:
+    -------
+        dict[str, Any]: The time spent in the stages of the request, the
+            functions taking the most cumulative time and the lines
+            allocating the most memory.
+
+    """
+    profile = get_profile_store().get(request_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No profile of the request {request_id} is kept.",
+            headers={"X-Error-Code": "PROFILE_NOT_FOUND_ERROR"},
+        )
+
+    return profile
+
+
+@app.post("/admin/memory/snapshots")
+def take_memory_snapshot_endpoint() -> dict[str, Any]:
+    """Endpoint to take a snapshot of the Python allocations.
+
+    The allocations are traced from the first snapshot on, until the snapshots
+    are deleted.
+
+    Returns
+    -------
+        dict[str, Any]: The id of the snapshot, the memory traced and the
+            resident set size of the process.
+
+    """
+    return get_memory_snapshots().take()
+
+
+@app.get("/admin/memory/snapshots/{snapshot_id}/diff")
+def get_memory_snapshot_diff_endpoint(
+    snapshot_id: int,
+    base: Annotated[int | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1)] = 20,
+) -> list[dict[str, Any]]:
+    """Endpoint to compare the allocations of two snapshots, by module.
+
+    Args:
+    ----
+        snapshot_id (int): The id of the snapshot.
+        base (int | None, optional): The id of the snapshot compared to. If
+            None, the snapshot taken before it. Defaults to None.
+        limit (int, optional): The amount of modules returned, the ones whose
+            memory changed the most. Defaults to 20.
+
+    Raises:
+    ------
+        HTTPException: If a snapshot is not, or no longer, kept.
+
+    Returns:
+    -------
+        list[dict[str, Any]]: The memory and the blocks allocated by every
+            module, and their change since the base snapshot.
+
+    """
+    try:
+        return get_memory_snapshots().diff(snapshot_id, base_id=base, limit=limit)
+    except SnapshotNotFoundError as error:
+        raise HTTPException(
+            status_code=404,
+            detail=str(error),
+            headers={"X-Error-Code": "SNAPSHOT_NOT_FOUND_ERROR"},
+        ) from SnapshotNotFoundError
+
+
+@app.delete("/admin/memory/snapshots")
+def delete_memory_snapshots_endpoint() -> Response:
+    """Endpoint to delete the snapshots and stop tracing the allocations.
+
+    Returns
+    -------
+        Response: An empty response.
+
+    """
+    get_memory_snapshots().clear()
+
+    return Response(status_code=204)
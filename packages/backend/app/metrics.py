@@ -0,0 +1,85 @@
+"""Prometheus metrics of the label pipeline, exposed on `/metrics`."""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+
+from prometheus_client import Counter, Gauge, Histogram
+
+RENDER_REQUESTS = Counter(
+    "label_render_requests_total",
+    "Label creation requests, by whether they rendered the label or joined an "
+    "identical render already in flight.",
+    ["outcome"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "label_admission_in_flight",
+    "Work in progress, by kind of work.",
+    ["work"],
+)
+
+ADMISSION_QUEUED = Gauge(
+    "label_admission_queued",
+    "Work waiting for a slot, by kind of work.",
+    ["work"],
+)
+
+ADMISSION_REJECTIONS = Counter(
+    "label_admission_rejections_total",
+    "Work refused with 429 because its queue was full, by kind of work.",
+    ["work"],
+)
+
+PRINT_QUEUE_DEPTH = Gauge(
+    "label_print_queue_depth",
+    "Print jobs queued or being printed.",
+)
+
+# The resident set size is exported by the default process collector, as
+# `process_resident_memory_bytes`.
+PYTHON_ALLOCATED_BLOCKS = Gauge(
+    "label_python_allocated_blocks",
+    "Memory blocks allocated by the Python interpreter.",
+)
+PYTHON_ALLOCATED_BLOCKS.set_function(sys.getallocatedblocks)
+
+PYTHON_TRACED_MEMORY = Gauge(
+    "label_python_traced_memory_bytes",
+    "Python heap traced by tracemalloc, 0 unless memory snapshots are taken.",
+)
+PYTHON_TRACED_MEMORY.set_function(lambda: tracemalloc.get_traced_memory()[0])
+
+MEMORY_GROWTH = Gauge(
+    "label_memory_growth_bytes",
+    "Growth of the resident set size since the worker became ready, measured "
+    "when worker recycling is enabled.",
+)
+
+IO_POOL_WAIT = Histogram(
+    "label_io_pool_wait_seconds",
+    "Time the blocking I/O waited for a thread of the I/O pool.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+
+IO_POOL_QUEUED = Gauge(
+    "label_io_pool_queued",
+    "Blocking I/O waiting for a thread of the I/O pool.",
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "label_event_loop_lag_seconds",
+    "Delay of the callbacks scheduled on the event loop, measured periodically.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+EVENT_LOOP_BLOCKS = Counter(
+    "label_event_loop_blocks_total",
+    "Times the event loop was blocked for longer than the block threshold.",
+)
+
+PRINTER_READY = Gauge(
+    "label_printer_ready",
+    "Whether the last poll of the printer found it ready to print.",
+)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Annotated, Any
+from typing import Annotated
 
 from pydantic import BaseModel, Field
 
@@ -58,8 +58,8 @@ class TableData(BaseModel):
     align: Annotated[str, Field()] | None = None
     border: Annotated[int, Field()] | None = None
     colspan: Annotated[int, Field()] | None = 1
+    size_pt: Annotated[float, Field()] | None = None
     skip: Annotated[bool, Field()] | None = False
-    style: Any | None = None
     value: str
 
 
@@ -69,3 +69,15 @@ class TableDataFontSetting(BaseModel):
     label: Annotated[int | float, Field()]
     value: Annotated[int | float, Field()]
     align: Annotated[str, Field()] | None = "L"
+
+
+class StoredLabel(BaseModel):
+    """Represents a label persisted as data, to be re-rendered on demand.
+
+    The template version is the hash of the template definition the label was
+    laid out with.
+    """
+
+    template_version: str
+    show_borders: bool = False
+    label_data: LabelData
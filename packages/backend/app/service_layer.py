@@ -2,15 +2,41 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import TYPE_CHECKING
-
-from .services.create.create_pdf import create_label_pdf
-from .services.print.print_pdf import print_label_pdf
-from .utils.filename import generate_random_filename
+import asyncio
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from .metrics import RENDER_REQUESTS
+from .services.create.create_pdf import (
+    get_label_content_hash,
+    render_label,
+    render_label_layout,
+    render_label_pdf,
+)
+from .services.lifecycle.admission_control import get_render_admission
+from .services.lifecycle.graceful_shutdown import get_render_tracker
+from .services.preview.preview_png import preview_label_data
+from .services.print.print_queue import get_print_queue
+from .services.print.printer_status import get_printer_poller
+from .services.profiling.stages import render_stage, request_stage
+from .services.storage.label_store import get_label_store
+from .settings import get_settings
+from .utils.blocking_io import run_blocking_io
+from .utils.filename import generate_random_filename, get_label_id
+from .utils.single_flight import SingleFlight
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     from .models import LabelData
+    from .services.create.engines import OutputFormat
+
+# Renders in flight of `create_label`, by content hash of the label.
+_render_single_flight: SingleFlight[str, tuple[str, str]] = SingleFlight()
+# Labels being persisted after their response, referenced until done.
+_background_tasks: set[asyncio.Task[str]] = set()
 
 
 def validate_label_data(label_data: LabelData) -> None:
@@ -25,43 +51,377 @@ def validate_label_data(label_data: LabelData) -> None:
         ValueError: If the label data is invalid.
 
     """
-    if label_data.lens_specs.left is None and label_data.lens_specs.right is None:
-        error_message = (
-            "At least one between left and right lens specs should be defined."
+    with render_stage("validate"):
+        if label_data.lens_specs.left is None and label_data.lens_specs.right is None:
+            error_message = (
+                "At least one between left and right lens specs should be defined."
+            )
+            raise ValueError(
+                error_message,
+            )
+
+
+def _persist_label(
+    pdf_filename: str,
+    label_data: LabelData,
+    pdf_bytes: bytes,
+    show_borders: bool = False,
+) -> str:
+    """Persist a label rendered in memory, according to the storage mode.
+
+    Args:
+    ----
+        pdf_filename (str): The filename of the label.
+        label_data (LabelData): The complete label data.
+        pdf_bytes (bytes): The content of the PDF label.
+        show_borders (bool): Whether the label was rendered with debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        str: The path of the persisted label.
+
+    """
+    label_store = get_label_store()
+    if get_settings().storage_mode == "data":
+        record_path = label_store.save_record(
+            pdf_filename,
+            label_data,
+            show_borders=show_borders,
+            pdf_bytes=pdf_bytes,
         )
-        raise ValueError(
-            error_message,
+        return str(record_path)
+
+    label_store.save_record(pdf_filename, label_data, show_borders=show_borders)
+
+    return str(label_store.save_pdf(pdf_filename, pdf_bytes))
+
+
+def _persist_label_in_background(
+    pdf_filename: str,
+    label_data: LabelData,
+    pdf_bytes: bytes,
+    show_borders: bool = False,
+) -> asyncio.Task[str]:
+    """Persist a label rendered in memory in a worker thread, tracked as a render.
+
+    The label is cached in memory meanwhile, so that it can be downloaded or
+    printed again before it reaches the disk.
+
+    Args:
+    ----
+        pdf_filename (str): The filename of the label.
+        label_data (LabelData): The complete label data.
+        pdf_bytes (bytes): The content of the PDF label.
+        show_borders (bool): Whether the label was rendered with debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        asyncio.Task[str]: The persistence, resolving to the path of the label.
+
+    """
+    get_label_store().cache.put(get_label_id(pdf_filename), pdf_bytes)
+
+    # The tracking starts now, so that a shutdown waits for the persistence.
+    tracking = ExitStack()
+    tracking.enter_context(get_render_tracker().track())
+
+    def persisted(task: asyncio.Task[str]) -> None:
+        tracking.close()
+        _background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Persisting label {pdf_filename} failed: {task.exception()}")
+
+    task = asyncio.get_running_loop().create_task(
+        run_blocking_io(
+            _persist_label,
+            pdf_filename,
+            label_data,
+            pdf_bytes,
+            show_borders,
+        ),
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(persisted)
+
+    return task
+
+
+def _new_label_filename() -> str:
+    """Pick a random filename that no stored label uses, blocking on the disk.
+
+    Returns
+    -------
+        str: The filename of the new label.
+
+    """
+    # Bulk imports create many labels per second: avoid filename collisions.
+    label_store = get_label_store()
+    pdf_filename = generate_random_filename()
+    while label_store.pdf_path(pdf_filename).exists() or label_store.has_record(
+        pdf_filename,
+    ):
+        pdf_filename = generate_random_filename()
+
+    return pdf_filename
+
+
+async def store_label(
+    label_data: LabelData,
+    show_borders: bool = False,
+    executor: Executor | None = None,
+) -> tuple[str, str]:
+    """Render and persist a label under a new random filename.
+
+    The label is rendered in memory, in a worker thread or in the given
+    executor, and the filesystem work runs in the I/O thread pool.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        show_borders (bool): If True, borders will be shown on the generated
+            label for debugging purposes. Defaults to False.
+        executor (Executor | None): The executor rendering the label, e.g. the
+            import process pool. If None, a worker thread renders it.
+            Defaults to None.
+
+    Returns:
+    -------
+        tuple[str, str]: The path of the persisted label and its filename.
+
+    """
+    pdf_filename = await run_blocking_io(_new_label_filename)
+    if executor is None:
+        pdf_bytes = await asyncio.to_thread(render_label_pdf, label_data, show_borders)
+    else:
+        pdf_bytes = await asyncio.get_running_loop().run_in_executor(
+            executor,
+            render_label_pdf,
+            label_data,
+            show_borders,
         )
 
+    pdf_path = await run_blocking_io(
+        _persist_label,
+        pdf_filename,
+        label_data,
+        pdf_bytes,
+        show_borders,
+    )
+
+    return pdf_path, pdf_filename
+
+
+async def _render_and_store_label(
+    label_data: LabelData,
+    show_borders: bool = False,
+    executor: Executor | None = None,
+) -> tuple[str, str]:
+    """Render and persist a label, tracked as a render.
+
+    The render waits for a slot of the render admission controller.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        show_borders (bool): If True, borders will be shown on the generated
+            label for debugging purposes. Defaults to False.
+        executor (Executor | None): The executor rendering the label. If None,
+            a worker thread renders it. Defaults to None.
+
+    Returns:
+    -------
+        tuple[str, str]: The path of the persisted label and its filename.
+
+    """
+    async with get_render_admission().admit():
+        with get_render_tracker().track():
+            return await store_label(
+                label_data,
+                show_borders=show_borders,
+                executor=executor,
+            )
+
 
 async def create_label(
     label_data: LabelData,
     show_borders: bool = False,
+    executor: Executor | None = None,
 ) -> tuple[str, str]:
     """Generate a label PDF from the provided data.
 
-    This function takes label data, creates a PDF file for it.
+    This function takes label data, creates a PDF file for it. Identical
+    requests arriving while the label is being rendered, e.g. a double submit,
+    share its result instead of rendering it again.
 
     Args:
     ----
         label_data (LabelData): The complete label data.
         show_borders (bool): If True, borders will be shown on the generated
             label for debugging purposes. Defaults to False.
+        executor (Executor | None): The executor rendering the label, e.g. the
+            import process pool. If None, a worker thread renders it.
+            Defaults to None.
 
     Returns:
     -------
         str: The file path of the generated PDF label.
 
     """
-    pdf_filename = generate_random_filename()
+    result, shared = await _render_single_flight.do(
+        get_label_content_hash(label_data, show_borders=show_borders),
+        lambda: _render_and_store_label(
+            label_data,
+            show_borders=show_borders,
+            executor=executor,
+        ),
+    )
+    RENDER_REQUESTS.labels(outcome="coalesced" if shared else "rendered").inc()
 
-    pdf_path = create_label_pdf(
-        pdf_filename,
+    return result
+
+
+async def get_label_pdf(pdf_filename: str) -> bytes:
+    """Load the PDF of a stored label, re-rendering it if stored as data.
+
+    Args:
+    ----
+        pdf_filename (str): The filename (or id) of the label.
+
+    Returns:
+    -------
+        bytes: The content of the PDF label.
+
+    """
+    return await run_blocking_io(get_label_store().load_pdf, pdf_filename)
+
+
+async def get_label_preview(pdf_filename: str, dpi: int) -> bytes:
+    """Get the PNG thumbnail of a stored label, drawn from its data record.
+
+    Args:
+    ----
+        pdf_filename (str): The filename (or id) of the label.
+        dpi (int): The resolution of the thumbnail.
+
+    Raises:
+    ------
+        FileNotFoundError: If the label has not been persisted.
+        RuntimeError: If the label was persisted as a PDF only, without data.
+
+    Returns:
+    -------
+        bytes: The content of the PNG image.
+
+    """
+    label_store = get_label_store()
+    try:
+        record = await run_blocking_io(label_store.load_record, pdf_filename)
+    except FileNotFoundError:
+        if not await run_blocking_io(label_store.pdf_path(pdf_filename).exists):
+            raise
+        error_message = (
+            f"Label {pdf_filename} was stored without its data, "
+            "its preview cannot be drawn."
+        )
+        raise RuntimeError(error_message) from FileNotFoundError
+
+    return await create_label_preview(
+        record.label_data,
+        dpi=dpi,
+        show_borders=record.show_borders,
+    )
+
+
+async def create_label_preview(
+    label_data: LabelData,
+    dpi: int,
+    show_borders: bool = False,
+) -> bytes:
+    """Get the PNG thumbnail of a label, without persisting it.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        dpi (int): The resolution of the thumbnail.
+        show_borders (bool): If True, borders will be shown on the generated
+            label for debugging purposes. Defaults to False.
+
+    Returns:
+    -------
+        bytes: The content of the PNG image.
+
+    """
+    async with get_render_admission().admit():
+        with get_render_tracker().track():
+            return await asyncio.to_thread(
+                preview_label_data,
+                label_data,
+                dpi=dpi,
+                show_borders=show_borders,
+            )
+
+
+async def create_label_layout(
+    label_data: LabelData,
+    show_borders: bool = False,
+) -> dict[str, Any]:
+    """Get the layout of a label, without rendering nor persisting it.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        show_borders (bool): If True, the layout includes the debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        dict[str, Any]: The unit and size of the page, and the boxes of the
+            text lines and images, with absolute coordinates.
+
+    """
+    layout = await asyncio.to_thread(
+        render_label_layout,
         label_data,
         show_borders=show_borders,
     )
 
-    return pdf_path, pdf_filename
+    return layout.to_dict()
+
+
+async def render_label_output(
+    label_data: LabelData,
+    output_format: OutputFormat,
+    dpi: int,
+    show_borders: bool = False,
+) -> bytes:
+    """Render a label in an output format, without persisting it.
+
+    The layout of the label is cached, so that rendering it again, in any
+    format, only runs the output engine.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        output_format (OutputFormat): The output format.
+        dpi (int): The resolution of the bitmap formats.
+        show_borders (bool): If True, borders will be shown on the generated
+            label for debugging purposes. Defaults to False.
+
+    Returns:
+    -------
+        bytes: The content of the output.
+
+    """
+    async with get_render_admission().admit():
+        return await asyncio.to_thread(
+            render_label,
+            label_data,
+            output_format,
+            show_borders=show_borders,
+            dpi=dpi,
+        )
 
 
 async def print_label(
@@ -69,6 +429,8 @@ async def print_label(
 ) -> tuple[str, str]:
     """Print a label from a given PDF file path.
 
+    The label is sent to the printer through the print queue.
+
     Args:
     ----
         pdf_path (str): The path to the PDF file to be printed.
@@ -79,25 +441,24 @@ async def print_label(
         str: The path of the printed PDF file.
 
     """
-    current_dir = Path(__file__).parent
-    output_local_path = "services/pdf_output"
-    full_path = current_dir / output_local_path / pdf_path
+    get_printer_poller().ensure_ready()
+    with request_stage("print"):
+        printed_path = await get_print_queue().submit(pdf_path)
 
-    print_label_pdf(file_path=str(full_path), file_name=pdf_path)
-
-    return str(full_path), pdf_path
+    return printed_path, pdf_path
 
 
 async def create_print_label(
     label_data: LabelData,
     print_disabled: bool = False,
     show_borders: bool = False,
-) -> tuple[str, str]:
+    persist: bool | None = None,
+) -> tuple[str | None, str]:
     """Generate and prints a label PDF from the provided data.
 
-    This function takes label data, creates a PDF file for it,
-    and then sends it to the printer. It can also be used to just
-    generate the PDF without printing.
+    This function takes label data, renders it in memory and pipes it to the
+    printer, persisting it in the background if enabled. It can also be
+    used to just generate the PDF without printing.
 
     Args:
     ----
@@ -106,23 +467,69 @@ async def create_print_label(
             and only the PDF will be generated. Defaults to False.
         show_borders (bool): If True, borders will be shown on the generated
             label for debugging purposes. Defaults to False.
+        persist (bool | None): Whether the label is persisted. If None, the
+            `persist_printed_labels` setting applies. Defaults to None.
 
     Returns:
     -------
-        str: The file path of the generated PDF label.
+        tuple[str | None, str]: The path the label is persisted to, None if it
+            is not persisted, and its filename.
 
     """
+    if persist is None:
+        persist = get_settings().persist_printed_labels
     pdf_filename = generate_random_filename()
+    label_store = get_label_store()
+    pdf_path = None
+    if persist:
+        pdf_path = str(
+            label_store.record_path(pdf_filename)
+            if get_settings().storage_mode == "data"
+            else label_store.pdf_path(pdf_filename),
+        )
 
-    pdf_path = create_label_pdf(
-        pdf_filename,
-        label_data,
-        show_borders=show_borders,
-    )
+    # A full print queue, or a printer unable to print, refuses the label
+    # before it is rendered.
+    print_queue = get_print_queue()
+    if not print_disabled:
+        print_queue.ensure_capacity()
+        get_printer_poller().ensure_ready()
+
+    # The print job is queued before the render stops being tracked, so that
+    # a shutdown waiting for the renders finds it in the print queue. The
+    # admission slot is only held for the render itself.
+    with get_render_tracker().track():
+        async with get_render_admission().admit():
+            pdf_bytes = await asyncio.to_thread(
+                render_label_pdf,
+                label_data,
+                show_borders=show_borders,
+            )
+        persistence = (
+            _persist_label_in_background(
+                pdf_filename,
+                label_data,
+                pdf_bytes,
+                show_borders=show_borders,
+            )
+            if persist
+            else None
+        )
 
-    if print_disabled:
-        return pdf_path, pdf_filename
+        if print_disabled:
+            return pdf_path, pdf_filename
+
+        # The label is printed from memory right away. The journal replays a
+        # job from storage after a crash, so the job is journaled only once
+        # its label is persisted.
+        printed = print_queue.enqueue(
+            pdf_filename,
+            pdf_bytes=pdf_bytes,
+            journaled=persistence is not None,
+            journal_after=persistence,
+        )
 
-    print_label_pdf(file_path=pdf_path, file_name=pdf_filename)
+    with request_stage("print"):
+        await asyncio.shield(printed)
 
     return pdf_path, pdf_filename
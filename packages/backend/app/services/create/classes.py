@@ -1,789 +1,320 @@
-"""Module with instances of Abstract classes for Single and Double lens templates."""
+"""Module with the definitions of the Single and Double lens templates."""
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import TYPE_CHECKING, Any
-
-from app.services.create.models import LabelTemplate, LensSpecType, LensSpecTypeBase
-
-if TYPE_CHECKING:
-    from app.models import LabelData
-
-
-def _select_lens_spec_type(left: bool, right: bool) -> LensSpecType:
-    """Select and return the appropriate lens spec type.
-
-    Based on whether one or two lenses are needed.
+from app.services.create.definitions import (
+    ImageField,
+    LensTableField,
+    TemplateDefinition,
+    TemplateField,
+    TextField,
+)
+from app.services.create.models import LensSpecType, LensSpecTypeBase
+from app.services.create.render_plan import RenderPlan, compile_template
+
+PRODUCER_NAME = "occhialeria"
+
+# The page of the labels, in millimeters: landscape, 50 wide and 30 high.
+PAGE_WIDTH = 50
+PAGE_HEIGHT = 30
+
+# The logo and the producer name, then the product description, fitted.
+HEADER_FIELDS: tuple[TemplateField, ...] = (
+    ImageField(x=1, y=1, w=3.5, h=3.5, name="logo.png"),
+    TextField(
+        x=4.5,
+        y=1,
+        w=20,
+        h=3,
+        text=PRODUCER_NAME.upper(),
+        font="openSansCondensedBold",
+        size=10.5,
+    ),
+    TextField(
+        x=24.5,
+        y=1,
+        w=24.5,
+        h=3,
+        text="{description}",
+        font="openSansCondensedRegular",
+        size=8,
+        align="C",
+        fit=True,
+    ),
+)
+
+
+def single_lens_template(side: LensSpecTypeBase) -> TemplateDefinition:
+    """Define the template of the labels with the lens of a single side.
 
     Args:
     ----
-        left (bool): Whether the left lens is present.
-        right (bool): Whether the right lens is present.
-
+        side (LensSpecTypeBase): The side of the lens.
 
     Returns:
     -------
-        LensSpecType: The classtype of the selected lens.
+        TemplateDefinition: The template definition.
 
     """
-    if left and right:
-        return LensSpecType.double
-
-    if left:
-        return LensSpecType.left
-
-    return LensSpecType.right
-
-
-def select_template(
-    left: bool,
-    right: bool,
-) -> tuple[type[LabelTemplate[Any]], LensSpecType]:
-    """Select and return the appropriate template class.
-
-    Based on whether one or two lenses are needed
-
-    Args:
-    ----
-        left (bool): Whether the left lens is present.
-        right (bool): Whether the right lens is present.
-
-
-    Raises:
-    ------
-        TypeError: If the selected template is not a subclass of LabelTemplate.
-
-    Returns:
-    -------
-        type[LabelTemplate]: The class of the selected template.
-
-    """
-    lens_spec_type = _select_lens_spec_type(left=left, right=right)
-    template_class = TEMPLATE_MAP[lens_spec_type]
-
-    if not issubclass(template_class, LabelTemplate):
-        raise TypeError
-    return (template_class, lens_spec_type)
-
-
-class SingleLensTemplate(LabelTemplate[None]):
-    """Concrete implementation of Template for single lens labels."""
-
-    def add_patient_section(
-        self,
-        lower_margin: float = 2,
-    ) -> tuple[float, float] | None:
-        """Add the patient information section to the PDF.
-
-        Args:
-        ----
-            lower_margin (float, optional): The lower margin. Defaults to 2.
-
-        Returns:
-        -------
-            tuple[float, float] | None: A tuple containing the x and y coordinates of
-                the bottom-right corner of the patient section.
-
-        """
-        current_y = self.pdf.get_y()
-        top_margin = 1
-
-        self.pdf.set_y(
-            current_y + top_margin,
-        )
-
-        # Patient info heading
-        self.pdf.set_x(self.pdf.l_margin)
-        patient_info_y_top = self.pdf.get_y()
-        self.pdf.set_font("openSansCondensedRegular", "", 5)
-        patient_info_heading = "Disp. medico su misura per:"
-        self.pdf.cell(
+    return TemplateDefinition(
+        name=f"single-{side.value}",
+        width=PAGE_WIDTH,
+        height=PAGE_HEIGHT,
+        fields=(
+            *HEADER_FIELDS,
+            # Patient section, name and surname on their own line
+            TextField(
+                x=1,
+                y=5,
+                w=18,
+                h=2,
+                text="Disp. medico su misura per:",
+                font="openSansCondensedRegular",
+                size=5,
+            ),
+            TextField(
+                x=1,
+                y=7,
+                w=22,
+                h=3,
+                text="{patient_info.name!c}\n{patient_info.surname!c}",
+                font="openSansBold",
+                size=8,
+                fit=True,
+            ),
+            # Production and expiration dates
+            ImageField(x=1, y=16, w=2.5, h=2.5, name="factory.svg"),
+            TextField(
+                x=3.5,
+                y=16,
+                w=7.5,
+                h=2.2,
+                text="(prod. il)",
+                font="openSansCondensedRegular",
+                size=6,
+            ),
+            TextField(
+                x=11,
+                y=16,
+                w=15,
+                h=2.5,
+                text="{production_date}",
+                font="openSansRegular",
+                size=8,
+            ),
+            ImageField(x=1, y=19.5, w=2.5, h=2.5, name="hourglass.svg"),
+            TextField(
+                x=3.5,
+                y=19.5,
+                w=7.5,
+                h=2.2,
+                text="(scade il)",
+                font="openSansCondensedRegular",
+                size=6,
+            ),
+            TextField(
+                x=11,
+                y=19.5,
+                w=15,
+                h=2.5,
+                text="{due_date}",
+                font="openSansBold",
+                size=8,
+            ),
+            # Company
+            TextField(
+                x=1,
+                y=24,
+                w=10,
+                h=2.5,
+                text="Prodotto da:",
+                font="openSansRegular",
+                size=4,
+            ),
+            TextField(
+                x=11,
+                y=24,
+                w=13,
+                h=2.5,
+                text=PRODUCER_NAME.capitalize(),
+                font="openSansRegular",
+                size=5,
+            ),
+            # Lens specifications
+            TextField(
+                x=23,
+                y=5,
+                w=10,
+                h=8,
+                text="OS" if side == LensSpecTypeBase.left else "OD",
+                font="openSansBold",
+                size=20,
+                align="C",
+            ),
+            LensTableField(x=33, y=5, side=side, width=16, col_widths=(4, 1, 8)),
+        ),
+    )
+
+
+DOUBLE_LENS_TEMPLATE = TemplateDefinition(
+    name="double",
+    width=PAGE_WIDTH,
+    height=PAGE_HEIGHT,
+    fields=(
+        *HEADER_FIELDS,
+        # Patient section, name and surname on a single line
+        TextField(
+            x=1,
+            y=4.5,
             w=18,
             h=2,
-            text=patient_info_heading,
-            align="L",
-            border=self.show_borders,
-            new_x="LMARGIN",
-            new_y="NEXT",
-        )
-
-        # Patient info
-        self.pdf.set_font("openSansBold", "", 8)
-        patient_info_name = self.label_data.patient_info.name.capitalize()
-        patient_info_surname = self.label_data.patient_info.surname.capitalize()
-        patient_info_line_height = 3
-        self.pdf.multi_cell(
-            w=22,
-            h=patient_info_line_height,
-            text=f"{patient_info_name}\n{patient_info_surname}",
-            align="L",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="TOP",
-        )
-
-        patient_info_x_right = self.pdf.get_x()
-        patient_info_y = self.pdf.get_y()
-        patient_info_lines_amount = 2
-
-        self.pdf.set_y(
-            patient_info_y
-            + (patient_info_line_height * patient_info_lines_amount)
-            + lower_margin,
-        )
-
-        return patient_info_x_right, patient_info_y_top
-
-    def add_production_info(
-        self,
-        _left_margin: float | None = None,
-        _top_margin: float | None = None,
-    ) -> None:
-        """Add the production information section to the PDF.
-
-        Args:
-        ----
-            _left_margin (float | None, optional): The left margin. Defaults to None.
-            _top_margin (float | None, optional): The top margin. Defaults to None.
-
-        """
-        lot_number_lower_margin = 1
-
-        # Production date
-        production_date_initial_x = self.pdf.get_x()
-        production_date_initial_y = self.pdf.get_y() + lot_number_lower_margin
-        self.pdf.set_xy(production_date_initial_x, production_date_initial_y)
-
-        current_dir = Path(__file__).parent
-        img_dir = current_dir / "img"
-
-        img_width = 2.5
-        img_height = 2.5
-        self.pdf.image(img_dir / "factory.svg", w=img_width, h=img_height, type="SVG")
-        self.pdf.c_margin = 0
-        self.pdf.set_xy(
-            production_date_initial_x + img_width,
-            production_date_initial_y,
-        )
-
-        self.pdf.set_font("openSansCondensedRegular", "", 6)
-        self.pdf.cell(
-            w=7.5,
-            h=2.2,
-            text="(prod. il)",
-            align="L",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        self.pdf.set_font("openSansRegular", "", 8)
-        self.pdf.cell(
-            w=15,
-            h=2.5,
-            text=self.label_data.production_date,
-            align="L",
-            border=self.show_borders,
-            new_x="LMARGIN",
-            new_y="NEXT",
-        )
-
-        production_date_lower_margin = 1
-
-        # Expiration date
-        expiration_date_initial_x = self.pdf.get_x()
-        expiration_date_initial_y = self.pdf.get_y() + production_date_lower_margin
-        self.pdf.set_xy(expiration_date_initial_x, expiration_date_initial_y)
-
-        current_dir = Path(__file__).parent
-        img_dir = current_dir / "img"
-
-        expiration_date_img_width = 2.5
-        expiration_date_img_height = 2.5
-        self.pdf.image(
-            img_dir / "hourglass.svg",
-            w=expiration_date_img_width,
-            h=expiration_date_img_height,
-            type="SVG",
-        )
-        self.pdf.c_margin = 0
-        self.pdf.set_xy(
-            expiration_date_initial_x + expiration_date_img_width,
-            expiration_date_initial_y,
-        )
-
-        self.pdf.set_font("openSansCondensedRegular", "", 6)
-        self.pdf.cell(
-            w=7.5,
-            h=2.2,
-            text="(scade il)",
-            align="L",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        self.pdf.set_font("openSansBold", "", 8)
-        self.pdf.cell(
-            w=15,
-            h=2.5,
-            text=self.label_data.due_date,
-            align="L",
-            border=self.show_borders,
-            new_x="LMARGIN",
-            new_y="NEXT",
-        )
-
-    def add_company_info(self) -> None:
-        """Add the company information section to the PDF."""
-        self.pdf.set_font("openSansRegular", "", 4)
-        company_name = self.producer_name.capitalize()
-        self.pdf.cell(
-            w=10,
-            h=2.5,
-            text="Prodotto da:",
-            align="L",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        self.pdf.set_font("openSansRegular", "", 5)
-        self.pdf.cell(
-            w=13,
-            h=2.5,
-            text=f"{company_name}",
-            align="L",
-            border=self.show_borders,
-            new_x="LMARGIN",
-            new_y="NEXT",
-        )
-
-    def _get_lens_spec_type_label(self) -> str:
-        """Get the specification for the left or right eye.
-
-        Returns
-        -------
-            str: The side label ("OS" or "OD").
-
-        """
-        return "OS" if self.lens_spec_type == LensSpecType.left else "OD"
-
-    def add_lens_specifications(
-        self,
-        lens_spec_type: LensSpecType,  # noqa: ARG002
-        left_margin: float | None = None,
-        top_margin: float | None = None,
-    ) -> None:
-        """Add the eye specifications section to the PDF.
-
-        Args:
-        ----
-            lens_spec_type (LensSpecType): The type of LensSpec.
-            left_margin (float | None, optional): The x-coordinate of the left edge of
-                the current section. Defaults to None.
-            top_margin (float | None, optional): The y-coordinate of the top edge of the
-                current section. Defaults to None.
-
-        """
-        if top_margin is not None:
-            self.pdf.set_y(top_margin)
-        if left_margin is not None:
-            self.pdf.set_x(left_margin)
-
-        # Right-Left spec
-        self.pdf.set_font("openSansBold", "", 20)
-        label = self._get_lens_spec_type_label()
-        self.pdf.cell(
-            10,
-            8,
-            label,
-            align="C",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        table_data = self._create_table_data(
-            left_or_right=self.lens_spec_type,
-            show_borders=False,
-        )
-
-        self.pdf.set_font("openSansRegular", "", 7)
-        table_borders: str = "NONE" if not self.show_borders else "ALL"
-        self.pdf.set_x(self.pdf.get_x())
-
-        with self.pdf.table(
-            width=16,
-            col_widths=(4, 1, 8),
-            line_height=2.8,  # type: ignore[arg-type]
-            align="L",
-            first_row_as_headings=False,
-            v_align="M",
-            text_align="C",
-            borders_layout=table_borders,
-        ) as table:
-            self.columns_layout(table, table_data)
-
-    def page_build(self) -> None:
-        """Build the entire PDF page by calling the section methods."""
-        self.page_setup(columns_amount=2)
-        self.load_fonts()
-        self.add_header_section()
-        patient_section_coords = self.add_patient_section()
-        if patient_section_coords is None:
-            return
-        patient_info_x_right, patient_info_y_top = patient_section_coords
-        self.add_production_info()
-
-        production_info_y_lower = self.pdf.get_y()
-        lower_margin = 2
-        self.pdf.set_y(
-            production_info_y_lower + lower_margin,
-        )
-
-        self.add_company_info()
-        self.add_lens_specifications(
-            self.lens_spec_type,
-            patient_info_x_right,
-            patient_info_y_top,
-        )
-
-
-class DoubleLensTemplate(LabelTemplate[tuple[float, float]]):
-    """Concrete implementation of Template for double lens labels."""
-
-    def __init__(
-        self,
-        label_data: LabelData,
-        lens_spec_type: LensSpecType,
-        show_borders: bool = True,
-    ) -> None:
-        """Initialise the DoubleLensTemplate.
-
-        Args:
-        ----
-            label_data (LabelData): The data for the label.
-            lens_spec_type (LensSpecType): The type of LensSpec.
-            show_borders (bool, optional): Whether to show borders. Defaults to True.
-
-        """
-        super().__init__(
-            label_data=label_data,
-            lens_spec_type=lens_spec_type,
-            show_borders=show_borders,
-        )
-        self._page_width = 48
-        self._lens_spec_width = 14
-        self._patient_info_anagraphic_max_length = 18
-
-    def _get_left_right_spec(self) -> tuple[str, str]:
-        """Get the specification for the left or right eye.
-
-        Returns
-        -------
-            tuple[str, str]: A tuple containing the side ("left" or "right")
-                and the corresponding label ("OS" or "OD").
-
-        """
-        label = "OS" if self.label_data.lens_specs.left is not None else "OD"
-        left_right = "left" if self.label_data.lens_specs.left is not None else "right"
-        return (left_right, label)
-
-    def _set_xy_custom(self, x: float | None, y: float | None) -> None:
-        """Set the x and y coordinates of the PDF.
-
-        Args:
-        ----
-            x (float | None): The x coordinate.
-            y (float | None): The y coordinate.
-
-        """
-        if x and y:
-            self.pdf.set_xy(x, y)
-            return
-
-        if x:
-            self.pdf.set_x(x)
-            return
-
-        if y:
-            self.pdf.set_y(y)
-            return
-
-    def add_patient_section(self) -> None:
-        """Add the patient information section to the PDF."""
-        current_y = self.pdf.get_y()
-        top_margin = 0.5
-
-        self.pdf.set_y(
-            current_y + top_margin,
-        )
-
-        # Patient info heading
-        self.pdf.set_x(self.pdf.l_margin)
-        self.pdf.set_font("openSansCondensedRegular", "", 5)
-        patient_info_heading = "Disp. medico su misura per:"
-        self.pdf.cell(
-            18,
-            2,
-            patient_info_heading,
-            align="L",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        # Patient info
-        self.pdf.set_font("openSansBold", "", 8)
-        patient_info_name = self.label_data.patient_info.name.capitalize()
-        patient_info_surname = self.label_data.patient_info.surname.capitalize()
-        patient_info_anagraphic = f"{patient_info_name} {patient_info_surname}"
-        patient_info_line_height = 2
-        self.pdf.cell(
+            text="Disp. medico su misura per:",
+            font="openSansCondensedRegular",
+            size=5,
+        ),
+        TextField(
+            x=19,
+            y=4.5,
             w=30,
-            h=patient_info_line_height,
-            text=patient_info_anagraphic,
-            align="L",
-            border=self.show_borders,
-            new_x="LMARGIN",
-            new_y="NEXT",
-        )
-
-    def add_left_lens(
-        self,
-        _left_margin: float | None,
-        top_margin: float | None,
-    ) -> tuple[float, float]:
-        """Add the left lens specifications section to the PDF.
-
-        Args:
-        ----
-            _left_margin (float | None): The left margin.
-            top_margin (float | None): The top margin.
-
-        Returns:
-        -------
-            tuple[float, float]: The x and y coordinates of the bottom-right corner of
-            the section.
-
-        """
-        self.pdf.set_font("openSansBold", "", 20)
-        if top_margin is not None:
-            self.pdf.set_y(top_margin)
-
-        table_data = self._create_table_data(
-            left_or_right=LensSpecTypeBase.left,
-        )
-
-        self.pdf.set_font("openSansRegular", "", 7)
-        table_borders: str = "NONE" if not self.show_borders else "ALL"
-
-        left_lens_spec_x_left = self.pdf.get_x()
-        left_lens_spec_x_right = left_lens_spec_x_left + self._lens_spec_width
-        left_lens_spec_y_top = self.pdf.get_y()
-
-        with self.pdf.table(
-            width=self._lens_spec_width,
+            h=2,
+            text="{patient_info.name!c} {patient_info.surname!c}",
+            font="openSansBold",
+            size=8,
+            fit=True,
+        ),
+        # Lens specifications, with the side designations between the tables
+        LensTableField(
+            x=1,
+            y=7,
+            side=LensSpecTypeBase.left,
+            width=14,
             col_widths=(4, 1, 7),
-            line_height=2.8,  # type: ignore[arg-type]
-            align="L",
-            first_row_as_headings=False,
-            v_align="M",
-            text_align="C",
-            borders_layout=table_borders,
-        ) as table:
-            self.columns_layout(table, table_data)
-
-        return left_lens_spec_x_right, left_lens_spec_y_top
-
-    def add_lens_spec_type(
-        self,
-        left_margin: float,
-        top_margin: float,
-    ) -> tuple[float, float]:
-        """Add the left and right lens designation to the PDF.
-
-        Args:
-        ----
-            left_margin (float): The left margin.
-            top_margin (float): The top margin.
-
-        Returns:
-        -------
-            tuple[float, float]: The x and y coordinates of the bottom-right
-                corner of the section.
-
-        """
-        self.pdf.set_xy(left_margin, top_margin)
-
-        # Eye designation
-        self.pdf.set_font("openSansBold", "", 19)
-
-        self.pdf.cell(
+            cell_borders=True,
+        ),
+        TextField(
+            x=15,
+            y=7,
             w=10,
             h=8,
             text="OS",
+            font="openSansBold",
+            size=19,
             align="C",
-            border="T,R,B",  # self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        self.pdf.cell(
+            border="TRB",
+        ),
+        TextField(
+            x=25,
+            y=7,
             w=10,
             h=8,
             text="OD",
+            font="openSansBold",
+            size=19,
             align="C",
-            border="L,T,B",  # self.show_borders,
-            new_x="RIGHT",
-            new_y="NEXT",
-        )
-
-        return self.pdf.get_x(), self.pdf.get_y()
-
-    def add_right_lens(
-        self,
-        _left_margin: float | None,
-        top_margin: float | None,
-    ) -> tuple[float, float]:
-        """Add the right lens specifications section to the PDF.
-
-        Args:
-        ----
-            _left_margin (float | None): The left margin.
-            top_margin (float | None): The top margin.
-
-        Returns:
-        -------
-            tuple[float, float]: The x and y coordinates of the bottom-right corner of
-            the section.
-
-        """
-        self.pdf.set_font("openSansBold", "", 20)
-        self._set_xy_custom(_left_margin, top_margin)
-
-        table_data = self._create_table_data(
-            left_or_right=LensSpecTypeBase.right,
-        )
-
-        self.pdf.set_font("openSansRegular", "", 7)
-        table_borders: str = "NONE" if not self.show_borders else "ALL"
-
-        with self.pdf.table(
-            width=self._lens_spec_width,
+            border="LTB",
+        ),
+        LensTableField(
+            x=35,
+            y=7,
+            side=LensSpecTypeBase.right,
+            width=14,
             col_widths=(4, 1, 7),
-            line_height=2.8,  # type: ignore[arg-type]
-            align="L",
-            first_row_as_headings=False,
-            v_align="M",
-            text_align="C",
-            borders_layout=table_borders,
-        ) as table:
-            self.columns_layout(table, table_data)
-
-        return self.pdf.get_x(), self.pdf.get_y()
-
-    def add_company_info(self) -> None:
-        """Add the company information section to the PDF."""
-        self.pdf.set_font("openSansRegular", "", 4)
-        company_name = self.producer_name.capitalize()
-        self.pdf.cell(
+            cell_borders=True,
+        ),
+        # Production and expiration dates
+        ImageField(x=16, y=17, w=2.5, h=2.5, name="factory.svg"),
+        TextField(
+            x=18.5,
+            y=17,
+            w=15,
+            h=2.5,
+            text="{production_date}",
+            font="openSansRegular",
+            size=8,
+        ),
+        ImageField(x=16, y=20.5, w=2.5, h=2.5, name="hourglass.svg"),
+        TextField(
+            x=18.5,
+            y=20.5,
+            w=15,
+            h=2.5,
+            text="{due_date}",
+            font="openSansBold",
+            size=8,
+        ),
+        # Company
+        TextField(
+            x=16,
+            y=23,
             w=8.5,
             h=2.5,
             text="Prodotto da:",
-            align="L",
-            border=self.show_borders,
-            new_x="RIGHT",
-            new_y="LAST",
-        )
-
-        self.pdf.set_font("openSansRegular", "", 5)
-        self.pdf.cell(
+            font="openSansRegular",
+            size=4,
+        ),
+        TextField(
+            x=24.5,
+            y=23,
             w=9.5,
             h=2.5,
-            text=f"{company_name}",
-            align="L",
-            border=self.show_borders,
-            new_x="LMARGIN",
-            new_y="NEXT",
-        )
-
-    def add_production_info(
-        self,
-        _left_margin: float | None = None,
-        _top_margin: float | None = None,
-    ) -> None:
-        """Add the production information section to the PDF.
-
-        Args:
-        ----
-            _left_margin (float | None, optional): The left margin. Defaults to None.
-            _top_margin (float | None, optional): The top margin. Defaults to None.
-
-        """
-        additional_top_margin = 1
-        additional_left_margin = 1
-
-        current_left_margin = (
-            _left_margin + additional_left_margin
-            if _left_margin is not None
-            else _left_margin
-        )
-
-        if current_left_margin is not None and _top_margin is not None:
-            self.pdf.set_xy(
-                current_left_margin,
-                _top_margin + additional_top_margin,
-            )
-
-        # Production date
-        if current_left_margin is not None:
-            self.pdf.set_xy(
-                current_left_margin,
-                self.pdf.get_y() + additional_top_margin,
-            )
-
-        production_date_initial_x = self.pdf.get_x()
-        production_date_initial_y = self.pdf.get_y()
-
-        current_dir = Path(__file__).parent
-        img_dir = current_dir / "img"
-
-        production_img_width = 2.5
-        production_img_height = 2.5
-        self.pdf.image(
-            img_dir / "factory.svg",
-            w=production_img_width,
-            h=production_img_height,
-            type="SVG",
-        )
-        self.pdf.c_margin = 0
-        self.pdf.set_xy(
-            production_date_initial_x + production_img_width,
-            production_date_initial_y,
-        )
-
-        self.pdf.set_font("openSansRegular", "", 8)
-        self.pdf.cell(
-            w=15,
-            h=2.5,
-            text=self.label_data.production_date,
-            align="L",
-            border=self.show_borders,
-            new_x="START",
-            new_y="NEXT",
-        )
-
-        # Expiration date
-        if current_left_margin is not None:
-            self.pdf.set_xy(
-                current_left_margin,
-                self.pdf.get_y() + additional_top_margin,
-            )
-
-        expiration_date_initial_x = self.pdf.get_x()
-        expiration_date_initial_y = self.pdf.get_y()
+            text=PRODUCER_NAME.capitalize(),
+            font="openSansRegular",
+            size=5,
+        ),
+    ),
+)
+
+TEMPLATE_MAP: dict[LensSpecType, TemplateDefinition] = {
+    LensSpecType.left: single_lens_template(LensSpecTypeBase.left),
+    LensSpecType.right: single_lens_template(LensSpecTypeBase.right),
+    LensSpecType.double: DOUBLE_LENS_TEMPLATE,
+}
 
-        current_dir = Path(__file__).parent
+# The templates are compiled once, when the module is first imported.
+RENDER_PLANS: dict[LensSpecType, RenderPlan] = {
+    lens_spec_type: compile_template(definition)
+    for lens_spec_type, definition in TEMPLATE_MAP.items()
+}
 
-        expiration_img_width = 2.5
-        expiration_img_height = 2.5
-        self.pdf.image(
-            img_dir / "hourglass.svg",
-            w=expiration_img_width,
-            h=expiration_img_height,
-            type="SVG",
-        )
-        self.pdf.c_margin = 0
-        self.pdf.set_xy(
-            expiration_date_initial_x + expiration_img_width,
-            expiration_date_initial_y,
-        )
 
-        self.pdf.set_font("openSansBold", "", 8)
-        self.pdf.cell(
-            w=15,
-            h=2.5,
-            text=self.label_data.due_date,
-            align="L",
-            border=self.show_borders,
-            new_x="START",
-            new_y="NEXT",
-        )
-
-        self.pdf.set_x(production_date_initial_x)
-        self.add_company_info()
+def _select_lens_spec_type(left: bool, right: bool) -> LensSpecType:
+    """Select and return the appropriate lens spec type.
 
-    def add_lens_specifications(
-        self,
-        lens_spec_type: LensSpecType,
-        left_margin: float | None = None,
-        top_margin: float | None = None,
-    ) -> tuple[float, float]:
-        """Add the eye specifications section to the PDF.
+    Based on whether one or two lenses are needed.
 
-        Args:
-        ----
-            lens_spec_type (LensSpecType): The type of LensSpec.
-            left_margin (float | None, optional): The x-coordinate of the left edge of
-                the current section. Defaults to None.
-            top_margin (float | None, optional): The y-coordinate of the top edge of the
-                current section. Defaults to None.
+    Args:
+    ----
+        left (bool): Whether the left lens is present.
+        right (bool): Whether the right lens is present.
 
-        Returns:
-        -------
-            tuple[float, float]: The x and y coordinates of the bottom-right corner of
-            the section.
 
-        """
-        method_to_call = (
-            self.add_left_lens
-            if lens_spec_type == LensSpecType.left
-            else self.add_right_lens
-        )
+    Returns:
+    -------
+        LensSpecType: The classtype of the selected lens.
 
-        return method_to_call(_left_margin=left_margin, top_margin=top_margin)
+    """
+    if left and right:
+        return LensSpecType.double
 
-    def page_build(self) -> None:
-        """Build the entire PDF page by calling the section methods."""
-        self.page_setup(columns_amount=2)
-        self.load_fonts()
-        self.add_header_section()
-        self.add_patient_section()
+    if left:
+        return LensSpecType.left
 
-        # set separator margin between patient section and lens_spec section
-        margin_separator_before_lens_spec_section = 0.5
-        top_margin = self.pdf.get_y() + margin_separator_before_lens_spec_section
+    return LensSpecType.right
 
-        # add OS lens spec section
-        left_spec_x_right, left_spec_y_top = self.add_lens_specifications(
-            lens_spec_type=LensSpecType.left,
-            top_margin=top_margin,
-        )
 
-        # add lens spec type section
-        left_right_x_right, left_right_y_bottom = self.add_lens_spec_type(
-            left_spec_x_right,
-            left_spec_y_top,
-        )
+def select_template(left: bool, right: bool) -> RenderPlan:
+    """Select and return the render plan of the appropriate template.
 
-        # add OD lens spec section
-        self.add_lens_specifications(
-            lens_spec_type=LensSpecType.right,
-            left_margin=left_right_x_right,
-            top_margin=left_spec_y_top,
-        )
+    Based on whether one or two lenses are needed
 
-        self.add_production_info(
-            _left_margin=left_spec_x_right,
-            _top_margin=left_right_y_bottom,
-        )
+    Args:
+    ----
+        left (bool): Whether the left lens is present.
+        right (bool): Whether the right lens is present.
 
+    Returns:
+    -------
+        RenderPlan: The compiled plan of the selected template.
 
-TEMPLATE_MAP = {
-    LensSpecType.left: SingleLensTemplate,
-    LensSpecType.right: SingleLensTemplate,
-    LensSpecType.double: DoubleLensTemplate,
-}
+    """
+    return RENDER_PLANS[_select_lens_spec_type(left=left, right=right)]
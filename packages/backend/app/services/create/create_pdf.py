@@ -2,22 +2,191 @@
 
 from __future__ import annotations
 
+import hashlib
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 from app.services.create.classes import select_template
+from app.services.create.engines import (
+    DEFAULT_BITMAP_DPI,
+    OutputFormat,
+    render_layout,
+    render_layout_pdf,
+)
+from app.services.profiling.stages import render_stage
+from app.settings import get_settings
+from app.utils.lru_cache import LRUCache
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from app.models import LabelData
+    from app.services.create.layout import LabelLayout
+    from app.services.create.render_plan import RenderPlan
 
 DEBUG_BORDER = True
 
-PRODUCER_NAME = "occhialeria"
+
+def get_render_plan(label_data: LabelData) -> RenderPlan:
+    """Select the compiled template of the label, by its lenses.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+
+    Raises:
+    ------
+        ValueError: If the label data has no lens specs.
+
+    Returns:
+    -------
+        RenderPlan: The render plan of the template.
+
+    """
+    lens_specs = getattr(label_data, "lens_specs", None)
+    if lens_specs is None:
+        error_message = "Lens specs are required."
+        raise ValueError(error_message)
+
+    return select_template(
+        left=lens_specs.left is not None,
+        right=lens_specs.right is not None,
+    )
+
+
+def get_template_version(label_data: LabelData) -> str:
+    """Get the version of the template the label is laid out with.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+
+    Returns:
+    -------
+        str: The version hash of the template definition.
+
+    """
+    return get_render_plan(label_data).version
+
+
+def get_label_content_hash(label_data: LabelData, show_borders: bool = False) -> str:
+    """Hash everything that determines the rendered output of a label.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        str: The hex digest identifying the rendered label.
+
+    """
+    template_version = get_template_version(label_data)
+    content = f"{template_version}:{show_borders}:{label_data.model_dump_json()}"
+
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def render_label_pdf(
+    label_data: LabelData,
+    show_borders: bool = False,
+) -> bytes:
+    """Render a PDF label in memory, without writing it to disk.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        bytes: The content of the rendered PDF label.
+
+    """
+    layout = render_label_layout(label_data, show_borders=show_borders)
+
+    with render_stage("render"):
+        return render_layout_pdf(layout)
+
+
+@lru_cache(maxsize=1)
+def get_layout_cache() -> LRUCache[str, LabelLayout]:
+    """Return the cache of label layouts, keyed by content hash.
+
+    Returns
+    -------
+        LRUCache[str, LabelLayout]: The layout cache.
+
+    """
+    return LRUCache(max_entries=get_settings().layout_cache_size)
+
+
+def render_label_layout(
+    label_data: LabelData,
+    show_borders: bool = False,
+) -> LabelLayout:
+    """Bind the label data into its template, or get its cached layout.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        LabelLayout: The layout of the label, with absolute coordinates.
+
+    """
+    content_hash = get_label_content_hash(label_data, show_borders=show_borders)
+    layout = get_layout_cache().get(content_hash)
+    if layout is None:
+        with render_stage("layout"):
+            layout = get_render_plan(label_data).bind(
+                label_data,
+                show_borders=show_borders,
+            )
+        get_layout_cache().put(content_hash, layout)
+
+    return layout
+
+
+def render_label(
+    label_data: LabelData,
+    output_format: OutputFormat,
+    show_borders: bool = False,
+    dpi: int = DEFAULT_BITMAP_DPI,
+) -> bytes:
+    """Render a label in an output format, from its cached layout.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        output_format (OutputFormat): The output format.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+        dpi (int, optional): The resolution of the bitmap formats.
+            Defaults to DEFAULT_BITMAP_DPI.
+
+    Returns:
+    -------
+        bytes: The content of the output.
+
+    """
+    layout = render_label_layout(label_data, show_borders=show_borders)
+
+    with render_stage("render"):
+        return render_layout(layout, output_format, dpi=dpi)
 
 
 def create_label_pdf(
     output_filename: str,
     label_data: LabelData,
     show_borders: bool = False,
+    output_dir: Path | None = None,
 ) -> str:
     """Create a PDF label with the specified dimensions and data.
 
@@ -27,27 +196,19 @@ def create_label_pdf(
         label_data (LabelData): The complete label data.
         show_borders (bool, optional): Whether to show debug borders.
             Defaults to False.
+        output_dir (Path | None, optional): The directory of the output PDF
+            file. If None, the configured output directory is used.
+            Defaults to None.
 
     Returns:
     -------
         str: The absolute path to the created PDF file.
 
     """
-    # Select label template
-    lens_specs = getattr(label_data, "lens_specs", None)
-    if lens_specs is None:
-        error_message = "Lens specs are required."
-        raise ValueError(error_message)
-
-    (template_class, lens_spec_type) = select_template(
-        left=lens_specs.left is not None,
-        right=lens_specs.right is not None,
-    )
+    pdf_bytes = render_label_pdf(label_data, show_borders=show_borders)
 
-    template_instance = template_class(
-        label_data=label_data,
-        lens_spec_type=lens_spec_type,
-        show_borders=show_borders,
-    )
+    output_path = (output_dir or get_settings().pdf_output_dir) / output_filename
+    with render_stage("write"):
+        output_path.write_bytes(pdf_bytes)
 
-    return template_instance.save_template_as_pdf(output_filename)
+    return str(output_path)
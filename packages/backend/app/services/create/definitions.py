@@ -0,0 +1,139 @@
+"""Module with the declarative building blocks of the label templates.
+
+A template is a page and a list of fields at fixed positions: texts, images
+and lens specification tables. Definitions hold no logic, they are compiled
+once into a render plan that binds the label data into a layout.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from app.services.create.models import UnitValues
+
+if TYPE_CHECKING:
+    from app.services.create.models import LensSpecTypeBase
+
+IMG_DIR = Path(__file__).parent / "img"
+
+# The width of the border strokes, fpdf's default line width of 0.2 mm.
+BORDER_LINE_WIDTH = 0.2
+
+
+@dataclass(frozen=True, slots=True)
+class TextField:
+    """A text in a cell of the label, on one line or one line per row.
+
+    The text is a `str.format` template over the label data, e.g.
+    "{patient_info.name!c}", with the extra conversions "!c" to capitalize and
+    "!u" to upper case the value. A text without replacement fields is static.
+
+    Attributes
+    ----------
+        x (float): The left edge of the cell.
+        y (float): The top edge of the cell.
+        w (float): The width of the cell.
+        h (float): The height of a line of the cell.
+        text (str): The text template, with a newline between the lines.
+        font (str): The font family, as registered in the label document.
+        size (float): The font size, in points.
+        align (str, optional): The horizontal alignment, "L", "C" or "R".
+            Defaults to "L".
+        fit (bool, optional): Whether the font size shrinks, down to the
+            smallest legible size, for the lines to fit the width of the cell.
+            The lines share the size of the longest one, and validation reports
+            the lines that still overflow. Defaults to False.
+        border (str, optional): The edges of the cell always drawn, any of
+            "LTRB". Cells without edges are outlined when the debug borders
+            are shown. Defaults to "".
+
+    """
+
+    x: float
+    y: float
+    w: float
+    h: float
+    text: str
+    font: str
+    size: float
+    align: str = "L"
+    fit: bool = False
+    border: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class ImageField:
+    """An image of the `img` directory, scaled into a box of the label.
+
+    Attributes
+    ----------
+        x (float): The left edge of the box.
+        y (float): The top edge of the box.
+        w (float): The width of the box.
+        h (float): The height of the box.
+        name (str): The file name of the image.
+
+    """
+
+    x: float
+    y: float
+    w: float
+    h: float
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class LensTableField:
+    """The lens specification table of one side, one row per lens field.
+
+    Attributes
+    ----------
+        x (float): The left edge of the table.
+        y (float): The top edge of the table.
+        side (LensSpecTypeBase): The side of the lens specs in the label data.
+        width (float): The width of the table.
+        col_widths (tuple[float, float, float]): The relative width of the
+            label, separator and value columns.
+        line_height (float, optional): The height of a row. Defaults to 2.8.
+        font (str, optional): The font family of the table.
+            Defaults to "openSansRegular".
+        cell_borders (bool, optional): Whether the outer edges of the table
+            are drawn. Defaults to False.
+
+    """
+
+    x: float
+    y: float
+    side: LensSpecTypeBase
+    width: float
+    col_widths: tuple[float, float, float]
+    line_height: float = 2.8
+    font: str = "openSansRegular"
+    cell_borders: bool = False
+
+
+TemplateField = TextField | ImageField | LensTableField
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateDefinition:
+    """A label template, its page and its fields in drawing order.
+
+    Attributes
+    ----------
+        name (str): The name of the template.
+        width (float): The width of the page.
+        height (float): The height of the page.
+        fields (tuple[TemplateField, ...]): The fields of the label.
+        unit (UnitValues, optional): The unit of the coordinates.
+            Defaults to UnitValues.mm.
+
+    """
+
+    name: str
+    width: float
+    height: float
+    fields: tuple[TemplateField, ...]
+    unit: UnitValues = UnitValues.mm
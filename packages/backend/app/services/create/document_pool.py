@@ -0,0 +1,178 @@
+"""Pool of PDF documents set up up to the dynamic content of the label."""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from fpdf import FPDF
+
+
+class DocumentPool:
+    """Bounded pool of documents cloned from a prototype.
+
+    Building a label document from scratch parses the four TrueType fonts,
+    which is the most expensive step of the render before the output. The
+    pool builds a prototype once, with margins, page and fonts set up, then
+    hands out deep copies of it. A used document cannot be reset, since its
+    fonts track the glyphs it rendered, so spare copies are cloned ahead of
+    time in a background thread, up to `max_size` (about 0.3 MB each).
+
+    Attributes
+    ----------
+        max_size (int): The maximum amount of spare documents.
+
+    """
+
+    def __init__(self, factory: Callable[[], FPDF], max_size: int) -> None:
+        """Initialise the DocumentPool.
+
+        Args:
+        ----
+            factory (Callable[[], FPDF]): The function building the prototype.
+            max_size (int): The maximum amount of spare documents.
+
+        """
+        self._factory = factory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._prototype: FPDF | None = None
+        self._spares: list[FPDF] = []
+        self._replenishing = False
+
+    def __len__(self) -> int:
+        """Return the amount of spare documents."""
+        return len(self._spares)
+
+    def acquire(self) -> FPDF:
+        """Get a document ready for the dynamic content, owned by the caller.
+
+        Returns
+        -------
+            FPDF: The document.
+
+        """
+        with self._lock:
+            document = (
+                self._spares.pop()
+                if self._spares
+                else clone_document(self._get_prototype())
+            )
+            replenish = len(self._spares) < self.max_size and not self._replenishing
+            self._replenishing |= replenish
+
+        if replenish:
+            threading.Thread(target=self.replenish, daemon=True).start()
+
+        return document
+
+    def replenish(self) -> None:
+        """Clone spare documents until the pool is full.
+
+        The lock is released between clones, so that renders can take the
+        spares already cloned.
+        """
+        try:
+            while True:
+                with self._lock:
+                    if len(self._spares) >= self.max_size:
+                        return
+                    self._spares.append(clone_document(self._get_prototype()))
+        finally:
+            with self._lock:
+                self._replenishing = False
+
+    def reset_after_fork(self) -> None:
+        """Reset the lock in a forked process, keeping the inherited documents."""
+        self._lock = threading.Lock()
+        self._replenishing = False
+
+    def _get_prototype(self) -> FPDF:
+        """Get the prototype, building it on first use. Requires the lock.
+
+        Returns
+        -------
+            FPDF: The prototype.
+
+        """
+        if self._prototype is None:
+            self._prototype = self._factory()
+
+        return self._prototype
+
+
+def clone_document(prototype: FPDF) -> FPDF:
+    """Deep copy a document, giving it its own copy of the TrueType fonts.
+
+    fpdf shares the fontTools font between the copies of a document, while
+    the output subsets it in place: each clone loads the font files lazily
+    again, keeping the parsed widths and glyph ids of the prototype.
+
+    Args:
+    ----
+        prototype (FPDF): The document to clone.
+
+    Returns:
+    -------
+        FPDF: The clone.
+
+    """
+    from fontTools.ttLib import TTFont  # type: ignore[import-untyped]
+    from fpdf.fonts import TTFFont
+
+    document = copy.deepcopy(prototype)
+    for font in document.fonts.values():
+        if isinstance(font, TTFFont):
+            font.ttfont = TTFont(
+                font.ttffile,
+                recalcTimestamp=False,
+                fontNumber=font.collection_font_number,
+                lazy=True,
+            )
+
+    return document
+
+
+_pools: dict[Hashable, DocumentPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_document_pool(key: Hashable, factory: Callable[[], FPDF]) -> DocumentPool:
+    """Return the pool of documents of a page setup.
+
+    Args:
+    ----
+        key (Hashable): The key of the page setup.
+        factory (Callable[[], FPDF]): The function building the prototype, used
+            when the pool is created.
+
+    Returns:
+    -------
+        DocumentPool: The pool.
+
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = DocumentPool(factory, max_size=get_settings().document_pool_size)
+            _pools[key] = pool
+
+    return pool
+
+
+def _reset_pools_after_fork() -> None:
+    """Reset the locks inherited by a forked process, e.g. a render worker."""
+    global _pools_lock  # noqa: PLW0603
+    _pools_lock = threading.Lock()
+    for pool in _pools.values():
+        pool.reset_after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
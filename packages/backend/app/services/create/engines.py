@@ -0,0 +1,576 @@
+"""Module with the output engines, drawing a label layout into a file format.
+
+Every engine draws the same `LabelLayout`, so a label laid out once can be
+output as PDF, PNG, SVG or JSON without running the templates again.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import re
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from app.services.create.document_pool import get_document_pool
+from app.services.create.layout import Box, ImageBox, LabelLayout, TextRun
+from app.services.create.text_metrics import FONT_DIR, FONT_FILES
+
+if TYPE_CHECKING:
+    from fpdf import FPDF
+    from PIL import Image, ImageDraw, ImageFont
+
+DEFAULT_BITMAP_DPI = 203
+
+# Conversion of the units of a layout into inches.
+UNITS_PER_INCH: dict[str, float] = {"pt": 72, "mm": 25.4, "cm": 2.54, "in": 1}
+
+# fpdf places the baseline of a line of text below the middle of its cell, by
+# this fraction of the font size.
+BASELINE_OFFSET = 0.3
+
+# Segments approximating each Bézier curve of the vector images.
+CURVE_SEGMENTS = 16
+# Vector images are filled at this multiple of the resolution, then scaled
+# down, to smooth their edges.
+SUPERSAMPLING = 4
+
+SVG_PATH_TOKEN = re.compile(r"[MLHVCZmlhvcz]|-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+# The font families of the documents, by lowercase family as recorded in the
+# layout.
+_FONT_FILES_BY_KEY = {family.lower(): file for family, file in FONT_FILES.items()}
+
+
+class OutputFormat(str, Enum):
+    """Enum for the output formats of a label layout."""
+
+    pdf = "pdf"
+    png = "png"
+    svg = "svg"
+    json = "json"
+
+
+OUTPUT_MEDIA_TYPES = {
+    OutputFormat.pdf: "application/pdf",
+    OutputFormat.png: "image/png",
+    OutputFormat.svg: "image/svg+xml",
+    OutputFormat.json: "application/json",
+}
+
+
+def _get_font_size(run: TextRun, unit: str) -> float:
+    """Get the font size of a text run in the unit of the layout.
+
+    Args:
+    ----
+        run (TextRun): The text run.
+        unit (str): The unit of the layout.
+
+    Returns:
+    -------
+        float: The font size.
+
+    """
+    return run.size / 72 * UNITS_PER_INCH[unit]
+
+
+def _get_baseline(run: TextRun, unit: str) -> float:
+    """Get the vertical coordinate of the baseline of a text run, like fpdf.
+
+    Args:
+    ----
+        run (TextRun): The text run.
+        unit (str): The unit of the layout.
+
+    Returns:
+    -------
+        float: The coordinate of the baseline.
+
+    """
+    return run.y + 0.5 * run.h + BASELINE_OFFSET * _get_font_size(run, unit)
+
+
+def draw_layout(document: FPDF, layout: LabelLayout) -> None:
+    """Draw the elements of a layout on the current page of a document.
+
+    Args:
+    ----
+        document (FPDF): The document, with the fonts of the layout added.
+        layout (LabelLayout): The layout of the label.
+
+    """
+    for element in layout.elements:
+        if isinstance(element, TextRun):
+            document.set_font(element.font, "", element.size)
+            document.c_margin = element.padding
+            document.set_xy(element.x, element.y)
+            document.cell(
+                w=element.w,
+                h=element.h,
+                text=element.text,
+                align=element.align,
+            )
+        elif isinstance(element, ImageBox):
+            document.image(
+                element.path,
+                x=element.x,
+                y=element.y,
+                w=element.w,
+                h=element.h,
+            )
+        elif isinstance(element, Box):
+            document.set_line_width(element.width)
+            document.rect(element.x, element.y, element.w, element.h)
+        else:
+            document.set_line_width(element.width)
+            document.line(
+                element.x,
+                element.y,
+                element.x + element.w,
+                element.y + element.h,
+            )
+
+
+def _new_pdf_document(unit: str, width: float, height: float) -> FPDF:
+    """Create a blank PDF document with the fonts of the labels added.
+
+    Args:
+    ----
+        unit (str): The unit of the page.
+        width (float): The width of the page.
+        height (float): The height of the page.
+
+    Returns:
+    -------
+        FPDF: The document, with an empty page.
+
+    """
+    from fpdf import FPDF
+
+    document = FPDF(unit=unit, format=(width, height))
+    document.set_margins(left=0, top=0)
+    document.set_auto_page_break(auto=False)
+    document.add_page()
+    for font_family, font_file in FONT_FILES.items():
+        document.add_font(font_family, "", FONT_DIR / font_file)
+
+    return document
+
+
+def render_layout_pdf(layout: LabelLayout) -> bytes:
+    """Draw a layout into a PDF document with fpdf.
+
+    Args:
+    ----
+        layout (LabelLayout): The layout of the label.
+
+    Returns:
+    -------
+        bytes: The content of the PDF document.
+
+    """
+    pool = get_document_pool(
+        ("layout", layout.unit, layout.width, layout.height),
+        lambda: _new_pdf_document(layout.unit, layout.width, layout.height),
+    )
+    document = pool.acquire()
+    document.set_creation_date(datetime.now(timezone.utc))
+    draw_layout(document, layout)
+
+    return bytes(document.output())
+
+
+@lru_cache(maxsize=64)
+def _get_bitmap_font(font: str, size: float) -> ImageFont.FreeTypeFont:
+    """Load a font of the labels for the bitmap engine.
+
+    Args:
+    ----
+        font (str): The font family, as recorded in the layout.
+        size (float): The font size, in pixels.
+
+    Returns:
+    -------
+        ImageFont.FreeTypeFont: The font.
+
+    """
+    from PIL import ImageFont
+
+    return ImageFont.truetype(str(FONT_DIR / _FONT_FILES_BY_KEY[font]), size)
+
+
+def _draw_text_run(
+    draw: ImageDraw.ImageDraw,
+    run: TextRun,
+    unit: str,
+    scale: float,
+) -> None:
+    """Draw a text run on a bitmap, aligned in its cell like fpdf does.
+
+    Args:
+    ----
+        draw (ImageDraw.ImageDraw): The drawing context of the bitmap.
+        run (TextRun): The text run.
+        unit (str): The unit of the layout.
+        scale (float): The pixels per unit of the layout.
+
+    """
+    font = _get_bitmap_font(run.font, _get_font_size(run, unit) * scale)
+    text_width = font.getlength(run.text) / scale
+    if run.align == "R":
+        x = run.x + run.w - run.padding - text_width
+    elif run.align == "C":
+        x = run.x + (run.w - text_width) / 2
+    else:
+        x = run.x + run.padding
+    baseline = _get_baseline(run, unit) * scale
+
+    words = run.text.split(" ")
+    if run.align == "J" and len(words) > 1:
+        # Stretch the spaces for the text to fill the cell.
+        word_spacing = (run.w - 2 * run.padding - text_width) / (len(words) - 1)
+        space_width = font.getlength(" ") / scale
+        for word in words:
+            draw.text((x * scale, baseline), word, font=font, fill=0, anchor="ls")
+            x += font.getlength(word) / scale + space_width + word_spacing
+    else:
+        draw.text((x * scale, baseline), run.text, font=font, fill=0, anchor="ls")
+
+
+def _parse_svg_path(path: str) -> list[list[tuple[float, float]]]:
+    """Flatten the absolute commands of an SVG path into polygons.
+
+    Args:
+    ----
+        path (str): The path data, i.e. the `d` attribute.
+
+    Raises:
+    ------
+        ValueError: If the path uses other commands than M, L, H, V, C and Z.
+
+    Returns:
+    -------
+        list[list[tuple[float, float]]]: The points of every subpath.
+
+    """
+    tokens = SVG_PATH_TOKEN.findall(path)
+    polygons: list[list[tuple[float, float]]] = []
+    point = (0.0, 0.0)
+    index = 0
+    command = ""
+    while index < len(tokens):
+        if tokens[index].isalpha():
+            command = tokens[index]
+            index += 1
+        if command in "Zz":
+            command = ""
+            continue
+        if command not in "MLHVC":
+            error_message = f"Unsupported SVG path command: {command}"
+            raise ValueError(error_message)
+
+        arity = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6}[command]
+        values = [float(token) for token in tokens[index : index + arity]]
+        index += arity
+        if command == "M":
+            point = (values[0], values[1])
+            polygons.append([point])
+            # Coordinates following a move are lines.
+            command = "L"
+            continue
+
+        if command == "C":
+            x0, y0 = point
+            x1, y1, x2, y2, x3, y3 = values
+            for step in range(1, CURVE_SEGMENTS + 1):
+                t = step / CURVE_SEGMENTS
+                u = 1 - t
+                polygons[-1].append(
+                    (
+                        u**3 * x0 + 3 * u**2 * t * x1 + 3 * u * t**2 * x2 + t**3 * x3,
+                        u**3 * y0 + 3 * u**2 * t * y1 + 3 * u * t**2 * y2 + t**3 * y3,
+                    ),
+                )
+        elif command == "H":
+            polygons[-1].append((values[0], point[1]))
+        elif command == "V":
+            polygons[-1].append((point[0], values[0]))
+        else:
+            polygons[-1].append((values[0], values[1]))
+        point = polygons[-1][-1]
+
+    return polygons
+
+
+@lru_cache(maxsize=16)
+def _rasterize_svg(path: str, width: int, height: int) -> Image.Image:
+    """Fill the paths of a vector image into a mask, with the even-odd rule.
+
+    Only the paths of the image are drawn, which is enough for the icons of
+    the labels.
+
+    Args:
+    ----
+        path (str): The path of the SVG file.
+        width (int): The width of the mask, in pixels.
+        height (int): The height of the mask, in pixels.
+
+    Returns:
+    -------
+        Image.Image: The mask, opaque where the image is filled.
+
+    """
+    from PIL import Image, ImageChops, ImageDraw
+
+    # The images are files of the application, not input of the requests.
+    root = ElementTree.parse(path).getroot()  # noqa: S314
+    view_x, view_y, view_width, view_height = (
+        float(value) for value in root.attrib["viewBox"].split()
+    )
+    scale_x = width * SUPERSAMPLING / view_width
+    scale_y = height * SUPERSAMPLING / view_height
+
+    size = (width * SUPERSAMPLING, height * SUPERSAMPLING)
+    mask = Image.new("1", size, 0)
+    for element in root.iter("{http://www.w3.org/2000/svg}path"):
+        for polygon in _parse_svg_path(element.attrib["d"]):
+            subpath = Image.new("1", size, 0)
+            ImageDraw.Draw(subpath).polygon(
+                [((x - view_x) * scale_x, (y - view_y) * scale_y) for x, y in polygon],
+                fill=1,
+            )
+            mask = ImageChops.logical_xor(mask, subpath)
+
+    return mask.convert("L").resize((width, height), Image.Resampling.BOX)
+
+
+def _paste_image(bitmap: Image.Image, box: ImageBox, scale: float) -> None:
+    """Paste an image, scaled into its box, on a bitmap.
+
+    Args:
+    ----
+        bitmap (Image.Image): The bitmap.
+        box (ImageBox): The box of the image.
+        scale (float): The pixels per unit of the layout.
+
+    """
+    from PIL import Image
+
+    position = (round(box.x * scale), round(box.y * scale))
+    size = (max(1, round(box.w * scale)), max(1, round(box.h * scale)))
+    if box.path.endswith(".svg"):
+        bitmap.paste(
+            0,
+            (*position, position[0] + size[0], position[1] + size[1]),
+            mask=_rasterize_svg(box.path, *size),
+        )
+        return
+
+    with Image.open(box.path) as image:
+        rgba = image.convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+    bitmap.paste(rgba.convert("L"), position, mask=rgba.getchannel("A"))
+
+
+def render_layout_png(layout: LabelLayout, dpi: int = DEFAULT_BITMAP_DPI) -> bytes:
+    """Draw a layout into a grayscale PNG image with Pillow.
+
+    Args:
+    ----
+        layout (LabelLayout): The layout of the label.
+        dpi (int, optional): The resolution of the image.
+            Defaults to DEFAULT_BITMAP_DPI.
+
+    Returns:
+    -------
+        bytes: The content of the PNG image.
+
+    """
+    from PIL import Image, ImageDraw
+
+    scale = dpi / UNITS_PER_INCH[layout.unit]
+    bitmap = Image.new(
+        "L",
+        (round(layout.width * scale), round(layout.height * scale)),
+        255,
+    )
+    draw = ImageDraw.Draw(bitmap)
+    for element in layout.elements:
+        if isinstance(element, TextRun):
+            _draw_text_run(draw, element, layout.unit, scale)
+        elif isinstance(element, ImageBox):
+            _paste_image(bitmap, element, scale)
+        elif isinstance(element, Box):
+            draw.rectangle(
+                [
+                    (element.x * scale, element.y * scale),
+                    ((element.x + element.w) * scale, (element.y + element.h) * scale),
+                ],
+                outline=0,
+                width=max(1, round(element.width * scale)),
+            )
+        else:
+            draw.line(
+                [
+                    (element.x * scale, element.y * scale),
+                    ((element.x + element.w) * scale, (element.y + element.h) * scale),
+                ],
+                fill=0,
+                width=max(1, round(element.width * scale)),
+            )
+
+    output = io.BytesIO()
+    bitmap.save(output, format="PNG", dpi=(dpi, dpi))
+
+    return output.getvalue()
+
+
+def _get_svg_font_attributes(font: str) -> str:
+    """Get the SVG attributes selecting a font of the labels.
+
+    Args:
+    ----
+        font (str): The font family, as recorded in the layout.
+
+    Returns:
+    -------
+        str: The font attributes.
+
+    """
+    weight = "bold" if "bold" in font else "normal"
+    stretch = "condensed" if "condensed" in font else "normal"
+
+    return f'font-family="Open Sans" font-weight="{weight}" font-stretch="{stretch}"'
+
+
+def _get_svg_image_href(path: str) -> str:
+    """Embed an image file into a data URI.
+
+    Args:
+    ----
+        path (str): The path of the image file.
+
+    Returns:
+    -------
+        str: The data URI.
+
+    """
+    media_type = "image/svg+xml" if path.endswith(".svg") else "image/png"
+    content = base64.b64encode(Path(path).read_bytes()).decode()
+
+    return f"data:{media_type};base64,{content}"
+
+
+def render_layout_svg(layout: LabelLayout) -> bytes:
+    """Draw a layout into an SVG image, with the images embedded.
+
+    The text refers to the Open Sans fonts, which the viewer has to provide.
+
+    Args:
+    ----
+        layout (LabelLayout): The layout of the label.
+
+    Returns:
+    -------
+        bytes: The content of the SVG image.
+
+    """
+    anchors = {"C": "middle", "R": "end"}
+    lines = [
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{layout.width}{layout.unit}" height="{layout.height}{layout.unit}" '
+        f'viewBox="0 0 {layout.width} {layout.height}">',
+    ]
+    for element in layout.elements:
+        if isinstance(element, TextRun):
+            if element.align == "C":
+                x = element.x + element.w / 2
+            elif element.align == "R":
+                x = element.x + element.w - element.padding
+            else:
+                x = element.x + element.padding
+            stretch = ""
+            if element.align == "J" and " " in element.text:
+                text_length = round(element.w - 2 * element.padding, 2)
+                stretch = f' textLength="{text_length}" lengthAdjust="spacing"'
+            lines.append(
+                f'<text x="{round(x, 2)}" '
+                f'y="{round(_get_baseline(element, layout.unit), 2)}" '
+                f"{_get_svg_font_attributes(element.font)} "
+                f'font-size="{round(_get_font_size(element, layout.unit), 3)}" '
+                f'text-anchor="{anchors.get(element.align, "start")}"{stretch}>'
+                f"{escape(element.text)}</text>",
+            )
+        elif isinstance(element, ImageBox):
+            lines.append(
+                f'<image x="{element.x}" y="{element.y}" width="{element.w}" '
+                f'height="{element.h}" preserveAspectRatio="none" '
+                f"href={quoteattr(_get_svg_image_href(element.path))}/>",
+            )
+        elif isinstance(element, Box):
+            lines.append(
+                f'<rect x="{element.x}" y="{element.y}" width="{element.w}" '
+                f'height="{element.h}" fill="none" stroke="black" '
+                f'stroke-width="{element.width}"/>',
+            )
+        else:
+            lines.append(
+                f'<line x1="{element.x}" y1="{element.y}" '
+                f'x2="{round(element.x + element.w, 2)}" '
+                f'y2="{round(element.y + element.h, 2)}" stroke="black" '
+                f'stroke-width="{element.width}"/>',
+            )
+    lines.append("</svg>")
+
+    return "\n".join(lines).encode()
+
+
+def render_layout_json(layout: LabelLayout) -> bytes:
+    """Serialise a layout into JSON, e.g. for a live preview on the client.
+
+    Args:
+    ----
+        layout (LabelLayout): The layout of the label.
+
+    Returns:
+    -------
+        bytes: The JSON document of the layout.
+
+    """
+    return json.dumps(layout.to_dict()).encode()
+
+
+def render_layout(
+    layout: LabelLayout,
+    output_format: OutputFormat,
+    dpi: int = DEFAULT_BITMAP_DPI,
+) -> bytes:
+    """Draw a layout with the engine of an output format.
+
+    Args:
+    ----
+        layout (LabelLayout): The layout of the label.
+        output_format (OutputFormat): The output format.
+        dpi (int, optional): The resolution of the bitmap formats.
+            Defaults to DEFAULT_BITMAP_DPI.
+
+    Returns:
+    -------
+        bytes: The content of the output.
+
+    """
+    match output_format:
+        case OutputFormat.pdf:
+            return render_layout_pdf(layout)
+        case OutputFormat.png:
+            return render_layout_png(layout, dpi=dpi)
+        case OutputFormat.svg:
+            return render_layout_svg(layout)
+        case OutputFormat.json:
+            return render_layout_json(layout)
@@ -0,0 +1,186 @@
+"""Module with the layout of a label, laid out once and drawn by the engines.
+
+The render plans bind the label data into a `LabelLayout`, an immutable list
+of text runs, lines and images with absolute coordinates. The output engines
+draw that layout into PDF, PNG or SVG without laying the label out again.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+# Coordinates are rounded to a hundredth of the unit, i.e. 10 µm in mm.
+LAYOUT_PRECISION = 2
+
+
+def _round(value: float) -> float:
+    """Round a coordinate of the layout.
+
+    Args:
+    ----
+        value (float): The coordinate.
+
+    Returns:
+    -------
+        float: The rounded coordinate.
+
+    """
+    return round(value, LAYOUT_PRECISION)
+
+
+@dataclass(frozen=True, slots=True)
+class TextRun:
+    """A line of text in a cell of the label.
+
+    Attributes
+    ----------
+        x (float): The left edge of the cell.
+        y (float): The top edge of the cell.
+        w (float): The width of the cell.
+        h (float): The height of the cell, the text is centered vertically.
+        text (str): The text.
+        font (str): The font family, as registered in the document.
+        size (float): The font size, in points.
+        align (str): The horizontal alignment, "L", "C", "R" or "J".
+        padding (float): The horizontal padding of the text in the cell.
+
+    """
+
+    x: float
+    y: float
+    w: float
+    h: float
+    text: str
+    font: str
+    size: float
+    align: str
+    padding: float
+
+
+@dataclass(frozen=True, slots=True)
+class ImageBox:
+    """An image scaled into a box of the label.
+
+    Attributes
+    ----------
+        x (float): The left edge of the box.
+        y (float): The top edge of the box.
+        w (float): The width of the box.
+        h (float): The height of the box.
+        path (str): The path of the image file.
+
+    """
+
+    x: float
+    y: float
+    w: float
+    h: float
+    path: str
+
+
+@dataclass(frozen=True, slots=True)
+class LineSegment:
+    """A straight line, e.g. a single edge of the border of a cell.
+
+    Attributes
+    ----------
+        x (float): The horizontal coordinate of the start of the line, its top
+            left end.
+        y (float): The vertical coordinate of the start of the line.
+        w (float): The signed horizontal extent of the line, to its end.
+        h (float): The vertical extent of the line, to its end.
+        width (float): The width of the stroke.
+
+    """
+
+    x: float
+    y: float
+    w: float
+    h: float
+    width: float
+
+
+@dataclass(frozen=True, slots=True)
+class Box:
+    """The outline of a rectangle, e.g. the border of a cell.
+
+    Attributes
+    ----------
+        x (float): The left edge of the rectangle.
+        y (float): The top edge of the rectangle.
+        w (float): The width of the rectangle.
+        h (float): The height of the rectangle.
+        width (float): The width of the stroke.
+
+    """
+
+    x: float
+    y: float
+    w: float
+    h: float
+    width: float
+
+
+LayoutElement = TextRun | ImageBox | LineSegment | Box
+
+
+@dataclass(frozen=True, slots=True)
+class LabelLayout:
+    """The page of a label, laid out and ready to be drawn by an engine.
+
+    Attributes
+    ----------
+        unit (str): The unit of the coordinates, e.g. "mm".
+        width (float): The width of the page.
+        height (float): The height of the page.
+        elements (tuple[LayoutElement, ...]): The elements, in drawing order.
+
+    """
+
+    unit: str
+    width: float
+    height: float
+    elements: tuple[LayoutElement, ...]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the layout into JSON compatible boxes.
+
+        Returns
+        -------
+            dict[str, Any]: The unit and size of the page, and its boxes.
+
+        """
+        boxes: list[dict[str, Any]] = []
+        for element in self.elements:
+            box: dict[str, Any] = {
+                "x": element.x,
+                "y": element.y,
+                "w": element.w,
+                "h": element.h,
+            }
+            if isinstance(element, TextRun):
+                box = {
+                    "type": "text",
+                    **box,
+                    "text": element.text,
+                    "font": element.font,
+                    "size": element.size,
+                    "align": element.align,
+                    "padding": element.padding,
+                }
+            elif isinstance(element, ImageBox):
+                box = {"type": "image", **box, "src": Path(element.path).name}
+            elif isinstance(element, Box):
+                box = {"type": "box", **box, "width": element.width}
+            else:
+                box = {"type": "line", **box, "width": element.width}
+            boxes.append(box)
+
+        return {
+            "unit": self.unit,
+            "width": self.width,
+            "height": self.height,
+            "boxes": boxes,
+        }
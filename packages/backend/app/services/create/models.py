@@ -1,29 +1,12 @@
-"""Abstract classes for the pdf template."""
+"""Models and table helpers of the label templates."""
 
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from enum import Enum
-from pathlib import Path
-from typing import TYPE_CHECKING, Any, Generic, TypeVar
-
-from fpdf import FPDF, FontFace
-from pydantic import BaseModel
 
 from app.models import LensDataSpecs, TableData, TableDataFontSetting
-
-if TYPE_CHECKING:
-    from app.models import LabelData
-
-
-T = TypeVar("T")
-
-
-class OrientationValues(str, Enum):
-    """Enum for page orientation values."""
-
-    portrait = "P"
-    landscape = "L"
+from app.services.create.text_metrics import fit_font_size
 
 
 class UnitValues(str, Enum):
@@ -49,74 +32,126 @@ class LensSpecType(str, Enum):
     double = "double"
 
 
-class PageSetupProperties(BaseModel):
-    """Main data structure for page setup properties."""
+# Nominal font sizes of the lens specification table, shrunk to fit the cells.
+lens_spec_font_setting = TableDataFontSetting(label=7, value=7, align="L")
 
-    orientation: OrientationValues = OrientationValues.landscape
-    unit: UnitValues = UnitValues.mm
-    size: tuple[int, int] = (30, 50)
 
+# Lens fields in the order of the rows of the lens specification table.
+LENS_SPEC_TABLE_FIELDS = ("bc", "dia", "pwr", "cyl", "ax", "add", "sag", "batch")
 
-font_settings_mapping: dict[int, TableDataFontSetting] = {
-    9: TableDataFontSetting(label=7, value=6),
-    10: TableDataFontSetting(label=7, value=5),
-    11: TableDataFontSetting(label=7, value=4.5),
-}
 
-font_settings_long_int_mapping: dict[int, TableDataFontSetting] = {
-    7: TableDataFontSetting(label=6, value=6, align="C"),
-    8: TableDataFontSetting(label=6, value=6),
-    9: TableDataFontSetting(label=5, value=5),
-}
+@dataclass(frozen=True, slots=True)
+class TextBox:
+    """A single line of text laid out in a fixed width cell of the label.
 
+    Attributes
+    ----------
+        loc (str): The dotted path of the label field the text comes from.
+        text (str): The text as it is rendered.
+        font_family (str): The font family.
+        size_pt (float): The font size, in points.
+        width (float): The width available to the text, in millimeters.
+
+    """
+
+    loc: str
+    text: str
+    font_family: str
+    size_pt: float
+    width: float
 
-def _get_row_data(
+
+def _get_font_size(
+    font_family: str,
+    text: str,
+    width: float | None,
+    max_size_pt: float,
+) -> float:
+    """Get the largest font size at which the text fits its cell.
+
+    Args:
+    ----
+        font_family (str): The font family of the table.
+        text (str): The text of the cell.
+        width (float | None): The width of the cell. If None, the nominal font
+            size is used.
+        max_size_pt (float): The nominal font size.
+
+    Returns:
+    -------
+        float: The font size of the cell, in points.
+
+    """
+    if width is None:
+        return max_size_pt
+
+    return fit_font_size(font_family, text, width, max_size_pt)
+
+
+def _get_row_data(  # noqa: PLR0913
     value: str,
     label: str,
     borders: list[int],
     toric_value: str | None = None,
-    font_size_mapping: dict[int, TableDataFontSetting] | None = font_settings_mapping,
+    cell_widths: tuple[float, float, float] | None = None,
+    font_family: str = "openSansRegular",
 ) -> tuple[TableData, TableData, TableData]:
     """Create the table data for the row, with different result for toric lenses.
 
-    Returns
+    Label and value use the largest font size, up to the nominal one, at which
+    they fit the width of their cells.
+
+    Args:
+    ----
+        value (str): The value of the lens field.
+        label (str): The label of the lens field.
+        borders (list[int]): The borders of the three cells of the row.
+        toric_value (str | None, optional): The toric value of the lens field,
+            shown after the value. Defaults to None.
+        cell_widths (tuple[float, float, float] | None, optional): The width of
+            the three table columns, in millimeters. If None, the nominal font
+            sizes are used. Defaults to None.
+        font_family (str, optional): The font family of the table.
+            Defaults to "openSansRegular".
+
+    Returns:
     -------
         tuple[TableData, TableData, TableData]: The table data for the table data row.
 
     """
+    label_text = f"{label}:"
+
     if toric_value is not None:
         value = f"{value}/{toric_value}"
-        value_length = len(value)
-
-        font_size_default = TableDataFontSetting(label=7, value=7, align="L")
-        smaller_font_size_mapping = (
-            font_size_mapping.get(
-                value_length,
-                font_size_default,
-            )
-            if font_size_mapping is not None
-            else font_size_default
+        label_width = cell_widths[0] if cell_widths is not None else None
+        value_width = (
+            cell_widths[1] + cell_widths[2] if cell_widths is not None else None
         )
-        smaller_font_size_label = smaller_font_size_mapping.label
-        smaller_font_size_value = smaller_font_size_mapping.value
-        smaller_font_size_align = smaller_font_size_mapping.align
-        smaller_font_label = FontFace(size_pt=smaller_font_size_label)  # type: ignore[arg-type]
-        smaller_font_value = FontFace(size_pt=smaller_font_size_value)  # type: ignore[arg-type]
 
         return (
             TableData(
-                value=f"{label}:",
+                value=label_text,
                 border=borders[0],
                 align="C",
                 colspan=1,
-                style=smaller_font_label,
+                size_pt=_get_font_size(
+                    font_family,
+                    label_text,
+                    label_width,
+                    lens_spec_font_setting.label,
+                ),
             ),
             TableData(
                 value=value,
                 border=borders[1],
-                align=smaller_font_size_align,
+                align=lens_spec_font_setting.align,
                 colspan=2,
-                style=smaller_font_value,
+                size_pt=_get_font_size(
+                    font_family,
+                    value,
+                    value_width,
+                    lens_spec_font_setting.value,
+                ),
             ),
             TableData(
                 value=toric_value,
@@ -124,29 +159,20 @@ def _get_row_data(
             ),
         )
 
-    value_length = len(value) if font_size_mapping is not None else 0
-
-    font_size_default = TableDataFontSetting(label=7, value=7, align="L")
-    smaller_font_size_mapping = (
-        font_size_mapping.get(
-            value_length,
-            font_size_default,
-        )
-        if font_size_mapping is not None
-        else font_size_default
-    )
-    smaller_font_size_label = smaller_font_size_mapping.label
-    smaller_font_size_value = smaller_font_size_mapping.value
-    smaller_font_size_align = smaller_font_size_mapping.align
-    smaller_font_label = FontFace(size_pt=smaller_font_size_label)  # type: ignore[arg-type]
-    smaller_font_value = FontFace(size_pt=smaller_font_size_value)  # type: ignore[arg-type]
+    label_width = cell_widths[0] + cell_widths[1] if cell_widths is not None else None
+    value_width = cell_widths[2] if cell_widths is not None else None
 
     return (
         TableData(
-            value=f"{label}:",
+            value=label_text,
             border=borders[0],
             colspan=2,
-            style=smaller_font_label,
+            size_pt=_get_font_size(
+                font_family,
+                label_text,
+                label_width,
+                lens_spec_font_setting.label,
+            ),
         ),
         TableData(
             value=value,
@@ -155,7 +181,12 @@ def _get_row_data(
         TableData(
             value=value,
             border=borders[2],
-            style=smaller_font_value,
+            size_pt=_get_font_size(
+                font_family,
+                value,
+                value_width,
+                lens_spec_font_setting.value,
+            ),
         ),
     )
 
@@ -181,6 +212,8 @@ def _get_column_data(
     data: LensDataSpecs,
     left_or_right: LensSpecTypeBase | LensSpecType,
     show_borders: bool = True,
+    cell_widths: tuple[float, float, float] | None = None,
+    font_family: str = "openSansRegular",
 ) -> list[tuple[TableData, TableData, TableData]]:
     """Create the table data for the lens specifications with borders.
 
@@ -189,6 +222,11 @@ def _get_column_data(
         data (LensDataSpecs): The lens data specifications.
         left_or_right (LensSpecTypeBase): The side of the lens ("left" or "right").
         show_borders (bool): Whether to include cell borders in the generated table.
+        cell_widths (tuple[float, float, float] | None, optional): The width of
+            the three table columns, used to fit the font sizes.
+            Defaults to None.
+        font_family (str, optional): The font family of the table.
+            Defaults to "openSansRegular".
 
     Returns:
     -------
@@ -218,6 +256,8 @@ def _get_column_data(
             value=data.bc,
             toric_value=data.bc_toric,
             label="BC",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=[
@@ -230,6 +270,8 @@ def _get_column_data(
         _get_row_data(
             value=data.dia,
             label="DIA",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=[
@@ -238,11 +280,12 @@ def _get_column_data(
                     0 if left_or_right.value == "left" else 2,
                 ],
             ),
-            font_size_mapping=None,
         ),
         _get_row_data(
             value=data.pwr,
             label="Pwr",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=[
@@ -251,11 +294,12 @@ def _get_column_data(
                     0 if left_or_right.value == "left" else 2,
                 ],
             ),
-            font_size_mapping=None,
         ),
         _get_row_data(
             value=data.cyl,
             label="Cyl",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=[
@@ -264,11 +308,12 @@ def _get_column_data(
                     2,
                 ],
             ),
-            font_size_mapping=None,
         ),
         _get_row_data(
             value=data.ax,
             label="AX",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=[
@@ -277,11 +322,12 @@ def _get_column_data(
                     2,
                 ],
             ),
-            font_size_mapping=None,
         ),
         _get_row_data(
             value=data.add,
             label="ADD",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=[
@@ -290,17 +336,17 @@ def _get_column_data(
                     2,
                 ],
             ),
-            font_size_mapping=None,
         ),
         _get_row_data(
             value=data.sag,
             toric_value=data.sag_toric,
             label="SAG",
+            cell_widths=cell_widths,
+            font_family=font_family,
             borders=_get_borders(
                 show_borders=show_borders,
                 borders=one_to_last_field_borders,
             ),
-            font_size_mapping=font_settings_long_int_mapping,
         ),
     ]
 
@@ -310,289 +356,14 @@ def _get_column_data(
                 _get_row_data(
                     value=data.batch,
                     label="Lot",
+                    cell_widths=cell_widths,
+                    font_family=font_family,
                     borders=_get_borders(
                         show_borders=show_borders,
                         borders=last_border,
                     ),
-                    font_size_mapping=font_settings_long_int_mapping,
                 )
             ),
         )
 
     return column_data
-
-
-class LabelTemplate(Generic[T], ABC):
-    """Abstract base class for creating PDF labels.
-
-    This class provides a template for generating PDF labels with a specific
-    layout and structure. It includes methods for setting up the page,
-    loading fonts, and adding various sections to the label.
-
-    Attributes
-    ----------
-        pdf (FPDF): An instance of the FPDF class used to generate the PDF.
-        label_data (LabelData): An object containing the data for the label.
-        producer_name (str): The name of the producer to be displayed on the label.
-        debug_border (bool): A flag to enable or disable debug borders in the PDF.
-
-    """
-
-    def __init__(
-        self,
-        label_data: LabelData,
-        lens_spec_type: LensSpecType,
-        producer_name: str = "occhialeria",
-        page_setup_properties: PageSetupProperties | None = None,
-        show_borders: bool = True,
-    ) -> None:
-        """Initialize the Template.
-
-        Args:
-        ----
-            label_data (LabelData): The data to be included in the label.
-            lens_spec_type (LensSpecType): The type of LensSpec.
-            producer_name (str, optional): The name of the producer.
-                Defaults to "occhialeria".
-            page_setup_properties (PageSetupProperties | None, optional):
-                The page setup properties. If None, default values are used.
-                Defaults to None.
-            show_borders (bool, optional): Whether to show debug borders.
-                Defaults to True.
-
-        """
-        if page_setup_properties is None:
-            page_setup_properties = PageSetupProperties()
-
-        self.pdf = FPDF(
-            orientation=page_setup_properties.orientation.value,
-            unit=page_setup_properties.unit.value,
-            format=page_setup_properties.size,
-        )
-        self.label_data = label_data
-        self.lens_spec_type = lens_spec_type
-        self.producer_name = producer_name
-        self.show_borders = show_borders
-
-    def page_setup(self, columns_amount: int | None) -> None:
-        """Set up the page margins, auto page break, and add a new page.
-
-        Args:
-        ----
-            columns_amount (int | None): The number of columns to be used for
-                text layout. If None, no columns are set up.
-
-        """
-        self.pdf.set_margins(left=1, top=1)
-        self.pdf.set_auto_page_break(auto=False, margin=1)
-        self.pdf.c_margin = 1
-
-        self.pdf.add_page()
-        if columns_amount is not None:
-            self.pdf.text_columns(text_align="J", ncols=columns_amount)
-
-    def load_fonts(self) -> None:
-        """Load the fonts required for the PDF document.
-
-        This method loads the Open Sans font in regular, bold, and condensed
-        styles from the 'fonts' directory.
-        """
-        current_dir = Path(__file__).parent
-        font_dir = current_dir / "fonts"
-        self.pdf.add_font("openSansRegular", "", font_dir / "OpenSans-Regular.ttf")
-        self.pdf.add_font("openSansBold", "", font_dir / "OpenSans-Bold.ttf")
-        self.pdf.add_font(
-            "openSansCondensedRegular",
-            "",
-            font_dir / "OpenSans_Condensed-Regular.ttf",
-        )
-        self.pdf.add_font(
-            "openSansCondensedBold",
-            "",
-            font_dir / "OpenSans_Condensed-Bold.ttf",
-        )
-
-    def add_header_section(self) -> None:
-        """Add the header section to the PDF.
-
-        This includes the producer's logo and name, as well as the product
-        description.
-        """
-        # Producer name
-        self.pdf.set_font("openSansCondensedBold", "", 10.5)  # type: ignore[arg-type]
-        self.pdf.set_xy(self.pdf.l_margin, self.pdf.t_margin)
-
-        current_dir = Path(__file__).parent
-        img_dir = current_dir / "img"
-
-        img_width = 3.5
-        img_height = 3.5
-        self.pdf.image(img_dir / "logo.png", w=img_width, h=img_height, type="PNG")
-        self.pdf.c_margin = 0
-        self.pdf.set_xy(self.pdf.l_margin + img_width, self.pdf.t_margin)
-        self.pdf.cell(
-            w=20,
-            h=3,
-            text=self.producer_name.upper(),
-            align="L",
-            border=self.show_borders,
-        )
-
-        # Product description
-        self.pdf.set_font("openSansCondensedRegular", "", 8)
-
-        self.pdf.c_margin = 0
-        self.pdf.multi_cell(
-            w=24.5,
-            h=3,
-            text=self.label_data.description,
-            align="C",
-            border=self.show_borders,
-        )
-
-    def columns_layout(
-        self,
-        table: Any,  # noqa: ANN401
-        table_data: list[tuple[TableData, TableData, TableData]],
-    ) -> None:
-        """Layout the PDF lens specification table when three data columns are needed.
-
-        Args:
-        ----
-            table (Any): The table context/handler used to create rows and cells in
-                the PDF.
-            table_data (list[tuple[TableData, TableData, TableData]]): The sequence
-                of table rows (label, value left, value right)
-                already enriched with border information.
-
-        Returns:
-        -------
-            None
-
-        """
-        for data_row in table_data:
-            row = table.row()
-            for datum in data_row:
-                if datum.skip:
-                    continue
-
-                row.cell(
-                    datum.value,
-                    border=datum.border,
-                    align=datum.align,
-                    colspan=datum.colspan,
-                    style=datum.style,
-                )
-
-    def _create_table_data(
-        self,
-        left_or_right: LensSpecTypeBase | LensSpecType,
-        show_borders: bool = True,
-    ) -> list[tuple[TableData, TableData, TableData]]:
-        """Create the table data for the lens specifications.
-
-        Args:
-        ----
-            left_or_right (LensSpecTypeBase): The side of the lens ("left" or "right").
-            show_borders (bool): Whether to include cell borders in the generated table.
-
-        Returns:
-        -------
-            list[tuple[TableData, TableData]]: The table data.
-
-        """
-        data = getattr(self.label_data.lens_specs, left_or_right.value, None)
-        if data is None:
-            return []
-
-        return _get_column_data(
-            data=data,
-            left_or_right=left_or_right,
-            show_borders=show_borders,
-        )
-
-    @abstractmethod
-    def add_patient_section(self) -> tuple[float, float] | None:
-        """Add the patient information section to the PDF.
-
-        This method should be implemented by subclasses to add patient-specific
-        details to the label.
-
-        Returns
-        -------
-            tuple[float, float]: A tuple containing the x and y coordinates of
-                the bottom-right corner of the patient section.
-
-        """
-
-    @abstractmethod
-    def add_production_info(
-        self,
-        _left_margin: float | None,
-        _top_margin: float | None = None,
-    ) -> None:
-        """Add the production information section to the PDF.
-
-        This method should be implemented by subclasses to add production
-        details such as serial numbers, dates, etc.
-        """
-
-    @abstractmethod
-    def add_company_info(self) -> None:
-        """Add the company information section to the PDF.
-
-        This method should be implemented by subclasses to add company-specific
-        details such as address, contact information, etc.
-        """
-
-    @abstractmethod
-    def add_lens_specifications(
-        self,
-        lens_spec_type: LensSpecType,
-        left_margin: float | None = None,
-        top_margin: float | None = None,
-    ) -> T:
-        """Add the eye specifications section to the PDF.
-
-        This method should be implemented by subclasses to add detailed eye
-        prescription information.
-
-        Args:
-        ----
-            lens_spec_type (LensSpecType): The type of LensSpec.
-            left_margin (float): The x-coordinate of the right edge of
-                the current section.
-            top_margin (float): The y-coordinate of the top edge of the
-                current section.
-
-        """
-
-    @abstractmethod
-    def page_build(self) -> None:
-        """Build the entire PDF page by calling the section methods.
-
-        This method orchestrates the creation of the PDF by calling the
-        various 'add' methods in the correct order.
-        """
-
-    def save_template_as_pdf(self, output_filename: str) -> str:
-        """Save the generated PDF to a file.
-
-        Args:
-        ----
-            output_filename (str): The name of the output PDF file.
-
-        Returns:
-        -------
-            str: The absolute path to the saved PDF file.
-
-        """
-        self.page_build()
-
-        # Save PDF
-        current_dir = Path(__file__).parent.parent
-        output_local_path = "pdf_output"
-        output_path = current_dir / output_local_path / output_filename
-        self.pdf.output(str(output_path))
-
-        return str(output_path)
@@ -0,0 +1,583 @@
+"""Module compiling the label template definitions into render plans.
+
+A definition is compiled once into a `RenderPlan`: the static fields are laid
+out ahead for both border modes, the text templates are parsed and the table
+columns measured. Rendering a label is then binding its data into the plan,
+which yields the layout drawn by the output engines.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from operator import attrgetter
+from string import Formatter
+from typing import TYPE_CHECKING, Any
+
+from app.services.create.definitions import (
+    BORDER_LINE_WIDTH,
+    IMG_DIR,
+    ImageField,
+    LensTableField,
+    TextField,
+)
+from app.services.create.layout import (
+    Box,
+    ImageBox,
+    LabelLayout,
+    LineSegment,
+    TextRun,
+    _round,
+)
+from app.services.create.models import (
+    LENS_SPEC_TABLE_FIELDS,
+    TextBox,
+    _get_column_data,
+    lens_spec_font_setting,
+)
+from app.services.create.text_metrics import fit_font_size, get_metrics_digest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from app.models import LabelData, TableData
+    from app.services.create.definitions import TemplateDefinition
+    from app.services.create.layout import LayoutElement
+
+# Bump whenever a change to the compiler alters the layout of a definition,
+# the version of the plans is a hash of the definition, of the nominal sizes of
+# the lens table, of the metrics digest of the fonts and of this version.
+COMPILER_VERSION = "1"
+
+# The conversions of the text templates, on top of the value as a string.
+TEXT_CONVERSIONS: dict[str | None, Callable[[str], str]] = {
+    None: str,
+    "c": str.capitalize,
+    "u": str.upper,
+}
+
+# The bits of the edges of a table cell border, in the order fpdf draws them.
+TABLE_CELL_EDGES = (("L", 1), ("B", 8), ("R", 2), ("T", 4))
+
+
+def _edge_segments(  # noqa: PLR0913
+    x: float,
+    y: float,
+    w: float,
+    h: float,
+    edges: str,
+    width: float = BORDER_LINE_WIDTH,
+) -> list[LayoutElement]:
+    """Get the lines of some edges of a cell, in the order of the edges.
+
+    Args:
+    ----
+        x (float): The left edge of the cell.
+        y (float): The top edge of the cell.
+        w (float): The width of the cell.
+        h (float): The height of the cell.
+        edges (str): The edges, any of "L", "T", "R" and "B".
+        width (float, optional): The width of the stroke.
+            Defaults to BORDER_LINE_WIDTH.
+
+    Returns:
+    -------
+        list[LayoutElement]: The lines of the edges.
+
+    """
+    corners = {
+        "L": (x, y, 0, h),
+        "T": (x, y, w, 0),
+        "R": (x + w, y, 0, h),
+        "B": (x, y + h, w, 0),
+    }
+
+    return [
+        LineSegment(
+            x=_round(start_x),
+            y=_round(start_y),
+            w=_round(extent_x),
+            h=_round(extent_y),
+            width=width,
+        )
+        for start_x, start_y, extent_x, extent_y in (corners[edge] for edge in edges)
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class TextTemplate:
+    """A `str.format` template over the label data, parsed once.
+
+    Attributes
+    ----------
+        source (str): The template.
+        parts (tuple[tuple[str, Callable[[Any], Any] | None, str | None], ...]):
+            The literal text, the getter of the replacement field and its
+            conversion, for every part of the template.
+        fields (tuple[str, ...]): The dotted paths of the replacement fields.
+
+    """
+
+    source: str
+    parts: tuple[tuple[str, Callable[[Any], Any] | None, str | None], ...]
+    fields: tuple[str, ...]
+
+    @classmethod
+    def parse(cls, source: str) -> TextTemplate:
+        """Parse a text template.
+
+        Args:
+        ----
+            source (str): The template, e.g. "{patient_info.name!c}".
+
+        Raises:
+        ------
+            ValueError: If the template has a conversion that is not supported.
+
+        Returns:
+        -------
+            TextTemplate: The parsed template.
+
+        """
+        parts: list[tuple[str, Callable[[Any], Any] | None, str | None]] = []
+        fields = []
+        for literal, field, _format_spec, conversion in Formatter().parse(source):
+            if conversion not in TEXT_CONVERSIONS:
+                error_message = f"Unsupported conversion !{conversion} in {source!r}."
+                raise ValueError(error_message)
+            if field is None:
+                parts.append((literal, None, None))
+                continue
+            parts.append((literal, attrgetter(field), conversion))
+            fields.append(field)
+
+        return cls(source=source, parts=tuple(parts), fields=tuple(fields))
+
+    @property
+    def loc(self) -> str:
+        """The dotted path of the label data the text comes from.
+
+        The common path of the replacement fields, e.g. "patient_info" for the
+        name and the surname of the patient.
+        """
+        paths = [field.split(".") for field in self.fields]
+        common = []
+        for names in zip(*paths, strict=False):
+            if len(set(names)) > 1:
+                break
+            common.append(names[0])
+
+        return ".".join(common)
+
+    def render(self, label_data: LabelData | None) -> str:
+        """Bind the label data into the template.
+
+        Args:
+        ----
+            label_data (LabelData | None): The data for the label, None for a
+                static template.
+
+        Returns:
+        -------
+            str: The text.
+
+        """
+        text = []
+        for literal, getter, conversion in self.parts:
+            text.append(literal)
+            if getter is not None:
+                value = getter(label_data)
+                text.append(TEXT_CONVERSIONS[conversion](str(value)))
+
+        return "".join(text)
+
+
+@dataclass(frozen=True, slots=True)
+class _StaticStep:
+    """Elements laid out at compile time, for both border modes."""
+
+    elements: tuple[LayoutElement, ...]
+    debug_elements: tuple[LayoutElement, ...]
+
+    def bind(
+        self,
+        _label_data: LabelData | None,
+        show_borders: bool,
+    ) -> tuple[LayoutElement, ...]:
+        """Get the elements of the step."""
+        return self.debug_elements if show_borders else self.elements
+
+    def get_text_boxes(self, _label_data: LabelData) -> list[TextBox]:
+        """Get no text box, static texts are not checked."""
+        return []
+
+
+@dataclass(frozen=True, slots=True)
+class _TextStep:
+    """A text field, with its parsed lines and its precomputed borders."""
+
+    field: TextField
+    lines: tuple[TextTemplate, ...]
+    borders: tuple[LayoutElement, ...]
+    debug_borders: tuple[LayoutElement, ...]
+
+    @classmethod
+    def compile(cls, field: TextField) -> _TextStep:
+        """Parse the lines of a text field and lay its borders out."""
+        lines = tuple(TextTemplate.parse(line) for line in field.text.split("\n"))
+        height = field.h * len(lines)
+        borders = tuple(
+            _edge_segments(
+                field.x,
+                field.y,
+                field.w,
+                height,
+                "".join(edge for edge in "LTRB" if edge in field.border),
+            ),
+        )
+        debug_borders = borders or (
+            Box(
+                x=_round(field.x),
+                y=_round(field.y),
+                w=_round(field.w),
+                h=_round(height),
+                width=BORDER_LINE_WIDTH,
+            ),
+        )
+
+        return cls(
+            field=field,
+            lines=lines,
+            borders=borders,
+            debug_borders=debug_borders,
+        )
+
+    @property
+    def is_static(self) -> bool:
+        """Whether the text has no replacement field."""
+        return not any(line.fields for line in self.lines)
+
+    def _fit(self, label_data: LabelData | None) -> tuple[list[str], float]:
+        """Get the texts of the lines and the font size they share."""
+        field = self.field
+        texts = [line.render(label_data) for line in self.lines]
+        size = field.size
+        if field.fit:
+            size = min(
+                fit_font_size(field.font, text, field.w, field.size) for text in texts
+            )
+
+        return texts, size
+
+    def bind(
+        self,
+        label_data: LabelData | None,
+        show_borders: bool,
+    ) -> list[LayoutElement]:
+        """Lay the lines of text out, skipping the empty ones."""
+        field = self.field
+        texts, size = self._fit(label_data)
+        elements: list[LayoutElement] = [
+            TextRun(
+                x=_round(field.x),
+                y=_round(field.y + index * field.h),
+                w=_round(field.w),
+                h=_round(field.h),
+                text=text,
+                font=field.font.lower(),
+                size=size,
+                align=field.align,
+                padding=0,
+            )
+            for index, text in enumerate(texts)
+            if text
+        ]
+        elements.extend(self.debug_borders if show_borders else self.borders)
+
+        return elements
+
+    def get_text_boxes(self, label_data: LabelData) -> list[TextBox]:
+        """Get the lines of a fitted text, to be checked against the cell."""
+        if not self.field.fit:
+            return []
+
+        texts, size = self._fit(label_data)
+
+        return [
+            TextBox(
+                loc=line.loc,
+                text=text,
+                font_family=self.field.font,
+                size_pt=size,
+                width=self.field.w,
+            )
+            for line, text in zip(self.lines, texts, strict=True)
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class _LensTableStep:
+    """A lens specification table, with the width of its columns measured."""
+
+    field: LensTableField
+    col_widths: tuple[float, float, float]
+
+    @classmethod
+    def compile(cls, field: LensTableField) -> _LensTableStep:
+        """Measure the columns of a lens specification table."""
+        total_width = sum(field.col_widths)
+        label_width, separator_width, value_width = (
+            field.width * col_width / total_width for col_width in field.col_widths
+        )
+
+        return cls(
+            field=field,
+            col_widths=(label_width, separator_width, value_width),
+        )
+
+    def _rows(
+        self,
+        label_data: LabelData,
+    ) -> list[tuple[TableData, TableData, TableData]]:
+        """Get the rows of the table, with fitted font sizes and cell borders."""
+        data = getattr(label_data.lens_specs, self.field.side.value, None)
+        if data is None:
+            return []
+
+        return _get_column_data(
+            data=data,
+            left_or_right=self.field.side,
+            show_borders=self.field.cell_borders,
+            cell_widths=self.col_widths,
+            font_family=self.field.font,
+        )
+
+    def bind(
+        self,
+        label_data: LabelData,
+        _show_borders: bool,
+    ) -> list[LayoutElement]:
+        """Lay the cells of the table out, row by row."""
+        field = self.field
+        elements: list[LayoutElement] = []
+        for row_index, data_row in enumerate(self._rows(label_data)):
+            y = field.y + row_index * field.line_height
+            column = 0
+            for datum in data_row:
+                if datum.skip:
+                    continue
+
+                colspan = datum.colspan or 1
+                x = field.x + sum(self.col_widths[:column])
+                w = sum(self.col_widths[column : column + colspan])
+                column += colspan
+                elements.extend(
+                    _edge_segments(
+                        x,
+                        y,
+                        w,
+                        field.line_height,
+                        "".join(
+                            edge
+                            for edge, bit in TABLE_CELL_EDGES
+                            if (datum.border or 0) & bit
+                        ),
+                    ),
+                )
+                if datum.value:
+                    elements.append(
+                        TextRun(
+                            x=_round(x),
+                            y=_round(y),
+                            w=_round(w),
+                            h=_round(field.line_height),
+                            text=datum.value,
+                            font=field.font.lower(),
+                            size=datum.size_pt or 0,
+                            align=datum.align or "C",
+                            padding=0,
+                        ),
+                    )
+
+        return elements
+
+    def get_text_boxes(self, label_data: LabelData) -> list[TextBox]:
+        """Get the value cells of the table, to be checked against the cell."""
+        text_boxes = []
+        for lens_field, data_row in zip(
+            LENS_SPEC_TABLE_FIELDS,
+            self._rows(label_data),
+            strict=False,
+        ):
+            # The value is the first rendered cell after the label cell.
+            label_colspan = data_row[0].colspan or 1
+            value = next(datum for datum in data_row[1:] if not datum.skip)
+            value_colspan = value.colspan or 1
+            text_boxes.append(
+                TextBox(
+                    loc=f"lens_specs.{self.field.side.value}.{lens_field}",
+                    text=value.value,
+                    font_family=self.field.font,
+                    size_pt=value.size_pt or 0,
+                    width=sum(
+                        self.col_widths[label_colspan : label_colspan + value_colspan],
+                    ),
+                ),
+            )
+
+        return text_boxes
+
+
+_PlanStep = _StaticStep | _TextStep | _LensTableStep
+
+
+@dataclass(frozen=True, slots=True)
+class RenderPlan:
+    """A label template compiled for binding label data into its layout.
+
+    Attributes
+    ----------
+        name (str): The name of the template.
+        version (str): The hash of the template definition and of the font
+            metrics, changing whenever the template lays labels out
+            differently.
+        unit (str): The unit of the coordinates.
+        width (float): The width of the page.
+        height (float): The height of the page.
+        steps (tuple[_PlanStep, ...]): The steps laying the fields out, in
+            drawing order.
+
+    """
+
+    name: str
+    version: str
+    unit: str
+    width: float
+    height: float
+    steps: tuple[_PlanStep, ...]
+
+    def bind(self, label_data: LabelData, show_borders: bool = False) -> LabelLayout:
+        """Bind the label data into the plan.
+
+        Args:
+        ----
+            label_data (LabelData): The data for the label.
+            show_borders (bool, optional): Whether to show debug borders.
+                Defaults to False.
+
+        Returns:
+        -------
+            LabelLayout: The layout of the label, ready for the output engines.
+
+        """
+        elements: list[LayoutElement] = []
+        for step in self.steps:
+            elements.extend(step.bind(label_data, show_borders))
+
+        return LabelLayout(
+            unit=self.unit,
+            width=self.width,
+            height=self.height,
+            elements=tuple(elements),
+        )
+
+    def get_text_boxes(self, label_data: LabelData) -> list[TextBox]:
+        """Get the fitted texts of the label with the width of their cell.
+
+        Args:
+        ----
+            label_data (LabelData): The data for the label.
+
+        Returns:
+        -------
+            list[TextBox]: The text boxes of the label.
+
+        """
+        return [
+            text_box
+            for step in self.steps
+            for text_box in step.get_text_boxes(label_data)
+        ]
+
+
+def _compile_field(
+    field: TextField | ImageField | LensTableField,
+) -> _PlanStep:
+    """Compile a field of a template into a step of the plan.
+
+    Args:
+    ----
+        field (TextField | ImageField | LensTableField): The field.
+
+    Returns:
+    -------
+        _PlanStep: The step, static if it does not depend on the label data.
+
+    """
+    if isinstance(field, ImageField):
+        elements: tuple[LayoutElement, ...] = (
+            ImageBox(
+                x=_round(field.x),
+                y=_round(field.y),
+                w=_round(field.w),
+                h=_round(field.h),
+                path=str(IMG_DIR / field.name),
+            ),
+        )
+        return _StaticStep(elements=elements, debug_elements=elements)
+
+    if isinstance(field, LensTableField):
+        return _LensTableStep.compile(field)
+
+    text_step = _TextStep.compile(field)
+    if not text_step.is_static:
+        return text_step
+
+    return _StaticStep(
+        elements=tuple(text_step.bind(None, show_borders=False)),
+        debug_elements=tuple(text_step.bind(None, show_borders=True)),
+    )
+
+
+def compile_template(definition: TemplateDefinition) -> RenderPlan:
+    """Compile a template definition into its render plan.
+
+    Consecutive static fields are merged into a single step, so that binding
+    the data only visits the fields depending on it.
+
+    Args:
+    ----
+        definition (TemplateDefinition): The template definition.
+
+    Returns:
+    -------
+        RenderPlan: The render plan of the template.
+
+    """
+    steps: list[_PlanStep] = []
+    for field in definition.fields:
+        step = _compile_field(field)
+        previous = steps[-1] if steps else None
+        if isinstance(step, _StaticStep) and isinstance(previous, _StaticStep):
+            steps[-1] = _StaticStep(
+                elements=previous.elements + step.elements,
+                debug_elements=previous.debug_elements + step.debug_elements,
+            )
+            continue
+        steps.append(step)
+
+    version = hashlib.sha256(
+        (
+            f"{COMPILER_VERSION}:{get_metrics_digest()}:"
+            f"{lens_spec_font_setting!r}:{definition!r}"
+        ).encode(),
+    ).hexdigest()[:12]
+
+    return RenderPlan(
+        name=definition.name,
+        version=version,
+        unit=definition.unit.value,
+        width=definition.width,
+        height=definition.height,
+        steps=tuple(steps),
+    )
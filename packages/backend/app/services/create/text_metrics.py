@@ -0,0 +1,197 @@
+"""Module with cached glyph metrics of the label fonts, to measure and fit text."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from functools import lru_cache
+from pathlib import Path
+
+FONT_DIR = Path(__file__).parent / "fonts"
+
+# Font families registered in every label document, by font file.
+FONT_FILES: dict[str, str] = {
+    "openSansRegular": "OpenSans-Regular.ttf",
+    "openSansBold": "OpenSans-Bold.ttf",
+    "openSansCondensedRegular": "OpenSans_Condensed-Regular.ttf",
+    "openSansCondensedBold": "OpenSans_Condensed-Bold.ttf",
+}
+
+MM_PER_PT = 25.4 / 72
+
+# Smallest font size text is shrunk to, still legible on the printed label.
+MIN_FONT_SIZE_PT = 4.0
+
+# Fitted font sizes are rounded down to a tenth of a point.
+FIT_STEPS_PER_PT = 10
+
+# Bump whenever a change to the measuring or the fitting alters the font sizes,
+# the metrics digest is a hash of the fonts, the fitting limits and this version.
+METRICS_VERSION = "1"
+
+
+class GlyphAdvanceTable:
+    """Advance widths of the glyphs of a font, in thousandths of an em.
+
+    Widths are rounded exactly like fpdf does when it loads a TrueType font, so
+    that measured widths match the ones computed while rendering.
+
+    Attributes
+    ----------
+        widths (dict[int, int]): The advance width of every mapped code point.
+        default_width (int): The advance width of unmapped code points.
+
+    """
+
+    def __init__(self, widths: dict[int, int], default_width: int) -> None:
+        """Initialise the GlyphAdvanceTable.
+
+        Args:
+        ----
+            widths (dict[int, int]): The advance width of every mapped code point.
+            default_width (int): The advance width of unmapped code points.
+
+        """
+        self.widths = widths
+        self.default_width = default_width
+
+    @classmethod
+    def from_font_file(cls, font_path: Path) -> GlyphAdvanceTable:
+        """Read the advance widths from a TrueType font file.
+
+        Args:
+        ----
+            font_path (Path): The path of the font file.
+
+        Returns:
+        -------
+            GlyphAdvanceTable: The advance widths of the font.
+
+        """
+        from fontTools.ttLib import TTFont  # type: ignore[import-untyped]
+
+        ttfont = TTFont(font_path, lazy=True)
+        scale = 1000 / ttfont["head"].unitsPerEm
+        metrics = ttfont["hmtx"].metrics
+        widths = {
+            code_point: round(scale * metrics[glyph_name][0] + 0.001)
+            for code_point, glyph_name in ttfont.getBestCmap().items()
+        }
+        default_width = round(scale * metrics[".notdef"][0])
+        ttfont.close()
+
+        return cls(widths=widths, default_width=default_width)
+
+    def text_width(self, text: str, size_pt: float) -> float:
+        """Measure the width of a single line of text.
+
+        Args:
+        ----
+            text (str): The text to measure.
+            size_pt (float): The font size, in points.
+
+        Returns:
+        -------
+            float: The width of the text, in millimeters.
+
+        """
+        widths = self.widths
+        default_width = self.default_width
+        em_thousandths = sum(widths.get(ord(char), default_width) for char in text)
+
+        return em_thousandths * size_pt * 0.001 * MM_PER_PT
+
+
+@lru_cache(maxsize=len(FONT_FILES))
+def get_glyph_advance_table(font_family: str) -> GlyphAdvanceTable:
+    """Return the advance widths of a label font, read once per process.
+
+    Args:
+    ----
+        font_family (str): The font family, as registered in the label document.
+
+    Returns:
+    -------
+        GlyphAdvanceTable: The advance widths of the font.
+
+    """
+    return GlyphAdvanceTable.from_font_file(FONT_DIR / FONT_FILES[font_family])
+
+
+@lru_cache(maxsize=4096)
+def text_width(font_family: str, size_pt: float, text: str) -> float:
+    """Measure the width of a single line of text in a label font.
+
+    Args:
+    ----
+        font_family (str): The font family, as registered in the label document.
+        size_pt (float): The font size, in points.
+        text (str): The text to measure.
+
+    Returns:
+    -------
+        float: The width of the text, in millimeters.
+
+    """
+    return get_glyph_advance_table(font_family).text_width(text, size_pt)
+
+
+@lru_cache(maxsize=4096)
+def fit_font_size(
+    font_family: str,
+    text: str,
+    width: float,
+    max_size_pt: float,
+    min_size_pt: float = MIN_FONT_SIZE_PT,
+) -> float:
+    """Find the largest font size at which a single line of text fits a width.
+
+    Text width grows linearly with the font size, so the size is computed
+    directly from the width of the text at 1 pt, rounded down to a step of
+    1 / FIT_STEPS_PER_PT pt.
+
+    Args:
+    ----
+        font_family (str): The font family, as registered in the label document.
+        text (str): The text to fit.
+        width (float): The width available to the text, in millimeters.
+        max_size_pt (float): The nominal font size, never exceeded.
+        min_size_pt (float, optional): The smallest font size returned, even if
+            the text does not fit at that size. Defaults to MIN_FONT_SIZE_PT.
+
+    Returns:
+    -------
+        float: The font size, in points.
+
+    """
+    unit_width = get_glyph_advance_table(font_family).text_width(text, 1)
+    if unit_width <= 0 or unit_width * max_size_pt <= width:
+        return max_size_pt
+
+    fitting_size_pt = (
+        math.floor(width / unit_width * FIT_STEPS_PER_PT) / FIT_STEPS_PER_PT
+    )
+
+    return max(min_size_pt, min(max_size_pt, fitting_size_pt))
+
+
+@lru_cache(maxsize=1)
+def get_metrics_digest() -> str:
+    """Get the digest of the fonts and of the limits the text is fitted with.
+
+    The font files are read once, and the digest changes whenever a font, the
+    minimum font size, the rounding step or the metrics version changes.
+
+    Returns
+    -------
+        str: The hexadecimal SHA-256 digest.
+
+    """
+    digest = hashlib.sha256(
+        f"{METRICS_VERSION}:{MIN_FONT_SIZE_PT}:{FIT_STEPS_PER_PT}:{MM_PER_PT}".encode(),
+    )
+    for font_family, font_file in sorted(FONT_FILES.items()):
+        digest.update(font_family.encode())
+        digest.update((FONT_DIR / font_file).read_bytes())
+
+    return digest.hexdigest()
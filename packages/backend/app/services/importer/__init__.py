@@ -0,0 +1 @@
+"""Package contains modules for importing labels in bulk."""
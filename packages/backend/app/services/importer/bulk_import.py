@@ -0,0 +1,446 @@
+"""Module for the streaming bulk import of labels from CSV or NDJSON."""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from pydantic import ValidationError
+
+from app.models import LabelData, LensDataSpecs
+from app.service_layer import create_label, validate_label_data
+from app.services.lifecycle.admission_control import get_render_admission
+from app.services.validate.label_validation import format_validation_error
+from app.services.warmup.warmup import warm_up
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+
+LENS_SIDES = ("left", "right")
+
+# The server runs threads (I/O pool, profilers, loop watchdog) whose locks a
+# fork could copy while held: the workers start from a clean server process.
+IMPORT_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Lens fields that are left unset, instead of empty, when their CSV cell is empty.
+_OPTIONAL_LENS_FIELDS = {
+    name
+    for name, field in LensDataSpecs.model_fields.items()
+    if not field.is_required()
+}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+class ImportFormat(str, Enum):
+    """Enum for the supported bulk import formats."""
+
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+IMPORT_MEDIA_TYPES = {
+    "text/csv": ImportFormat.csv,
+    "application/x-ndjson": ImportFormat.ndjson,
+    "application/ndjson": ImportFormat.ndjson,
+}
+
+
+def get_import_format(content_type: str | None) -> ImportFormat:
+    """Get the import format from the request content type.
+
+    Args:
+    ----
+        content_type (str | None): The content type header of the request.
+
+    Raises:
+    ------
+        ValueError: If the content type is not supported.
+
+    Returns:
+    -------
+        ImportFormat: The import format.
+
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    import_format = IMPORT_MEDIA_TYPES.get(media_type)
+    if import_format is None:
+        supported = ", ".join(IMPORT_MEDIA_TYPES)
+        error_message = f"Unsupported content type, expected one of: {supported}."
+        raise ValueError(error_message)
+
+    return import_format
+
+
+def create_render_executor(jobs: int) -> ProcessPoolExecutor:
+    """Create a pool of processes rendering labels, for imports or the CLI.
+
+    Args:
+    ----
+        jobs (int): The amount of processes.
+
+    Returns:
+    -------
+        ProcessPoolExecutor: The process pool. Every process warms up the
+            render pipeline when it starts, if enabled.
+
+    """
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context(IMPORT_START_METHOD),
+        initializer=warm_up if get_settings().warm_up else None,
+    )
+
+
+def get_import_executor() -> ProcessPoolExecutor:
+    """Return the process pool rendering the imported labels.
+
+    Returns
+    -------
+        ProcessPoolExecutor: The process pool, created on first use.
+
+    """
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        _executor = create_render_executor(_get_import_jobs())
+    return _executor
+
+
+def shutdown_import_executor() -> None:
+    """Shut down the import process pool, if it has been created."""
+    global _executor  # noqa: PLW0603
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def _get_import_jobs() -> int:
+    """Get the amount of processes rendering the imported labels.
+
+    Returns
+    -------
+        int: The amount of processes.
+
+    """
+    return get_settings().import_jobs or os.cpu_count() or 1
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 encoded chunks into lines.
+
+    Args:
+    ----
+        chunks (AsyncIterator[bytes]): The body chunks, as they are received.
+
+    Yields:
+    ------
+        str: The lines of the body, without line terminators.
+
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def unflatten_csv_row(header: list[str], values: list[str]) -> dict[str, Any]:
+    """Convert a CSV row with dotted column names into a nested label payload.
+
+    Columns are named after the `LabelData` fields, e.g. `patient_info.name` or
+    `lens_specs.left.bc`. A lens side whose cells are all empty is omitted, as
+    are the empty cells of the optional lens fields.
+
+    Args:
+    ----
+        header (list[str]): The column names.
+        values (list[str]): The cells of the row.
+
+    Raises:
+    ------
+        ValueError: If the row does not have as many cells as the header.
+
+    Returns:
+    -------
+        dict[str, Any]: The nested label payload.
+
+    """
+    if len(values) != len(header):
+        error_message = f"Expected {len(header)} columns, got {len(values)}."
+        raise ValueError(error_message)
+
+    payload: dict[str, Any] = {}
+    for column, value in zip(header, values, strict=True):
+        *parents, field = column.strip().split(".")
+        node = payload
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[field] = value.strip()
+
+    lens_specs = payload.get("lens_specs", {})
+    for side in LENS_SIDES:
+        lens_data = lens_specs.get(side)
+        if lens_data is None:
+            continue
+        if not any(lens_data.values()):
+            del lens_specs[side]
+            continue
+        for field in _OPTIONAL_LENS_FIELDS:
+            if lens_data.get(field) == "":
+                del lens_data[field]
+
+    return payload
+
+
+async def iter_rows(
+    lines: AsyncIterator[str],
+    import_format: ImportFormat,
+) -> AsyncIterator[tuple[int, dict[str, Any] | ValueError]]:
+    """Parse the lines of the body into label payloads.
+
+    Quoted CSV cells spanning multiple lines are not supported.
+
+    Args:
+    ----
+        lines (AsyncIterator[str]): The lines of the body.
+        import_format (ImportFormat): The format of the body.
+
+    Yields:
+    ------
+        tuple[int, dict[str, Any] | ValueError]: The row number and either the
+            label payload or the error raised while parsing the row.
+
+    """
+    header: list[str] | None = None
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        if import_format == ImportFormat.csv and header is None:
+            header = next(csv.reader([line]))
+            continue
+
+        row_number += 1
+        try:
+            row = parse_row(line, header)
+        except ValueError as error:
+            yield row_number, error
+        else:
+            yield row_number, row
+
+
+def parse_row(line: str, header: list[str] | None = None) -> dict[str, Any]:
+    """Parse a line of the body into a label payload.
+
+    Args:
+    ----
+        line (str): The line, a CSV row or a JSON object.
+        header (list[str] | None, optional): The CSV column names, or None for
+            NDJSON. Defaults to None.
+
+    Raises:
+    ------
+        ValueError: If the line is not a valid row.
+
+    Returns:
+    -------
+        dict[str, Any]: The label payload.
+
+    """
+    if header is not None:
+        return unflatten_csv_row(header, next(csv.reader([line])))
+
+    row = json.loads(line)
+    if not isinstance(row, dict):
+        error_message = "Expected a JSON object."
+        raise ValueError(error_message)  # noqa: TRY004
+
+    return row
+
+
+def parse_label_data(row: dict[str, Any]) -> LabelData:
+    """Validate a label payload.
+
+    Args:
+    ----
+        row (dict[str, Any]): The label payload.
+
+    Raises:
+    ------
+        ValidationError: If the payload does not match the `LabelData` model.
+        ValueError: If the label data is invalid.
+
+    Returns:
+    -------
+        LabelData: The validated label data.
+
+    """
+    label_data = LabelData.model_validate(row)
+    validate_label_data(label_data)
+
+    return label_data
+
+
+def error_result(row_number: int, error: BaseException) -> dict[str, Any]:
+    """Build the result of a row that could not be imported.
+
+    Args:
+    ----
+        row_number (int): The row number.
+        error (BaseException): The error raised while importing the row.
+
+    Returns:
+    -------
+        dict[str, Any]: The row result.
+
+    """
+    if isinstance(error, ValidationError):
+        return {
+            "row": row_number,
+            "status": "error",
+            "errors": format_validation_error(error),
+        }
+
+    return {
+        "row": row_number,
+        "status": "error",
+        "errors": [
+            {
+                "loc": "",
+                "msg": str(error) or type(error).__name__,
+                "type": type(error).__name__,
+            },
+        ],
+    }
+
+
+async def render_rows(
+    rows: AsyncIterator[tuple[int, dict[str, Any] | ValueError]],
+    render: Callable[[int, LabelData], Awaitable[dict[str, Any]]],
+    window: int,
+) -> AsyncIterator[dict[str, Any]]:
+    """Validate and render parsed rows, with a bounded amount of rows in flight.
+
+    Rows are read only while fewer than `window` rows are in flight, so
+    neither the whole input nor all the PDFs are held in memory. Results are
+    yielded as soon as each row completes, in completion order.
+
+    Args:
+    ----
+        rows (AsyncIterator[tuple[int, dict[str, Any] | ValueError]]): The row
+            numbers and either the label payloads or their parsing errors.
+        render (Callable[[int, LabelData], Awaitable[dict[str, Any]]]): Render
+            a validated row, from its number and label data, into its result.
+        window (int): The maximum amount of rows in flight.
+
+    Yields:
+    ------
+        dict[str, Any]: The result of every row.
+
+    """
+    pending: dict[asyncio.Future[dict[str, Any]], int] = {}
+
+    def _collect(done: set[asyncio.Future[dict[str, Any]]]) -> list[dict[str, Any]]:
+        results = []
+        for future in done:
+            row_number = pending.pop(future)
+            error = future.exception()
+            results.append(
+                error_result(row_number, error)
+                if error is not None
+                else future.result(),
+            )
+        return results
+
+    async for row_number, row in rows:
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            label_data = parse_label_data(row)
+        except ValueError as error:
+            yield error_result(row_number, error)
+            continue
+
+        future = asyncio.ensure_future(render(row_number, label_data))
+        pending[future] = row_number
+
+        done = {future for future in pending if future.done()}
+        if len(pending) >= window:
+            completed, _ = await asyncio.wait(
+                pending,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            done |= completed
+
+        for result in _collect(done):
+            yield result
+
+    while pending:
+        completed, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for result in _collect(completed):
+            yield result
+
+
+async def import_labels(
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormat,
+    show_borders: bool = False,
+) -> AsyncIterator[dict[str, Any]]:
+    """Import labels from a streamed body, rendering them in parallel.
+
+    At most two rows per render process, and per slot of the render admission
+    controller, are in flight. Every row waits for a render slot, shared with
+    the other render requests, and identical rows in flight are rendered once.
+    Results are yielded as soon as each row completes, followed by a summary.
+
+    Args:
+    ----
+        chunks (AsyncIterator[bytes]): The body chunks, as they are received.
+        import_format (ImportFormat): The format of the body.
+        show_borders (bool): If True, borders will be shown on the generated
+            labels for debugging purposes. Defaults to False.
+
+    Yields:
+    ------
+        dict[str, Any]: The result of every row, then the import summary.
+
+    """
+    executor = get_import_executor()
+    window = min(_get_import_jobs(), get_render_admission().max_concurrency) * 2
+    total = failed = 0
+
+    async def render(row_number: int, label_data: LabelData) -> dict[str, Any]:
+        _, pdf_filename = await create_label(
+            label_data,
+            show_borders=show_borders,
+            executor=executor,
+        )
+        return {"row": row_number, "status": "ok", "pdf_filename": pdf_filename}
+
+    async for result in render_rows(
+        iter_rows(iter_lines(chunks), import_format),
+        render,
+        window,
+    ):
+        total += 1
+        failed += result["status"] == "error"
+        yield result
+
+    yield {"status": "done", "total": total, "ok": total - failed, "failed": failed}
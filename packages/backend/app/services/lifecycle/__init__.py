@@ -0,0 +1 @@
+"""Package contains modules for the lifecycle of the application."""
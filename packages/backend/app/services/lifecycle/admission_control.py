@@ -0,0 +1,217 @@
+"""Module for limiting the work in progress and refusing it when saturated."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTIONS
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+# Service time assumed before the first measurement, about a render on the Pi.
+INITIAL_SERVICE_TIME_SECONDS = 1.0
+
+
+class OverloadedError(Exception):
+    """Raised when new work is submitted while its queue is full.
+
+    Attributes
+    ----------
+        retry_after (int): The suggested delay before retrying, in seconds.
+
+    """
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        """Initialise the OverloadedError.
+
+        Args:
+        ----
+            message (str): The error message.
+            retry_after (int): The suggested delay before retrying, in seconds.
+
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ThroughputEstimator:
+    """Exponential moving average of the time taken by a unit of work.
+
+    Attributes
+    ----------
+        service_time (float): The estimated time of a unit of work, in seconds.
+        smoothing (float): The weight of the latest measurement.
+
+    """
+
+    def __init__(
+        self,
+        service_time: float = INITIAL_SERVICE_TIME_SECONDS,
+        smoothing: float = 0.2,
+    ) -> None:
+        """Initialise the ThroughputEstimator.
+
+        Args:
+        ----
+            service_time (float, optional): The time assumed before the first
+                measurement, in seconds. Defaults to INITIAL_SERVICE_TIME_SECONDS.
+            smoothing (float, optional): The weight of the latest measurement.
+                Defaults to 0.2.
+
+        """
+        self.service_time = service_time
+        self.smoothing = smoothing
+
+    def observe(self, duration: float) -> None:
+        """Add the time taken by a unit of work to the average.
+
+        Args:
+        ----
+            duration (float): The time taken, in seconds.
+
+        """
+        self.service_time += self.smoothing * (duration - self.service_time)
+
+    def retry_after(self, backlog: int, workers: int) -> int:
+        """Estimate the time to work through a backlog.
+
+        Args:
+        ----
+            backlog (int): The amount of work in progress and queued.
+            workers (int): The amount of work processed concurrently.
+
+        Returns:
+        -------
+            int: The estimated time, in whole seconds and at least 1.
+
+        """
+        return max(1, math.ceil(backlog * self.service_time / max(workers, 1)))
+
+
+class AdmissionController:
+    """Limit of the work in progress, with a bounded queue of waiting work.
+
+    Work beyond the concurrency limit waits for a slot, in arrival order. Work
+    arriving when the queue is full is refused, with a retry delay of the time
+    needed to work through the backlog at the measured throughput.
+
+    Attributes
+    ----------
+        work (str): The kind of work, used as metrics label.
+        max_concurrency (int): The maximum amount of work in progress.
+        max_queued (int): The maximum amount of work waiting for a slot.
+        in_flight (int): The amount of work in progress.
+        queued (int): The amount of work waiting for a slot.
+        estimator (ThroughputEstimator): The estimator of the service time.
+
+    """
+
+    def __init__(self, work: str, max_concurrency: int, max_queued: int) -> None:
+        """Initialise the AdmissionController.
+
+        Args:
+        ----
+            work (str): The kind of work, used as metrics label.
+            max_concurrency (int): The maximum amount of work in progress.
+            max_queued (int): The maximum amount of work waiting for a slot.
+
+        """
+        self.work = work
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queued = max(max_queued, 0)
+        self.in_flight = 0
+        self.queued = 0
+        self.estimator = ThroughputEstimator()
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the context, waiting for it if needed.
+
+        Raises
+        ------
+            OverloadedError: If the queue of waiting work is full.
+
+        Yields
+        ------
+            None
+
+        """
+        slots = self._get_slots()
+        if self.in_flight + self.queued >= self.max_concurrency + self.max_queued:
+            ADMISSION_REJECTIONS.labels(work=self.work).inc()
+            error_message = f"Too many {self.work} requests, retry later."
+            raise OverloadedError(
+                error_message,
+                retry_after=self.estimator.retry_after(
+                    self.in_flight + self.queued,
+                    self.max_concurrency,
+                ),
+            )
+
+        self._set_queued(self.queued + 1)
+        try:
+            await slots.acquire()
+        finally:
+            self._set_queued(self.queued - 1)
+
+        self._set_in_flight(self.in_flight + 1)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.estimator.observe(time.perf_counter() - start)
+            self._set_in_flight(self.in_flight - 1)
+            slots.release()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Get the slots of the running event loop, creating them if needed.
+
+        Returns
+        -------
+            asyncio.Semaphore: The slots.
+
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._set_in_flight(0)
+            self._set_queued(0)
+
+        return self._slots
+
+    def _set_in_flight(self, in_flight: int) -> None:
+        """Update the amount of work in progress and its metric."""
+        self.in_flight = in_flight
+        ADMISSION_IN_FLIGHT.labels(work=self.work).set(in_flight)
+
+    def _set_queued(self, queued: int) -> None:
+        """Update the amount of waiting work and its metric."""
+        self.queued = queued
+        ADMISSION_QUEUED.labels(work=self.work).set(queued)
+
+
+@lru_cache(maxsize=1)
+def get_render_admission() -> AdmissionController:
+    """Return the admission controller of the label renders.
+
+    Returns
+    -------
+        AdmissionController: The render admission controller.
+
+    """
+    settings = get_settings()
+    return AdmissionController(
+        "render",
+        max_concurrency=settings.max_concurrent_renders,
+        max_queued=settings.max_queued_renders,
+    )
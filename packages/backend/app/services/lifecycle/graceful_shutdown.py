@@ -0,0 +1,99 @@
+"""Module for tracking in-flight work, to drain it on shutdown."""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class ShuttingDownError(RuntimeError):
+    """Raised when new work is submitted while the application shuts down."""
+
+
+class InFlightTracker:
+    """Counter of the work in progress, which refuses new work once stopped.
+
+    Attributes
+    ----------
+        accepting (bool): Whether new work is accepted.
+        in_flight (int): The amount of work in progress.
+        completed (int): The amount of work completed since the start.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialise the InFlightTracker."""
+        self._idle = threading.Condition()
+        self.accepting = True
+        self.in_flight = 0
+        self.completed = 0
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Track a unit of work for the duration of the context.
+
+        Raises
+        ------
+            ShuttingDownError: If the tracker no longer accepts new work.
+
+        Yields
+        ------
+            None
+
+        """
+        with self._idle:
+            if not self.accepting:
+                error_message = "The application is shutting down."
+                raise ShuttingDownError(error_message)
+            self.in_flight += 1
+
+        try:
+            yield
+        finally:
+            with self._idle:
+                self.in_flight -= 1
+                self.completed += 1
+                if self.in_flight == 0:
+                    self._idle.notify_all()
+
+    def stop_accepting(self) -> None:
+        """Refuse new work, letting the work in progress complete."""
+        with self._idle:
+            self.accepting = False
+
+    def resume(self) -> None:
+        """Accept new work again."""
+        with self._idle:
+            self.accepting = True
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Block until no work is in progress.
+
+        Args:
+        ----
+            timeout (float): The maximum time to wait, in seconds.
+
+        Returns:
+        -------
+            bool: True if all the work completed within the timeout.
+
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self.in_flight == 0, timeout)
+
+
+@lru_cache(maxsize=1)
+def get_render_tracker() -> InFlightTracker:
+    """Return the tracker of the labels being rendered.
+
+    Returns
+    -------
+        InFlightTracker: The render tracker.
+
+    """
+    return InFlightTracker()
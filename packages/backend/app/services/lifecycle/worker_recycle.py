@@ -0,0 +1,116 @@
+"""Module for recycling the worker before a slow leak exhausts the memory."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+from functools import lru_cache
+
+from loguru import logger
+
+from app.metrics import MEMORY_GROWTH
+from app.services.lifecycle.graceful_shutdown import get_render_tracker
+from app.services.profiling.memory import get_rss_bytes
+from app.services.warmup.warmup import is_ready
+from app.settings import get_settings
+
+# Time between two checks of the renders and of the memory growth.
+RECYCLE_CHECK_SECONDS = 5.0
+
+
+class WorkerRecycler:
+    """Shut the worker down once it rendered or grew too much.
+
+    The growth is measured from the resident set size of the process once
+    it is ready, when the fonts and the templates are loaded. The worker
+    shuts down gracefully, as on SIGTERM, for its supervisor to restart it.
+
+    Attributes
+    ----------
+        max_renders (int): The renders after which the worker is recycled,
+            0 for no limit.
+        max_growth_bytes (int): The memory growth after which the worker is
+            recycled, 0 for no limit.
+        baseline_bytes (int | None): The resident set size the growth is
+            measured from, None until the worker is ready.
+
+    """
+
+    def __init__(self, max_renders: int, max_growth_bytes: int) -> None:
+        """Initialise the WorkerRecycler.
+
+        Args:
+        ----
+            max_renders (int): The renders after which the worker is recycled,
+                0 for no limit.
+            max_growth_bytes (int): The memory growth after which the worker
+                is recycled, 0 for no limit.
+
+        """
+        self.max_renders = max_renders
+        self.max_growth_bytes = max_growth_bytes
+        self.baseline_bytes: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the worker is ever recycled."""
+        return self.max_renders > 0 or self.max_growth_bytes > 0
+
+    def check(self, renders: int, rss_bytes: int | None) -> str | None:
+        """Check whether the worker should be recycled.
+
+        Args:
+        ----
+            renders (int): The renders completed by the worker.
+            rss_bytes (int | None): The resident set size of the process, None
+                if it cannot be measured.
+
+        Returns:
+        -------
+            str | None: The reason to recycle the worker, or None.
+
+        """
+        if self.max_renders and renders >= self.max_renders:
+            return f"{renders} renders completed"
+
+        if rss_bytes is None:
+            return None
+
+        if self.baseline_bytes is None:
+            self.baseline_bytes = rss_bytes
+        growth = rss_bytes - self.baseline_bytes
+        MEMORY_GROWTH.set(growth)
+        if self.max_growth_bytes and growth >= self.max_growth_bytes:
+            return f"memory grew by {growth // 2**20} MB"
+
+        return None
+
+    async def run(self) -> None:
+        """Check the worker periodically, shutting it down when it is due."""
+        while True:
+            await asyncio.sleep(RECYCLE_CHECK_SECONDS)
+            if not is_ready():
+                continue
+
+            reason = self.check(get_render_tracker().completed, get_rss_bytes())
+            if reason is not None:
+                logger.warning(f"Recycling the worker: {reason}")
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+
+
+@lru_cache(maxsize=1)
+def get_worker_recycler() -> WorkerRecycler:
+    """Return the worker recycler configured by the application settings.
+
+    Returns
+    -------
+        WorkerRecycler: The worker recycler.
+
+    """
+    settings = get_settings()
+    return WorkerRecycler(
+        max_renders=settings.recycle_after_renders,
+        max_growth_bytes=settings.recycle_after_growth_mb * 2**20,
+    )
@@ -0,0 +1,72 @@
+"""Module for the cached PNG thumbnails of the labels."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.services.create.create_pdf import get_label_content_hash, render_label
+from app.services.create.engines import OutputFormat
+from app.settings import get_settings
+from app.utils.lru_cache import LRUCache
+
+if TYPE_CHECKING:
+    from app.models import LabelData
+
+DEFAULT_PREVIEW_DPI = 203
+MIN_PREVIEW_DPI = 36
+MAX_PREVIEW_DPI = 600
+
+
+@lru_cache(maxsize=1)
+def get_preview_cache() -> LRUCache[str, bytes]:
+    """Return the cache of PNG thumbnails, keyed by content hash and DPI.
+
+    Returns
+    -------
+        LRUCache[str, bytes]: The thumbnail cache.
+
+    """
+    settings = get_settings()
+    return LRUCache(
+        max_entries=settings.preview_cache_size,
+        max_bytes=settings.preview_cache_max_bytes,
+    )
+
+
+def preview_label_data(
+    label_data: LabelData,
+    dpi: int = DEFAULT_PREVIEW_DPI,
+    show_borders: bool = False,
+) -> bytes:
+    """Get the PNG thumbnail of label data, rendering it only on cache misses.
+
+    The thumbnail is drawn from the cached layout of the label by the PNG
+    engine, and cached by the content hash of the layout.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+        dpi (int, optional): The resolution of the image.
+            Defaults to DEFAULT_PREVIEW_DPI.
+        show_borders (bool, optional): Whether to show debug borders.
+            Defaults to False.
+
+    Returns:
+    -------
+        bytes: The content of the PNG image.
+
+    """
+    content_hash = get_label_content_hash(label_data, show_borders=show_borders)
+    cache_key = f"{content_hash}:{dpi}"
+    png_bytes = get_preview_cache().get(cache_key)
+    if png_bytes is None:
+        png_bytes = render_label(
+            label_data,
+            OutputFormat.png,
+            show_borders=show_borders,
+            dpi=dpi,
+        )
+        get_preview_cache().put(cache_key, png_bytes)
+
+    return png_bytes
@@ -0,0 +1,192 @@
+"""Module for the durable journal of the print jobs, stored in SQLite."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+# Finished jobs are kept for troubleshooting, then pruned on startup.
+FINISHED_JOBS_RETENTION_SECONDS = 7 * 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS print_jobs (
+    job_id TEXT PRIMARY KEY,
+    pdf_filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT INTO print_jobs (
+    job_id, pdf_filename, status, attempts, error, created_at, updated_at
+)
+VALUES (:job_id, :pdf_filename, :status, :attempts, :error, :now, :now)
+ON CONFLICT (job_id) DO UPDATE SET
+    status = excluded.status,
+    attempts = excluded.attempts,
+    error = excluded.error,
+    updated_at = excluded.updated_at
+"""
+
+
+class PrintJobStatus(str, Enum):
+    """Enum for the status of a print job."""
+
+    queued = "queued"
+    printing = "printing"
+    done = "done"
+    failed = "failed"
+
+
+UNFINISHED_STATUSES = (PrintJobStatus.queued.value, PrintJobStatus.printing.value)
+
+
+@dataclass(slots=True)
+class PrintJob:
+    """A label to be sent to the printer.
+
+    Attributes
+    ----------
+        pdf_filename (str): The filename of the stored label.
+        job_id (str): The unique id of the job.
+        status (PrintJobStatus): The status of the job.
+        attempts (int): The amount of times the job was sent to the printer.
+        error (str | None): The error of the last failed attempt.
+        pdf_bytes (bytes | None): The content of the label, if rendered in
+            memory. It is not journaled.
+        journaled (bool): Whether the job is recorded in the journal. A job
+            whose label is not persisted cannot be replayed, so it is not.
+
+    """
+
+    pdf_filename: str
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: PrintJobStatus = PrintJobStatus.queued
+    attempts: int = 0
+    error: str | None = None
+    pdf_bytes: bytes | None = field(default=None, repr=False, compare=False)
+    journaled: bool = True
+
+
+class PrintJournal:
+    """Journal of the print jobs and of their status transitions.
+
+    The database is in WAL mode with full synchronisation, so every commit is
+    durable; callers batch status transitions into a single commit to limit
+    the fsyncs on the SD card.
+
+    Attributes
+    ----------
+        path (Path): The path of the SQLite database.
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialise the PrintJournal, creating the database if needed.
+
+        Args:
+        ----
+            path (Path): The path of the SQLite database.
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.execute(_SCHEMA)
+
+    def record(self, jobs: Iterable[PrintJob]) -> None:
+        """Record the current status of a batch of jobs in a single commit.
+
+        Args:
+        ----
+            jobs (Iterable[PrintJob]): The jobs whose status changed.
+
+        """
+        now = time.time()
+        rows = [
+            {
+                "job_id": job.job_id,
+                "pdf_filename": job.pdf_filename,
+                "status": job.status.value,
+                "attempts": job.attempts,
+                "error": job.error,
+                "now": now,
+            }
+            for job in jobs
+        ]
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(_UPSERT, rows)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def unfinished(self) -> list[PrintJob]:
+        """Get the jobs queued or being printed, oldest first.
+
+        Returns
+        -------
+            list[PrintJob]: The unfinished jobs.
+
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "SELECT job_id, pdf_filename, status, attempts FROM print_jobs "
+                "WHERE status IN (?, ?) ORDER BY created_at, rowid",
+                UNFINISHED_STATUSES,
+            )
+            return [
+                PrintJob(
+                    pdf_filename=pdf_filename,
+                    job_id=job_id,
+                    status=PrintJobStatus(status),
+                    attempts=attempts,
+                )
+                for job_id, pdf_filename, status, attempts in cursor.fetchall()
+            ]
+
+    def prune(self, older_than: float = FINISHED_JOBS_RETENTION_SECONDS) -> int:
+        """Delete the finished jobs older than the retention.
+
+        Args:
+        ----
+            older_than (float, optional): The retention, in seconds.
+                Defaults to FINISHED_JOBS_RETENTION_SECONDS.
+
+        Returns:
+        -------
+            int: The amount of deleted jobs.
+
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM print_jobs WHERE status NOT IN (?, ?) AND updated_at < ?",
+                (*UNFINISHED_STATUSES, time.time() - older_than),
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
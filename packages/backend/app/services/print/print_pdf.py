@@ -2,15 +2,54 @@
 
 from __future__ import annotations
 
-import os
+import subprocess
+import time
 from pathlib import Path
 
+from app.services.profiling.stages import render_stage
+from app.services.storage.label_store import get_label_store
+from app.settings import get_settings
+
+# The CUPS queue of the label printer.
+PRINTER_NAME = "SN_420B"
+
+# lpr reads the document from its standard input when no file is given.
+LPR_COMMAND = [
+    "/usr/bin/lpr",
+    "-P",
+    PRINTER_NAME,
+    "-o",
+    "PageSize=Custom.50x30mm",
+    "-o",
+    "orientation-requested=3",
+]
+
+
+class PrintError(RuntimeError):
+    """Raised when a label cannot be sent to the spooler."""
+
+
+def _print_with_fake_printer() -> bool:
+    """Wait as long as printing takes, if the fake printer is configured.
+
+    Returns
+    -------
+        bool: True if the fake printer printed the label.
+
+    """
+    settings = get_settings()
+    if settings.printer_backend != "fake":
+        return False
+
+    time.sleep(settings.fake_print_seconds)
+    return True
+
 
 def print_label_pdf(
     file_path: str,
     file_name: str | None = None,
 ) -> bool:
-    """Print a PDF file to a specified printer.
+    """Print a PDF file to a specified printer, piping it to the spooler.
 
     Args:
     ----
@@ -18,10 +57,14 @@ def print_label_pdf(
         file_name: str | None = None: The filename to be used in case
         of file not found.
 
+    Raises:
+    ------
+        FileNotFoundError: If the PDF file does not exist.
+        PrintError: If the print command cannot be run or fails.
+
     Returns:
     -------
-        bool: True if the printing command is constructed (and potentially executed),
-        False otherwise.
+        bool: True if the label has been sent to the spooler.
 
     """
     pdf_file = Path(f"{file_path}")
@@ -30,18 +73,83 @@ def print_label_pdf(
         path_error_message = f" at path {file_name}." if file_name is not None else ""
         custom_error_message = f"File not found{path_error_message}."
         raise FileNotFoundError(custom_error_message)
-    # print("Inside printing method")  # noqa: ERA001
 
-    command = "/usr/bin/lpr"
-    printer_name = "-P SN_420B"
-    layout_options = "-o PageSize=Custom.50x30mm -o orientation-requested=3"
+    return print_label_pdf_bytes(pdf_file.read_bytes(), file_name=file_name)
+
+
+def print_label_pdf_bytes(
+    pdf_bytes: bytes,
+    file_name: str | None = None,
+) -> bool:
+    """Print a PDF label rendered in memory, piping it to the spooler.
 
-    command_to_run = f"{command} {printer_name} {layout_options} {pdf_file}"
-    print(command_to_run)  # noqa: T201
+    Args:
+    ----
+        pdf_bytes (bytes): The content of the PDF label.
+        file_name: str | None = None: The filename of the label, used in
+        the error message.
 
-    # The following lines are commented out because they interact with the system's
-    # printer and are not suitable for environments without a printer.
-    printer = os.popen(command_to_run, "w")  # noqa: S605
-    printer.close()
+    Raises:
+    ------
+        PrintError: If the print command cannot be run or fails.
+
+    Returns:
+    -------
+        bool: True if the label has been sent to the spooler.
+
+    """
+    if _print_with_fake_printer():
+        return True
+
+    label_name = f" {file_name}" if file_name is not None else ""
+    try:
+        subprocess.run(  # noqa: S603
+            LPR_COMMAND,
+            input=pdf_bytes,
+            capture_output=True,
+            check=True,
+        )
+    except OSError as error:
+        error_message = f"Print command failed for label{label_name}: {error}"
+        raise PrintError(error_message) from error
+    except subprocess.CalledProcessError as error:
+        stderr = error.stderr.decode(errors="replace").strip()
+        error_message = f"Print command failed for label{label_name}: {stderr}"
+        raise PrintError(error_message) from error
 
     return True
+
+
+def print_stored_label(pdf_filename: str, pdf_bytes: bytes | None = None) -> str:
+    """Print a label, from memory or from storage.
+
+    A label rendered in memory is piped to the spooler, otherwise the stored
+    label is printed, re-rendering it if it is stored as data.
+
+    Args:
+    ----
+        pdf_filename (str): The filename of the label.
+        pdf_bytes (bytes | None, optional): The content of the label, if
+            rendered in memory. Defaults to None.
+
+    Returns:
+    -------
+        str: The path of the printed label, either its PDF file or its record.
+
+    """
+    full_path = get_settings().pdf_output_dir / pdf_filename
+
+    with render_stage("print"):
+        if pdf_bytes is not None:
+            print_label_pdf_bytes(pdf_bytes, file_name=pdf_filename)
+            return str(full_path)
+
+        label_store = get_label_store()
+        if not full_path.exists() and label_store.has_record(pdf_filename):
+            pdf_bytes = label_store.load_pdf(pdf_filename)
+            print_label_pdf_bytes(pdf_bytes, file_name=pdf_filename)
+            return str(label_store.record_path(pdf_filename))
+
+        print_label_pdf(file_path=str(full_path), file_name=pdf_filename)
+
+    return str(full_path)
@@ -0,0 +1,488 @@
+"""Module for the durable queue of the print jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import functools
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from app.metrics import PRINT_QUEUE_DEPTH
+from app.services.lifecycle.admission_control import (
+    OverloadedError,
+    ThroughputEstimator,
+)
+from app.services.lifecycle.graceful_shutdown import ShuttingDownError
+from app.services.print.print_journal import PrintJob, PrintJobStatus, PrintJournal
+from app.services.print.print_pdf import print_stored_label
+from app.services.profiling.stages import current_endpoint, current_request
+from app.settings import get_settings
+from app.utils.blocking_io import run_blocking_io
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+JOURNAL_FILENAME = "print_queue.sqlite3"
+
+# The endpoint the print jobs are profiled under.
+PRINT_QUEUE_ENDPOINT = "print_queue"
+
+# The delay before retrying a failed print job doubles up to this, in seconds.
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+
+
+class PrintQueue:
+    """Queue sending the print jobs to the printer one at a time.
+
+    Every job is committed to the journal before it is printed, and its status
+    transitions are recorded after. Transitions happening within the group
+    commit interval share a single commit, keeping the fsyncs low under load.
+    Jobs left unfinished by a crash or a shutdown are replayed when the queue
+    starts, so every job is printed at least once. A failed attempt is retried
+    after a doubling delay, up to `max_attempts`, the job staying unfinished
+    in the journal meanwhile. New jobs are refused once
+    `max_pending` jobs are pending, with a retry delay of the time needed to
+    print them at the measured throughput.
+
+    Attributes
+    ----------
+        journal (PrintJournal): The journal of the print jobs.
+        group_commit_interval (float): The time transitions are batched for
+            before being committed, in seconds.
+        max_pending (int | None): The maximum amount of pending jobs.
+        max_attempts (int): The attempts before a job is failed.
+        retry_backoff (float): The delay before the first retry, in seconds.
+        accepting (bool): Whether new jobs are accepted.
+        estimator (ThroughputEstimator): The estimator of the print time.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        printer: Callable[[str, bytes | None], str],
+        journal: PrintJournal,
+        group_commit_interval: float = 0.005,
+        max_pending: int | None = None,
+        max_attempts: int = 1,
+        retry_backoff: float = 1.0,
+    ) -> None:
+        """Initialise the PrintQueue.
+
+        Args:
+        ----
+            printer (Callable[[str, bytes | None], str]): The function printing
+                a label by filename, from its content when rendered in memory,
+                returning the path of the printed label.
+            journal (PrintJournal): The journal of the print jobs.
+            group_commit_interval (float, optional): The time transitions are
+                batched for before being committed, in seconds.
+                Defaults to 0.005.
+            max_pending (int | None, optional): The maximum amount of pending
+                jobs, replayed jobs excluded. If None, the queue is unbounded.
+                Defaults to None.
+            max_attempts (int, optional): The attempts before a job is failed.
+                Defaults to 1.
+            retry_backoff (float, optional): The delay before the first retry,
+                doubling for the next ones, in seconds. Defaults to 1.0.
+
+        """
+        self._printer = printer
+        self.journal = journal
+        self.group_commit_interval = group_commit_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.accepting = True
+        self.estimator = ThroughputEstimator()
+        self._pending: dict[str, PrintJob] = {}
+        self._results: dict[str, asyncio.Future[str]] = {}
+        self._jobs: asyncio.Queue[PrintJob] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._batch: dict[str, PrintJob] = {}
+        self._committed: asyncio.Future[None] | None = None
+        self._commit_task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> list[PrintJob]:
+        """Get the jobs queued or being printed, oldest first.
+
+        Returns
+        -------
+            list[PrintJob]: The pending jobs.
+
+        """
+        return list(self._pending.values())
+
+    def start(self) -> int:
+        """Start the queue worker and replay the jobs left unfinished.
+
+        Returns
+        -------
+            int: The amount of replayed jobs.
+
+        """
+        self.accepting = True
+        self.journal.prune()
+        jobs = [
+            job for job in self.journal.unfinished() if job.job_id not in self._pending
+        ]
+        for job in jobs:
+            self._put(job)
+        self._ensure_worker()
+
+        return len(jobs)
+
+    def ensure_capacity(self) -> None:
+        """Check that a new job would be accepted.
+
+        Raises
+        ------
+            ShuttingDownError: If the queue no longer accepts new jobs.
+            OverloadedError: If the queue is full.
+
+        """
+        if not self.accepting:
+            error_message = "The application is shutting down."
+            raise ShuttingDownError(error_message)
+
+        if self.max_pending is not None and len(self._pending) >= self.max_pending:
+            error_message = "Too many print jobs, retry later."
+            raise OverloadedError(
+                error_message,
+                retry_after=self.estimator.retry_after(len(self._pending), 1),
+            )
+
+    def enqueue(
+        self,
+        pdf_filename: str,
+        pdf_bytes: bytes | None = None,
+        journaled: bool = True,
+        journal_after: asyncio.Future[Any] | None = None,
+    ) -> asyncio.Future[str]:
+        """Queue a label for printing.
+
+        Args:
+        ----
+            pdf_filename (str): The filename of the label.
+            pdf_bytes (bytes | None, optional): The content of the label, if
+                rendered in memory. Defaults to None.
+            journaled (bool, optional): Whether the job is recorded in the
+                journal, to be replayed by the next process if unfinished. The
+                label must be persisted for the replay. Defaults to True.
+            journal_after (asyncio.Future[Any] | None, optional): The
+                persistence of the label, the job being journaled once it
+                succeeds if still pending, instead of right away.
+                Defaults to None.
+
+        Raises:
+        ------
+            ShuttingDownError: If the queue no longer accepts new jobs.
+            OverloadedError: If the queue is full.
+
+        Returns:
+        -------
+            asyncio.Future[str]: The path of the printed label, once printed.
+
+        """
+        self.ensure_capacity()
+
+        job = PrintJob(
+            pdf_filename=pdf_filename,
+            pdf_bytes=pdf_bytes,
+            journaled=journaled and journal_after is None,
+        )
+        result = self._put(job)
+        self._record(job)
+        if journaled and journal_after is not None:
+            journal_after.add_done_callback(
+                functools.partial(self._journal_persisted, job),
+            )
+
+        return result
+
+    def _journal_persisted(self, job: PrintJob, persisted: asyncio.Future[Any]) -> None:
+        """Journal a pending job once its label is persisted.
+
+        Args:
+        ----
+            job (PrintJob): The job, printed from memory until then.
+            persisted (asyncio.Future[Any]): The persistence of its label.
+
+        """
+        if persisted.cancelled() or persisted.exception() is not None:
+            return
+        if job.job_id not in self._pending:
+            return
+
+        job.journaled = True
+        self._record(job)
+
+    async def submit(self, pdf_filename: str) -> str:
+        """Queue a stored label for printing and wait for it to be printed.
+
+        Args:
+        ----
+            pdf_filename (str): The filename of the stored label.
+
+        Returns:
+        -------
+            str: The path of the printed label.
+
+        """
+        return await asyncio.shield(self.enqueue(pdf_filename))
+
+    async def drain(self, timeout: float) -> list[PrintJob]:
+        """Stop accepting jobs and print the pending ones within a deadline.
+
+        Jobs still pending at the deadline, including the one being printed,
+        stay unfinished in the journal and are replayed by the next process.
+
+        Args:
+        ----
+            timeout (float): The maximum time to wait, in seconds.
+
+        Returns:
+        -------
+            list[PrintJob]: The jobs left pending.
+
+        """
+        self.accepting = False
+        if self._jobs is not None and self._pending:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._jobs.join(), timeout)
+
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+        if self._commit_task is not None:
+            await asyncio.gather(self._commit_task, return_exceptions=True)
+
+        return self.pending
+
+    def _record(self, job: PrintJob) -> asyncio.Future[None]:
+        """Add the current status of a job to the next group commit.
+
+        Args:
+        ----
+            job (PrintJob): The job whose status changed.
+
+        Returns:
+        -------
+            asyncio.Future[None]: Resolved once the status is committed.
+
+        """
+        if not job.journaled:
+            recorded: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            recorded.set_result(None)
+            return recorded
+
+        self._batch[job.job_id] = dataclasses.replace(job, pdf_bytes=None)
+        if self._committed is None:
+            loop = asyncio.get_running_loop()
+            self._committed = loop.create_future()
+            # The failure is logged by the commit, whether awaited or not.
+            self._committed.add_done_callback(
+                lambda committed: committed.cancelled() or committed.exception(),
+            )
+            self._commit_task = loop.create_task(self._commit(self._committed))
+
+        return self._committed
+
+    async def _commit(self, committed: asyncio.Future[None]) -> None:
+        """Commit the batched status transitions after the group commit interval.
+
+        Args:
+        ----
+            committed (asyncio.Future[None]): The future of the batch.
+
+        """
+        await asyncio.sleep(self.group_commit_interval)
+        batch = list(self._batch.values())
+        self._batch = {}
+        self._committed = None
+        try:
+            await run_blocking_io(self.journal.record, batch)
+        except Exception as error:  # noqa: BLE001
+            logger.error(f"Print journal commit failed: {error}")
+            committed.set_exception(error)
+        else:
+            committed.set_result(None)
+
+    def _put(self, job: PrintJob) -> asyncio.Future[str]:
+        """Add a job to the queue.
+
+        Args:
+        ----
+            job (PrintJob): The job.
+
+        Returns:
+        -------
+            asyncio.Future[str]: The result of the job.
+
+        """
+        jobs = self._ensure_worker()
+        result: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._pending[job.job_id] = job
+        self._results[job.job_id] = result
+        jobs.put_nowait(job)
+        PRINT_QUEUE_DEPTH.set(len(self._pending))
+
+        return result
+
+    def _ensure_worker(self) -> asyncio.Queue[PrintJob]:
+        """Start the worker on the running event loop, if not running yet.
+
+        Returns
+        -------
+            asyncio.Queue[PrintJob]: The queue of the jobs.
+
+        """
+        loop = asyncio.get_running_loop()
+        if self._jobs is None or self._loop is not loop:
+            self._loop = loop
+            self._jobs = asyncio.Queue()
+            for job in self._pending.values():
+                self._jobs.put_nowait(job)
+            self._worker = None
+            self._committed = None
+
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run(self._jobs))
+
+        return self._jobs
+
+    async def _run(self, jobs: asyncio.Queue[PrintJob]) -> None:
+        """Send the queued jobs to the printer, one at a time.
+
+        A job is sent to the printer only once it is committed to the journal.
+
+        Args:
+        ----
+            jobs (asyncio.Queue[PrintJob]): The queue of the jobs.
+
+        """
+        # The jobs are printed by the queue, whichever endpoint submitted them.
+        current_endpoint.set(PRINT_QUEUE_ENDPOINT)
+        current_request.set(None)
+        while True:
+            job = await jobs.get()
+            job.status = PrintJobStatus.printing
+            job.attempts += 1
+            # A cancelled job stays unfinished, so that the next process replays it.
+            try:
+                await self._record(job)
+                start = time.perf_counter()
+                printed_path = await run_blocking_io(
+                    self._printer,
+                    job.pdf_filename,
+                    job.pdf_bytes,
+                )
+                self.estimator.observe(time.perf_counter() - start)
+            except Exception as error:  # noqa: BLE001
+                job.error = str(error)
+                if job.attempts < self.max_attempts:
+                    self._retry_later(job, jobs)
+                    jobs.task_done()
+                    continue
+
+                logger.warning(f"Print job {job.job_id} failed: {error}")
+                job.status = PrintJobStatus.failed
+                self._finish(job, error=error)
+            else:
+                job.status = PrintJobStatus.done
+                self._finish(job, printed_path=printed_path)
+
+            try:
+                await self._record(job)
+            except Exception:  # noqa: BLE001
+                logger.warning(
+                    f"Print job {job.job_id} is {job.status.value} but not "
+                    "journaled as such, the next process replays it",
+                )
+            jobs.task_done()
+
+    def _retry_later(self, job: PrintJob, jobs: asyncio.Queue[PrintJob]) -> None:
+        """Queue a failed job again after its backoff, unfinished meanwhile.
+
+        Args:
+        ----
+            job (PrintJob): The failed job.
+            jobs (asyncio.Queue[PrintJob]): The queue of the jobs.
+
+        """
+        delay = min(
+            self.retry_backoff * 2 ** (job.attempts - 1),
+            MAX_RETRY_BACKOFF_SECONDS,
+        )
+        logger.warning(
+            f"Print job {job.job_id} failed, retrying in {delay:.1f}s "
+            f"(attempt {job.attempts} of {self.max_attempts}): {job.error}",
+        )
+        job.status = PrintJobStatus.queued
+        self._record(job)
+
+        def requeue() -> None:
+            if job.job_id in self._pending and self._jobs is jobs:
+                jobs.put_nowait(job)
+
+        asyncio.get_running_loop().call_later(delay, requeue)
+
+    def _finish(
+        self,
+        job: PrintJob,
+        printed_path: str | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        """Remove a finished job from the pending ones and resolve its result.
+
+        Args:
+        ----
+            job (PrintJob): The finished job.
+            printed_path (str | None, optional): The path of the printed label.
+                Defaults to None.
+            error (Exception | None, optional): The error of the last attempt,
+                if the job failed. Defaults to None.
+
+        """
+        job.pdf_bytes = None
+        self._pending.pop(job.job_id, None)
+        PRINT_QUEUE_DEPTH.set(len(self._pending))
+        result = self._results.pop(job.job_id, None)
+        if result is None or result.done():
+            return
+
+        if error is not None:
+            result.set_exception(error)
+        elif printed_path is not None:
+            result.set_result(printed_path)
+
+
+@lru_cache(maxsize=1)
+def get_print_queue() -> PrintQueue:
+    """Return the print queue of the process.
+
+    Returns
+    -------
+        PrintQueue: The print queue.
+
+    """
+    settings = get_settings()
+    journal_path = settings.print_queue_path or (
+        settings.pdf_output_dir / JOURNAL_FILENAME
+    )
+
+    return PrintQueue(
+        printer=print_stored_label,
+        journal=PrintJournal(journal_path),
+        group_commit_interval=settings.print_queue_group_commit_seconds,
+        max_pending=settings.max_queued_print_jobs,
+        max_attempts=settings.print_max_attempts,
+        retry_backoff=settings.print_retry_backoff_seconds,
+    )
@@ -0,0 +1,434 @@
+"""Module polling the state of the printer, for print requests to fail fast."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import subprocess
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Literal
+
+from loguru import logger
+
+from app.metrics import PRINTER_READY
+from app.services.print.print_pdf import PRINTER_NAME
+from app.settings import get_settings
+from app.utils.blocking_io import run_blocking_io
+
+LPSTAT_COMMAND = "/usr/bin/lpstat"
+
+# A status older than this many poll intervals is no longer trusted.
+STALE_AFTER_INTERVALS = 3
+
+# Printer state reasons, without their severity suffix, that prevent printing.
+BLOCKING_REASONS = frozenset(
+    {
+        "cover-open",
+        "door-open",
+        "media-empty",
+        "media-jam",
+        "media-needed",
+        "offline",
+        "paused",
+        "shutdown",
+        "stopped",
+    },
+)
+REASON_SUFFIXES = ("-error", "-warning", "-report")
+
+
+class PrinterUnavailableError(Exception):
+    """Raised when a print request is refused because the printer cannot print.
+
+    Attributes
+    ----------
+        retry_after (int): The suggested delay before retrying, in seconds.
+
+    """
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        """Initialise the PrinterUnavailableError.
+
+        Args:
+        ----
+            message (str): The error message.
+            retry_after (int): The suggested delay before retrying, in seconds.
+
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PrinterState(str, Enum):
+    """State of a printer, as reported by CUPS."""
+
+    idle = "idle"
+    printing = "printing"
+    disabled = "disabled"
+    # CUPS does not know the printer, or cannot be reached.
+    unavailable = "unavailable"
+    # The printer has not been polled, or its status is stale.
+    unknown = "unknown"
+
+
+def is_blocking_reason(reason: str) -> bool:
+    """Check whether a printer state reason prevents printing.
+
+    Args:
+    ----
+        reason (str): The state reason, e.g. "media-empty-error".
+
+    Returns:
+    -------
+        bool: True if the printer cannot print.
+
+    """
+    if reason.endswith("-error"):
+        return True
+
+    for suffix in REASON_SUFFIXES:
+        reason = reason.removesuffix(suffix)
+    return reason in BLOCKING_REASONS
+
+
+@dataclass(frozen=True)
+class PrinterStatus:
+    """Status of a printer and of its CUPS queue.
+
+    Attributes
+    ----------
+        name (str): The name of the CUPS queue.
+        state (PrinterState): The state of the printer.
+        accepting (bool | None): Whether the queue accepts jobs, None if
+            unknown.
+        reasons (tuple[str, ...]): The printer state reasons, e.g. "paused".
+        message (str): The message of the printer, or the polling error.
+        queued_jobs (int): The jobs waiting in the CUPS queue.
+        checked_at (float): The time of the poll, as a Unix timestamp.
+
+    """
+
+    name: str
+    state: PrinterState
+    accepting: bool | None = None
+    reasons: tuple[str, ...] = ()
+    message: str = ""
+    queued_jobs: int = 0
+    checked_at: float = field(default_factory=time.time)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the printer is known to be able to print."""
+        return self.state != PrinterState.unknown and self.problem is None
+
+    @property
+    def problem(self) -> str | None:
+        """Why the printer cannot print, None if it can or if unknown."""
+        if self.state == PrinterState.unavailable:
+            return f"The printer {self.name} is unavailable: {self.message}"
+        if self.state == PrinterState.disabled:
+            reason = f": {self.message}" if self.message else ""
+            return f"The printer {self.name} is disabled{reason}"
+        if self.accepting is False:
+            return f"The printer {self.name} does not accept jobs"
+
+        blocking = [reason for reason in self.reasons if is_blocking_reason(reason)]
+        if blocking:
+            return f"The printer {self.name} reports {', '.join(blocking)}"
+
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the status into a JSON compatible dictionary.
+
+        Returns
+        -------
+            dict[str, Any]: The status, with whether the printer is ready.
+
+        """
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "ready": self.ready,
+            "problem": self.problem,
+            "accepting": self.accepting,
+            "reasons": list(self.reasons),
+            "message": self.message,
+            "queued_jobs": self.queued_jobs,
+            "checked_at": self.checked_at,
+        }
+
+
+def _parse_printer_output(
+    printer_name: str,
+    printer_output: str,
+) -> tuple[PrinterState, tuple[str, ...], str]:
+    """Parse the output of `lpstat -l -p <printer>`.
+
+    Args:
+    ----
+        printer_name (str): The name of the CUPS queue.
+        printer_output (str): The output of lpstat.
+
+    Returns:
+    -------
+        tuple[PrinterState, tuple[str, ...], str]: The state of the printer,
+            its state reasons and its message.
+
+    """
+    state = PrinterState.unknown
+    reasons: tuple[str, ...] = ()
+    message = ""
+    for line in printer_output.splitlines():
+        if line.startswith(f"printer {printer_name} "):
+            description = line.removeprefix(f"printer {printer_name} ")
+            if description.startswith("is idle"):
+                state = PrinterState.idle
+            elif description.startswith("now printing"):
+                state = PrinterState.printing
+            elif description.startswith("disabled"):
+                state = PrinterState.disabled
+            continue
+
+        detail = line.strip()
+        if detail.startswith("Alerts:"):
+            alerts = detail.removeprefix("Alerts:").replace(",", " ").split()
+            reasons = tuple(alert for alert in alerts if alert != "none")
+        elif detail and ":" not in detail and not message:
+            # The printer message is the only detail line without a key.
+            message = detail
+
+    return state, reasons, message
+
+
+def parse_lpstat(
+    printer_name: str,
+    printer_output: str,
+    queue_output: str,
+) -> PrinterStatus:
+    """Parse the output of lpstat into the status of a printer.
+
+    Args:
+    ----
+        printer_name (str): The name of the CUPS queue.
+        printer_output (str): The output of `lpstat -l -p <printer>`.
+        queue_output (str): The output of `lpstat -a <printer> -o <printer>`.
+
+    Returns:
+    -------
+        PrinterStatus: The status of the printer.
+
+    """
+    state, reasons, message = _parse_printer_output(printer_name, printer_output)
+
+    accepting: bool | None = None
+    queued_jobs = 0
+    for line in queue_output.splitlines():
+        if line.startswith(f"{printer_name}-"):
+            queued_jobs += 1
+        elif line.startswith(f"{printer_name} accepting"):
+            accepting = True
+        elif line.startswith(f"{printer_name} not accepting"):
+            accepting = False
+
+    return PrinterStatus(
+        name=printer_name,
+        state=state,
+        accepting=accepting,
+        reasons=reasons,
+        message=message,
+        queued_jobs=queued_jobs,
+    )
+
+
+def read_printer_status(printer_name: str, timeout: float) -> PrinterStatus:
+    """Read the status of a printer from CUPS with lpstat.
+
+    Args:
+    ----
+        printer_name (str): The name of the CUPS queue.
+        timeout (float): The time given to each lpstat call, in seconds.
+
+    Returns:
+    -------
+        PrinterStatus: The status of the printer, unknown if lpstat could not
+            run, unavailable if CUPS refused the request.
+
+    """
+    try:
+        printer = subprocess.run(  # noqa: S603
+            [LPSTAT_COMMAND, "-l", "-p", printer_name],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+        queue = subprocess.run(  # noqa: S603
+            [LPSTAT_COMMAND, "-a", printer_name, "-o", printer_name],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired) as error:
+        return PrinterStatus(printer_name, PrinterState.unknown, message=str(error))
+
+    if printer.returncode:
+        return PrinterStatus(
+            printer_name,
+            PrinterState.unavailable,
+            message=printer.stderr.strip()
+            or f"lpstat exited with {printer.returncode}",
+        )
+
+    return parse_lpstat(printer_name, printer.stdout, queue.stdout)
+
+
+class PrinterStatusPoller:
+    """Cache of the printer status, refreshed in the background.
+
+    The print requests read the cached status instead of calling CUPS, and
+    are refused before their label is rendered while the printer is known to
+    be unable to print. A status older than a few intervals is unknown, and
+    does not refuse anything.
+
+    Attributes
+    ----------
+        printer_name (str): The name of the CUPS queue.
+        interval (float): The time between two polls, in seconds.
+        policy (Literal["fail", "queue"]): Whether the print requests are
+            refused, or queued with a warning, while the printer cannot print.
+        fake (bool): Whether the printer is the fake one, always idle.
+        status (PrinterStatus | None): The last polled status, None before the
+            first poll.
+
+    """
+
+    def __init__(
+        self,
+        printer_name: str,
+        interval: float,
+        policy: Literal["fail", "queue"],
+        fake: bool = False,
+    ) -> None:
+        """Initialise the PrinterStatusPoller.
+
+        Args:
+        ----
+            printer_name (str): The name of the CUPS queue.
+            interval (float): The time between two polls, in seconds.
+            policy (Literal["fail", "queue"]): Whether the print requests are
+                refused, or queued with a warning, while the printer cannot
+                print.
+            fake (bool, optional): Whether the printer is the fake one, always
+                idle. Defaults to False.
+
+        """
+        self.printer_name = printer_name
+        self.interval = interval
+        self.policy = policy
+        self.fake = fake
+        self.status: PrinterStatus | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the printer is polled at all."""
+        return self.interval > 0
+
+    def poll(self) -> PrinterStatus:
+        """Read the status of the printer, blocking on lpstat.
+
+        Returns
+        -------
+            PrinterStatus: The status of the printer.
+
+        """
+        if self.fake:
+            return PrinterStatus(self.printer_name, PrinterState.idle, accepting=True)
+
+        return read_printer_status(self.printer_name, timeout=max(self.interval, 1))
+
+    def update(self, status: PrinterStatus) -> None:
+        """Cache a polled status, logging the changes of its problem.
+
+        Args:
+        ----
+            status (PrinterStatus): The polled status.
+
+        """
+        previous = self.status.problem if self.status is not None else None
+        self.status = status
+        PRINTER_READY.set(int(status.ready))
+        if status.problem is not None and status.problem != previous:
+            logger.warning(status.problem)
+        elif status.problem is None and previous is not None:
+            logger.info(f"The printer {self.printer_name} is back to {status.state}")
+
+    def current(self) -> PrinterStatus:
+        """Return the cached status, unknown if missing or stale.
+
+        Returns
+        -------
+            PrinterStatus: The status of the printer.
+
+        """
+        status = self.status
+        if status is None or (
+            time.time() - status.checked_at > STALE_AFTER_INTERVALS * self.interval
+        ):
+            return PrinterStatus(self.printer_name, PrinterState.unknown)
+
+        return status
+
+    def ensure_ready(self) -> None:
+        """Check the cached status before a label is rendered for printing.
+
+        Raises
+        ------
+            PrinterUnavailableError: If the printer cannot print and the policy
+                is to refuse the print requests.
+
+        """
+        if not self.enabled:
+            return
+
+        problem = self.current().problem
+        if problem is None:
+            return
+
+        if self.policy == "queue":
+            logger.warning(f"Queuing the print job anyway: {problem}")
+            return
+
+        error_message = f"{problem}, retry later."
+        raise PrinterUnavailableError(
+            error_message,
+            retry_after=math.ceil(self.interval),
+        )
+
+    async def run(self) -> None:
+        """Poll the printer every interval, in the I/O thread pool."""
+        while True:
+            self.update(await run_blocking_io(self.poll))
+            await asyncio.sleep(self.interval)
+
+
+@lru_cache(maxsize=1)
+def get_printer_poller() -> PrinterStatusPoller:
+    """Return the printer status poller configured by the application settings.
+
+    Returns
+    -------
+        PrinterStatusPoller: The printer status poller.
+
+    """
+    settings = get_settings()
+    return PrinterStatusPoller(
+        printer_name=PRINTER_NAME,
+        interval=settings.printer_status_interval_seconds,
+        policy=settings.printer_unavailable_policy,
+        fake=settings.printer_backend == "fake",
+    )
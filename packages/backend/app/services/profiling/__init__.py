@@ -0,0 +1 @@
+"""Package contains modules for profiling the application."""
@@ -0,0 +1,169 @@
+"""Module measuring the event loop lag, and reporting what blocks the loop."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from functools import lru_cache
+
+from loguru import logger
+
+from app.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+from app.settings import get_settings
+
+# The loop is saturated when its lag exceeded the threshold within this window.
+SATURATION_WINDOW_SECONDS = 10.0
+
+
+class LoopMonitor:
+    """Monitor of the scheduling lag of the event loop.
+
+    A task sleeps for the interval and measures how late it wakes up, the lag
+    of every callback scheduled meanwhile. A watchdog thread logs the stack of
+    the loop once it did not wake the task for longer than the block threshold,
+    while the loop is still blocked.
+
+    Attributes
+    ----------
+        interval (float): The time between two measurements, in seconds.
+        block_threshold (float): The lag from which the loop is reported as
+            blocked, in seconds.
+        saturation_lag (float): The lag from which the loop is saturated, in
+            seconds.
+
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        block_threshold: float,
+        saturation_lag: float,
+    ) -> None:
+        """Initialise the LoopMonitor.
+
+        Args:
+        ----
+            interval (float): The time between two measurements, in seconds.
+            block_threshold (float): The lag from which the loop is reported as
+                blocked, in seconds.
+            saturation_lag (float): The lag from which the loop is saturated,
+                in seconds.
+
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.saturation_lag = saturation_lag
+        window = math.ceil(SATURATION_WINDOW_SECONDS / interval) if interval else 1
+        self._lags: deque[float] = deque(maxlen=max(window, 1))
+        self._last_wake = time.monotonic()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the lag is measured at all."""
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the lag is being measured."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def lag(self) -> float | None:
+        """The maximum lag of the saturation window, None before measuring."""
+        return max(self._lags, default=None)
+
+    @property
+    def saturated(self) -> bool:
+        """Whether the lag exceeded the saturation lag within the window."""
+        lag = self.lag
+        return lag is not None and lag >= self.saturation_lag
+
+    def start(self) -> None:
+        """Start measuring the lag of the running loop, and watching for blocks."""
+        if self.running:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._stopped.clear()
+        self._last_wake = time.monotonic()
+        self._task = loop.create_task(self._measure())
+        self._watchdog = threading.Thread(
+            target=self._watch,
+            args=(loop, threading.get_ident()),
+            name="loop-watchdog",
+            daemon=True,
+        )
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop measuring the lag and watching the loop."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        """Measure the lag of the loop every interval."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+            self._last_wake = time.monotonic()
+            self._lags.append(lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread_id: int) -> None:
+        """Log the stack of the loop thread whenever the loop is blocked.
+
+        Args:
+        ----
+            loop (asyncio.AbstractEventLoop): The monitored loop.
+            loop_thread_id (int): The id of the thread running the loop.
+
+        """
+        reported_wake: float | None = None
+        while not self._stopped.wait(self.block_threshold / 2):
+            last_wake = self._last_wake
+            blocked_for = time.monotonic() - last_wake - self.interval
+            if blocked_for < self.block_threshold or reported_wake == last_wake:
+                continue
+
+            reported_wake = last_wake
+            EVENT_LOOP_BLOCKS.inc()
+            frame = sys._current_frames().get(loop_thread_id)  # noqa: SLF001
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            task = asyncio.current_task(loop)
+            task_name = task.get_name() if task is not None else "-"
+            logger.warning(
+                f"Event loop blocked for {blocked_for:.3f}s by task {task_name}:\n"
+                f"{stack}",
+            )
+
+
+@lru_cache(maxsize=1)
+def get_loop_monitor() -> LoopMonitor:
+    """Return the event loop monitor configured by the application settings.
+
+    Returns
+    -------
+        LoopMonitor: The event loop monitor.
+
+    """
+    settings = get_settings()
+    return LoopMonitor(
+        interval=settings.loop_monitor_interval_seconds,
+        block_threshold=settings.loop_block_threshold_seconds,
+        saturation_lag=settings.loop_saturation_lag_seconds,
+    )
@@ -0,0 +1,186 @@
+"""Module for snapshotting the allocations and measuring the process memory."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import tracemalloc
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.services.profiling.tracing import acquire_tracing, release_tracing
+
+# Snapshots kept for the diffs, the oldest ones are dropped beyond it.
+MAX_SNAPSHOTS = 8
+
+# Resident set size of the process, in pages, on Linux.
+PROC_STATM_PATH = Path("/proc/self/statm")
+
+# Allocations of tracemalloc itself, left out of the snapshots.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+)
+
+
+class SnapshotNotFoundError(LookupError):
+    """Raised when a snapshot is not, or no longer, kept."""
+
+
+def get_rss_bytes() -> int | None:
+    """Get the resident set size of the process.
+
+    Returns
+    -------
+        int | None: The resident set size, in bytes, or None if it cannot be
+            read on this platform.
+
+    """
+    try:
+        resident_pages = int(PROC_STATM_PATH.read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _get_module_names() -> dict[str, str]:
+    """Get the names of the imported modules, by the path of their file."""
+    module_names = {}
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, "__file__", None)
+        if filename:
+            module_names[filename] = name
+
+    return module_names
+
+
+class MemorySnapshots:
+    """Snapshots of the traced allocations, compared by module.
+
+    The allocations are traced from the first snapshot until the snapshots
+    are cleared, tracing slows the application down meanwhile.
+
+    Attributes
+    ----------
+        tracing (bool): Whether the snapshots trace the allocations.
+
+    """
+
+    def __init__(self) -> None:
+        """Initialise the MemorySnapshots."""
+        self.tracing = False
+        self._snapshots: deque[tuple[int, tracemalloc.Snapshot]] = deque(
+            maxlen=MAX_SNAPSHOTS,
+        )
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def take(self) -> dict[str, Any]:
+        """Take a snapshot of the traced allocations, starting the tracing.
+
+        Returns
+        -------
+            dict[str, Any]: The id of the snapshot, the memory traced and the
+                resident set size of the process.
+
+        """
+        with self._lock:
+            if not self.tracing:
+                acquire_tracing()
+                self.tracing = True
+            snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots.append((snapshot_id, snapshot))
+
+        traced, peak = tracemalloc.get_traced_memory()
+
+        return {
+            "snapshot_id": snapshot_id,
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "rss_bytes": get_rss_bytes(),
+        }
+
+    def clear(self) -> None:
+        """Drop the snapshots and stop tracing the allocations."""
+        with self._lock:
+            self._snapshots.clear()
+            if self.tracing:
+                release_tracing()
+                self.tracing = False
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        """Get a kept snapshot by id."""
+        for kept_id, snapshot in self._snapshots:
+            if kept_id == snapshot_id:
+                return snapshot
+
+        error_message = f"The snapshot {snapshot_id} is not kept."
+        raise SnapshotNotFoundError(error_message)
+
+    def diff(
+        self,
+        snapshot_id: int,
+        base_id: int | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Compare the allocations of two snapshots, grouped by module.
+
+        Args:
+        ----
+            snapshot_id (int): The id of the snapshot.
+            base_id (int | None, optional): The id of the snapshot compared to.
+                If None, the snapshot taken before it. Defaults to None.
+            limit (int, optional): The amount of modules returned, the ones
+                whose memory grew or shrank the most. Defaults to 20.
+
+        Raises:
+        ------
+            SnapshotNotFoundError: If a snapshot is not kept.
+
+        Returns:
+        -------
+            list[dict[str, Any]]: The memory and the blocks allocated by every
+                module, and their change since the base snapshot.
+
+        """
+        with self._lock:
+            snapshot = self._get(snapshot_id)
+            base = self._get(snapshot_id - 1 if base_id is None else base_id)
+
+        module_names = _get_module_names()
+        modules: dict[str, dict[str, Any]] = {}
+        for stat in snapshot.compare_to(base, "filename"):
+            filename = stat.traceback[0].filename
+            module = modules.setdefault(
+                module_names.get(filename, filename),
+                {"size_bytes": 0, "size_diff_bytes": 0, "count": 0, "count_diff": 0},
+            )
+            module["size_bytes"] += stat.size
+            module["size_diff_bytes"] += stat.size_diff
+            module["count"] += stat.count
+            module["count_diff"] += stat.count_diff
+
+        ranked = sorted(
+            modules.items(),
+            key=lambda item: abs(item[1]["size_diff_bytes"]),
+            reverse=True,
+        )
+
+        return [{"module": name, **module} for name, module in ranked[:limit]]
+
+
+@lru_cache(maxsize=1)
+def get_memory_snapshots() -> MemorySnapshots:
+    """Return the snapshots of the traced allocations.
+
+    Returns
+    -------
+        MemorySnapshots: The memory snapshots.
+
+    """
+    return MemorySnapshots()
@@ -0,0 +1,127 @@
+"""Module with the middleware setting the context of the requests being served."""
+
+from __future__ import annotations
+
+import re
+import time
+import uuid
+from typing import TYPE_CHECKING
+
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.routing import Match
+
+from app.services.profiling.request_profile import RequestProfile, get_profile_store
+from app.services.profiling.stages import (
+    RequestContext,
+    current_endpoint,
+    current_request,
+)
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request ids accepted from the clients, others are replaced by a new one.
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+# Values of the `profile` query parameter and `X-Profile` header enabling it.
+PROFILE_FLAG_VALUES = {"1", "true"}
+
+
+def get_endpoint_name(scope: Scope) -> str:
+    """Get the method and route path of the endpoint a request is routed to.
+
+    Args:
+    ----
+        scope (Scope): The ASGI scope of the request.
+
+    Returns:
+    -------
+        str: The endpoint, e.g. "GET /label/{label_id}/pdf", or "-" if no
+            route matches the request.
+
+    """
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{scope['method']} {route.path}"
+
+    return "-"
+
+
+def _get_request_id(headers: Headers) -> str:
+    """Get the id sent by the client in `X-Request-ID`, or a new one."""
+    request_id = headers.get("x-request-id", "")
+    if REQUEST_ID_PATTERN.fullmatch(request_id):
+        return request_id
+
+    return uuid.uuid4().hex
+
+
+def _is_profiled(scope: Scope, headers: Headers) -> bool:
+    """Whether the client asked for the request to be profiled."""
+    flag = QueryParams(scope.get("query_string", b"")).get("profile")
+    if flag is None:
+        flag = headers.get("x-profile", "")
+
+    return flag.lower() in PROFILE_FLAG_VALUES
+
+
+class RequestContextMiddleware:
+    """ASGI middleware setting the endpoint and the context of the requests.
+
+    Every response carries the `X-Request-ID` of its request and the time
+    spent in its stages in `Server-Timing`. The requests sent with the
+    `profile=1` query parameter or the `X-Profile: 1` header are profiled when
+    the request profiling is enabled, and their profile is stored by request
+    id once the response is sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialise the RequestContextMiddleware.
+
+        Args:
+        ----
+            app (ASGIApp): The application.
+
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve a request with its endpoint and context set."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        endpoint = get_endpoint_name(scope)
+        request = RequestContext(
+            request_id=_get_request_id(headers),
+            endpoint=endpoint,
+            start=time.perf_counter(),
+        )
+        if get_settings().request_profiling_enabled and _is_profiled(scope, headers):
+            profile = RequestProfile(request.request_id, endpoint)
+            await profile.start()
+            request.profile = profile
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-ID"] = request.request_id
+                response_headers["Server-Timing"] = request.server_timing()
+                response_headers["Timing-Allow-Origin"] = "*"
+            await send(message)
+
+        endpoint_token = current_endpoint.set(endpoint)
+        request_token = current_request.set(request)
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            current_request.reset(request_token)
+            current_endpoint.reset(endpoint_token)
+            if request.profile is not None:
+                get_profile_store().put(
+                    request.request_id,
+                    await request.profile.finish(dict(request.timings)),
+                )
@@ -0,0 +1,216 @@
+"""Module for profiling single requests, their function timings and allocations."""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from functools import lru_cache
+from typing import Any
+
+from app.services.profiling.tracing import acquire_tracing, release_tracing
+from app.settings import get_settings
+from app.utils.blocking_io import run_blocking_io
+from app.utils.lru_cache import LRUCache
+
+# Functions and allocation lines reported in a profile.
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+
+
+def _start_tracing() -> tracemalloc.Snapshot:
+    """Start tracing the allocations for a profile.
+
+    Returns
+    -------
+        tracemalloc.Snapshot: The allocations traced beforehand.
+
+    """
+    acquire_tracing()
+    tracemalloc.reset_peak()
+
+    return tracemalloc.take_snapshot()
+
+
+def _stop_tracing() -> tuple[tracemalloc.Snapshot, int]:
+    """Stop tracing the allocations for a profile.
+
+    Returns
+    -------
+        tuple[tracemalloc.Snapshot, int]: The allocations traced, and the peak
+            of the traced memory, in bytes.
+
+    """
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    release_tracing()
+
+    return snapshot, peak
+
+
+def _function_name(function: tuple[str, int, str]) -> str:
+    """Name a profiled function by its file, line and name, as pstats prints it."""
+    filename, line, name = function
+    if filename == "~" and line == 0:
+        return name
+
+    return f"{filename}:{line}({name})"
+
+
+class RequestProfile:
+    """Deterministic profile of the stages of a request, and of its allocations.
+
+    Every outermost render stage of the request is profiled with cProfile in
+    the thread running it, and the allocations are traced with tracemalloc
+    from the start of the request to its end. The heap snapshots are taken
+    and compared in the I/O thread pool, off the event loop.
+
+    Attributes
+    ----------
+        request_id (str): The id of the profiled request.
+        endpoint (str): The endpoint of the profiled request.
+
+    """
+
+    def __init__(self, request_id: str, endpoint: str) -> None:
+        """Initialise the RequestProfile.
+
+        Args:
+        ----
+            request_id (str): The id of the profiled request.
+            endpoint (str): The endpoint of the profiled request.
+
+        """
+        self.request_id = request_id
+        self.endpoint = endpoint
+        self._start = time.perf_counter()
+        self._profiles: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._before: tracemalloc.Snapshot | None = None
+
+    async def start(self) -> None:
+        """Start tracing the allocations of the request."""
+        self._before = await run_blocking_io(_start_tracing)
+
+    def start_stage(self) -> cProfile.Profile | None:
+        """Start profiling a stage in the current thread.
+
+        Returns
+        -------
+            cProfile.Profile | None: The profiler of the stage, or None if
+                another profiler is already active.
+
+        """
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+
+        return profiler
+
+    def stop_stage(self, profiler: cProfile.Profile) -> None:
+        """Stop profiling a stage and keep its profile.
+
+        Args:
+        ----
+            profiler (cProfile.Profile): The profiler of the stage.
+
+        """
+        profiler.disable()
+        with self._lock:
+            self._profiles.append(profiler)
+
+    async def finish(self, timings: dict[str, float]) -> dict[str, Any]:
+        """Stop tracing the allocations and summarise the profile.
+
+        Args:
+        ----
+            timings (dict[str, float]): The time spent in every stage of the
+                request, in seconds.
+
+        Returns:
+        -------
+            dict[str, Any]: The summary of the profile.
+
+        """
+        duration = time.perf_counter() - self._start
+        return await run_blocking_io(self._summarise, timings, duration)
+
+    def _summarise(self, timings: dict[str, float], duration: float) -> dict[str, Any]:
+        """Stop tracing the allocations and summarise the profile, blocking.
+
+        Args:
+        ----
+            timings (dict[str, float]): The time spent in every stage of the
+                request, in seconds.
+            duration (float): The duration of the request, in seconds.
+
+        Returns:
+        -------
+            dict[str, Any]: The request, its duration and the time spent in
+                its stages, the functions taking the most cumulative time and
+                the lines allocating the most memory.
+
+        """
+        after, peak = _stop_tracing()
+        with self._lock:
+            profiles = list(self._profiles)
+
+        functions: list[dict[str, Any]] = []
+        if profiles:
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            rows = sorted(
+                stats.stats.items(),  # type: ignore[attr-defined]
+                key=lambda item: item[1][3],
+                reverse=True,
+            )
+            functions = [
+                {
+                    "function": _function_name(function),
+                    "calls": calls,
+                    "total_seconds": total,
+                    "cumulative_seconds": cumulative,
+                }
+                for function, (_, calls, total, cumulative, _) in rows[:TOP_FUNCTIONS]
+            ]
+
+        allocations = []
+        if self._before is not None:
+            allocations = [
+                {
+                    "line": str(stat.traceback),
+                    "count": stat.count_diff,
+                    "size_bytes": stat.size_diff,
+                }
+                for stat in after.compare_to(self._before, "lineno")
+                if stat.size_diff > 0
+            ]
+
+        return {
+            "request_id": self.request_id,
+            "endpoint": self.endpoint,
+            "duration_seconds": duration,
+            "stages": timings,
+            "functions": functions,
+            "allocations": {
+                "peak_bytes": peak,
+                "lines": allocations[:TOP_ALLOCATIONS],
+            },
+        }
+
+
+@lru_cache(maxsize=1)
+def get_profile_store() -> LRUCache[str, dict[str, Any]]:
+    """Return the profiles of the latest profiled requests, by request id.
+
+    Returns
+    -------
+        LRUCache[str, dict[str, Any]]: The profiles, by request id.
+
+    """
+    return LRUCache(max_entries=get_settings().profile_store_size)
@@ -0,0 +1,215 @@
+"""Module for sampling the stacks of the busy threads, with bounded overhead."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from app.services.profiling.stages import get_thread_stages
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from types import FrameType
+
+# Samples are aggregated by window of this many seconds.
+BUCKET_SECONDS = 10
+
+# Frames kept from the innermost one, deeper stacks are truncated at the root.
+MAX_STACK_DEPTH = 64
+
+# Root frame of the samples of the event loop, which serves every endpoint.
+EVENT_LOOP_ROOT = "event_loop"
+
+
+def _frame_name(frame: FrameType) -> str:
+    """Name a frame by its module and function, e.g. "fpdf.fpdf:FPDF.cell"."""
+    module = frame.f_globals.get("__name__", "?")
+
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _collapse(frame: FrameType) -> list[str]:
+    """Get the frames of a stack from the root, as collapsed stack names."""
+    names: list[str] = []
+    current: FrameType | None = frame
+    while current is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(current))
+        current = current.f_back
+    names.reverse()
+
+    return names
+
+
+class StackSampler:
+    """Background thread sampling the stacks of the threads at work.
+
+    The threads inside a render stage are sampled under their endpoint and
+    stage, and the event loop thread under `event_loop` unless it is idle,
+    waiting on its selector. Samples are counted per collapsed stack, in
+    windows of `BUCKET_SECONDS` kept for the retention period.
+
+    The sampler sleeps for the sampling interval between samples, or longer
+    when sampling takes more than `max_overhead` of the time.
+
+    Attributes
+    ----------
+        interval (float): The time between samples, in seconds.
+        max_overhead (float): The maximum fraction of time spent sampling.
+        event_loop_thread_id (int | None): The id of the event loop thread.
+        sampling_seconds (float): The total time spent sampling.
+
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_overhead: float,
+        retention_seconds: float,
+    ) -> None:
+        """Initialise the StackSampler.
+
+        Args:
+        ----
+            interval (float): The time between samples, in seconds.
+            max_overhead (float): The maximum fraction of time spent sampling.
+            retention_seconds (float): How long samples are kept, in seconds.
+
+        """
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.event_loop_thread_id: int | None = None
+        self.sampling_seconds = 0.0
+        self._buckets: deque[tuple[int, Counter[str]]] = deque(
+            maxlen=int(retention_seconds // BUCKET_SECONDS) + 1,
+        )
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampler thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, event_loop_thread_id: int | None = None) -> None:
+        """Start sampling in a daemon thread.
+
+        Args:
+        ----
+            event_loop_thread_id (int | None, optional): The id of the event
+                loop thread, sampled along with the render stages. If None,
+                only the render stages are sampled. Defaults to None.
+
+        """
+        if self.running:
+            return
+
+        self.event_loop_thread_id = event_loop_thread_id
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="stack-sampler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling, waiting for the sampler thread to exit."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Sample until stopped, keeping the overhead under its maximum."""
+        while not self._stopped.is_set():
+            start = time.perf_counter()
+            self.sample()
+            duration = time.perf_counter() - start
+            self.sampling_seconds += duration
+            self._stopped.wait(max(self.interval, duration / self.max_overhead))
+
+    def sample(self) -> None:
+        """Take a sample of the stacks of the threads at work."""
+        own_thread_id = threading.get_ident()
+        thread_stages = get_thread_stages()
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+            if thread_id == own_thread_id:
+                continue
+
+            thread_stage = thread_stages.get(thread_id)
+            if thread_stage is not None:
+                root = list(thread_stage)
+            elif (
+                thread_id == self.event_loop_thread_id
+                and frame.f_globals.get("__name__") != "selectors"
+            ):
+                root = [EVENT_LOOP_ROOT]
+            else:
+                continue
+            stacks.append(";".join(root + _collapse(frame)))
+
+        if not stacks:
+            return
+
+        bucket_start = int(time.time() // BUCKET_SECONDS) * BUCKET_SECONDS
+        with self._lock:
+            if not self._buckets or self._buckets[-1][0] != bucket_start:
+                self._buckets.append((bucket_start, Counter()))
+            self._buckets[-1][1].update(stacks)
+
+    def collapsed_stacks(self, seconds: float, endpoint: str | None = None) -> str:
+        """Get the samples of a time window as collapsed stacks.
+
+        Every line is a stack, its frames separated by semicolons from the
+        endpoint and the stage, then the amount of samples, the format read by
+        flamegraph.pl and speedscope.
+
+        Args:
+        ----
+            seconds (float): The length of the window, up to now, in seconds.
+            endpoint (str | None, optional): The endpoint the samples are
+                limited to, e.g. "POST /label/create". If None, every sample
+                is included. Defaults to None.
+
+        Returns:
+        -------
+            str: The collapsed stacks, one per line.
+
+        """
+        since = time.time() - seconds
+        samples: Counter[str] = Counter()
+        with self._lock:
+            for bucket_start, bucket in self._buckets:
+                if bucket_start + BUCKET_SECONDS > since:
+                    samples.update(bucket)
+
+        prefix = f"{endpoint};" if endpoint is not None else ""
+
+        return "".join(
+            f"{stack} {count}\n"
+            for stack, count in sorted(samples.items())
+            if stack.startswith(prefix)
+        )
+
+
+@lru_cache(maxsize=1)
+def get_stack_sampler() -> StackSampler:
+    """Return the stack sampler configured by the application settings.
+
+    Returns
+    -------
+        StackSampler: The stack sampler.
+
+    """
+    settings = get_settings()
+    return StackSampler(
+        interval=settings.profiler_interval_seconds,
+        max_overhead=settings.profiler_max_overhead,
+        retention_seconds=settings.profiler_retention_seconds,
+    )
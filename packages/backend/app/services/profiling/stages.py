@@ -0,0 +1,156 @@
+"""Module tracking the render stages of the requests and of the threads."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from app.services.profiling.request_profile import RequestProfile
+
+# The endpoint of the request being served, e.g. "POST /label/create". Worker
+# threads started with `asyncio.to_thread` or `run_blocking_io` inherit it.
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="-")
+
+# The endpoint and stage of the threads inside a render stage, by thread id.
+_thread_stages: dict[int, tuple[str, str]] = {}
+
+
+@dataclass
+class RequestContext:
+    """The timings, and the profile if requested, of the request being served.
+
+    Attributes
+    ----------
+        request_id (str): The id of the request.
+        endpoint (str): The endpoint of the request.
+        start (float): The `perf_counter` time the request started at.
+        profile (RequestProfile | None): The profile of the request, if
+            requested. Defaults to None.
+        timings (dict[str, float]): The time spent in every stage, in seconds.
+
+    """
+
+    request_id: str
+    endpoint: str
+    start: float = field(default_factory=time.perf_counter)
+    profile: RequestProfile | None = None
+    timings: dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, stage: str, duration: float) -> None:
+        """Add the time spent in a stage.
+
+        Args:
+        ----
+            stage (str): The stage.
+            duration (float): The time spent, in seconds.
+
+        """
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + duration
+
+    def server_timing(self) -> str:
+        """Format the timings of the stages and of the request as Server-Timing.
+
+        Returns
+        -------
+            str: The value of the Server-Timing header, in milliseconds.
+
+        """
+        with self._lock:
+            timings = {**self.timings, "total": time.perf_counter() - self.start}
+
+        return ", ".join(
+            f"{stage};dur={duration * 1000:.1f}" for stage, duration in timings.items()
+        )
+
+
+# The context of the request being served, set by the RequestContextMiddleware.
+current_request: ContextVar[RequestContext | None] = ContextVar(
+    "current_request",
+    default=None,
+)
+
+
+@contextmanager
+def request_stage(stage: str) -> Iterator[None]:
+    """Time a stage of the current request, e.g. waiting for the printer.
+
+    Unlike `render_stage`, the thread is not marked, so that the stage can
+    await on the event loop.
+
+    Args:
+    ----
+        stage (str): The stage.
+
+    Yields:
+    ------
+        None
+
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request = current_request.get()
+        if request is not None:
+            request.record(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def render_stage(stage: str) -> Iterator[None]:
+    """Mark the current thread as working on a stage of the current request.
+
+    The time spent is added to the timings of the request, and the stage is
+    profiled if the request is. Stages nest, the innermost one is reported
+    until it completes, and a stage nested in itself is timed once.
+
+    Args:
+    ----
+        stage (str): The stage, e.g. "validate", "layout", "render", "write"
+            or "print".
+
+    Yields:
+    ------
+        None
+
+    """
+    thread_id = threading.get_ident()
+    previous = _thread_stages.get(thread_id)
+    _thread_stages[thread_id] = (current_endpoint.get(), stage)
+    request = current_request.get()
+    profiler = (
+        request.profile.start_stage()
+        if request is not None and request.profile is not None and previous is None
+        else None
+    )
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if request is not None and (previous is None or previous[1] != stage):
+            request.record(stage, time.perf_counter() - start)
+        if profiler is not None and request is not None and request.profile:
+            request.profile.stop_stage(profiler)
+        if previous is None:
+            _thread_stages.pop(thread_id, None)
+        else:
+            _thread_stages[thread_id] = previous
+
+
+def get_thread_stages() -> dict[int, tuple[str, str]]:
+    """Get the endpoint and stage of the threads inside a render stage.
+
+    Returns
+    -------
+        dict[int, tuple[str, str]]: The endpoint and stage, by thread id.
+
+    """
+    return dict(_thread_stages)
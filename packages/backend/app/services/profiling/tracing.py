@@ -0,0 +1,35 @@
+"""Module sharing the tracing of the allocations between its users."""
+
+from __future__ import annotations
+
+import threading
+import tracemalloc
+
+# Frames kept in the tracebacks of the traced allocations.
+TRACEMALLOC_FRAMES = 1
+
+# Users of the tracing, tracemalloc is stopped when none is left unless it was
+# already tracing beforehand.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def acquire_tracing() -> None:
+    """Start tracing the allocations, unless they already are."""
+    global _tracing_users, _tracing_started  # noqa: PLW0603
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def release_tracing() -> None:
+    """Stop tracing the allocations once their last user releases them."""
+    global _tracing_users, _tracing_started  # noqa: PLW0603
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
@@ -0,0 +1 @@
+"""Package contains modules for persisting labels."""
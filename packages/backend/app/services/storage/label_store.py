@@ -0,0 +1,236 @@
+"""Module for storing labels as canonical data and re-rendering them lazily."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from app.models import StoredLabel
+from app.services.create.create_pdf import get_template_version, render_label_pdf
+from app.services.profiling.stages import render_stage
+from app.settings import get_settings
+from app.utils.filename import PDF_SUFFIX, get_label_id
+from app.utils.lru_cache import LRUCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from app.models import LabelData
+
+RECORD_SUFFIX = ".json"
+
+
+class LabelStore:
+    """Store of labels, persisted as PDF files or as label data records.
+
+    A label stored as data is a few hundred bytes of JSON with the template
+    version it was created with, and its PDF is re-rendered when needed.
+    Recently rendered PDFs are kept in an in-memory LRU cache.
+
+    Attributes
+    ----------
+        output_dir (Path): The directory where labels are persisted.
+        cache (LRUCache[str, bytes]): The rendered PDFs, by label id.
+
+    """
+
+    def __init__(self, output_dir: Path, cache_size: int) -> None:
+        """Initialise the LabelStore.
+
+        Args:
+        ----
+            output_dir (Path): The directory where labels are persisted.
+            cache_size (int): The maximum amount of rendered PDFs kept in memory.
+
+        """
+        self.output_dir = output_dir
+        self.cache: LRUCache[str, bytes] = LRUCache(max_entries=cache_size)
+
+    def pdf_path(self, filename: str) -> Path:
+        """Get the path of the PDF file of a label.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+
+        Returns:
+        -------
+            Path: The path of the PDF file.
+
+        """
+        return self.output_dir / f"{get_label_id(filename)}{PDF_SUFFIX}"
+
+    def record_path(self, filename: str) -> Path:
+        """Get the path of the data record of a label.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+
+        Returns:
+        -------
+            Path: The path of the data record.
+
+        """
+        return self.output_dir / f"{get_label_id(filename)}{RECORD_SUFFIX}"
+
+    def save_pdf(self, filename: str, pdf_bytes: bytes) -> Path:
+        """Persist the rendered PDF of a label.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+            pdf_bytes (bytes): The content of the PDF label.
+
+        Returns:
+        -------
+            Path: The path of the PDF file.
+
+        """
+        pdf_path = self.pdf_path(filename)
+        with render_stage("write"):
+            pdf_path.write_bytes(pdf_bytes)
+
+        return pdf_path
+
+    def save_record(
+        self,
+        filename: str,
+        label_data: LabelData,
+        show_borders: bool = False,
+        pdf_bytes: bytes | None = None,
+    ) -> Path:
+        """Persist the label data, so that the PDF can be rendered again later.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+            label_data (LabelData): The complete label data.
+            show_borders (bool, optional): Whether the label was rendered with
+                debug borders. Defaults to False.
+            pdf_bytes (bytes | None, optional): The already rendered PDF, kept in
+                the in-memory cache. Defaults to None.
+
+        Returns:
+        -------
+            Path: The path of the data record.
+
+        """
+        record = StoredLabel(
+            template_version=get_template_version(label_data),
+            show_borders=show_borders,
+            label_data=label_data,
+        )
+        record_path = self.record_path(filename)
+        with render_stage("write"):
+            record_path.write_text(record.model_dump_json(exclude_none=True))
+
+        if pdf_bytes is not None:
+            self.cache.put(get_label_id(filename), pdf_bytes)
+
+        return record_path
+
+    def has_record(self, filename: str) -> bool:
+        """Check whether a label has been persisted as data.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+
+        Returns:
+        -------
+            bool: True if a data record exists for the label.
+
+        """
+        try:
+            return self.record_path(filename).exists()
+        except ValueError:
+            return False
+
+    def load_record(self, filename: str) -> StoredLabel:
+        """Load the data record of a label.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+
+        Raises:
+        ------
+            FileNotFoundError: If the label has no data record.
+
+        Returns:
+        -------
+            StoredLabel: The label data, with the template version it was
+                created with.
+
+        """
+        label_id = get_label_id(filename)
+        record_path = self.record_path(label_id)
+        if not record_path.exists():
+            error_message = f"File not found at path {label_id}{RECORD_SUFFIX}."
+            raise FileNotFoundError(error_message)
+
+        return StoredLabel.model_validate_json(record_path.read_text())
+
+    def load_pdf(self, filename: str) -> bytes:
+        """Load the PDF of a label, re-rendering it from its data if needed.
+
+        Args:
+        ----
+            filename (str): The label filename or id.
+
+        Raises:
+        ------
+            FileNotFoundError: If the label has not been persisted.
+
+        Returns:
+        -------
+            bytes: The content of the PDF label.
+
+        """
+        label_id = get_label_id(filename)
+        pdf_bytes = self.cache.get(label_id)
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+        pdf_path = self.pdf_path(label_id)
+        if pdf_path.exists():
+            return pdf_path.read_bytes()
+
+        if not self.has_record(label_id):
+            error_message = f"File not found at path {label_id}{PDF_SUFFIX}."
+            raise FileNotFoundError(error_message)
+
+        record = self.load_record(label_id)
+        template_version = get_template_version(record.label_data)
+        if record.template_version != template_version:
+            logger.warning(
+                f"Label {label_id} was stored with template version "
+                f"{record.template_version}, rendering with {template_version}",
+            )
+
+        pdf_bytes = render_label_pdf(
+            record.label_data,
+            show_borders=record.show_borders,
+        )
+        self.cache.put(label_id, pdf_bytes)
+
+        return pdf_bytes
+
+
+@lru_cache(maxsize=1)
+def get_label_store() -> LabelStore:
+    """Return the label store configured by the application settings.
+
+    Returns
+    -------
+        LabelStore: The label store.
+
+    """
+    settings = get_settings()
+    return LabelStore(
+        output_dir=settings.pdf_output_dir,
+        cache_size=settings.rendered_pdf_cache_size,
+    )
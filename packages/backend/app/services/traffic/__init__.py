@@ -0,0 +1 @@
+"""Package contains modules for capturing the production traffic."""
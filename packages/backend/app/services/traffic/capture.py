@@ -0,0 +1,186 @@
+"""Module for capturing the label requests, anonymised, to replay them offline."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from app.settings import get_settings
+from app.utils.blocking_io import run_blocking_io
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Requests captured: the JSON bodies posted to the label endpoints.
+CAPTURED_PATH_PREFIX = "/label/"
+CAPTURED_CONTENT_TYPE = b"application/json"
+
+
+def _placeholder(text: str) -> str:
+    """Replace the letters of a text, keeping its length, case and separators."""
+    return "".join(
+        ("X" if char.isupper() else "x") if char.isalpha() else char for char in text
+    )
+
+
+def anonymize_label(payload: Any) -> Any:  # noqa: ANN401
+    """Replace the patient name and surname of a label payload by placeholders.
+
+    The placeholders have the same length as the names, so that the replayed
+    labels lay out the same amount of text.
+
+    Args:
+    ----
+        payload (Any): The label payload, or a list of them, as decoded from
+            JSON.
+
+    Returns:
+    -------
+        Any: The payload, with the patient names replaced.
+
+    """
+    if isinstance(payload, list):
+        return [anonymize_label(item) for item in payload]
+
+    if isinstance(payload, dict) and isinstance(payload.get("patient_info"), dict):
+        patient_info = payload["patient_info"]
+        payload = {
+            **payload,
+            "patient_info": {
+                **patient_info,
+                **{
+                    field: _placeholder(patient_info[field])
+                    for field in ("name", "surname")
+                    if isinstance(patient_info.get(field), str)
+                },
+            },
+        }
+
+    return payload
+
+
+class TrafficCapture:
+    """Writer of the captured requests, one JSON object per line.
+
+    Every line holds the arrival time of the request, its method, path and
+    query, the status of its response and its anonymised body.
+
+    Attributes
+    ----------
+        path (Path): The file the requests are appended to.
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialise the TrafficCapture.
+
+        Args:
+        ----
+            path (Path): The file the requests are appended to.
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record: dict[str, Any]) -> None:
+        """Append a captured request to the capture file.
+
+        Args:
+        ----
+            record (dict[str, Any]): The captured request.
+
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, self.path.open("a", encoding="utf-8") as capture_file:
+            capture_file.write(line)
+
+
+@lru_cache(maxsize=1)
+def get_traffic_capture() -> TrafficCapture | None:
+    """Return the traffic capture, if enabled by the application settings.
+
+    Returns
+    -------
+        TrafficCapture | None: The traffic capture, or None if disabled.
+
+    """
+    capture_path = get_settings().capture_path
+    if capture_path is None:
+        return None
+
+    capture_path.parent.mkdir(parents=True, exist_ok=True)
+    return TrafficCapture(capture_path)
+
+
+class TrafficCaptureMiddleware:
+    """ASGI middleware capturing the JSON bodies posted to the label endpoints.
+
+    The body is collected as the application reads it, and written once the
+    response is sent, off the event loop.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialise the TrafficCaptureMiddleware.
+
+        Args:
+        ----
+            app (ASGIApp): The application.
+
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve a request, capturing it if it is a label request."""
+        capture = get_traffic_capture()
+        if (
+            capture is None
+            or scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(CAPTURED_PATH_PREFIX)
+            or not dict(scope["headers"])
+            .get(b"content-type", b"")
+            .startswith(CAPTURED_CONTENT_TYPE)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        arrival = time.time()
+        chunks: list[bytes] = []
+        status: int | None = None
+
+        async def receive_body() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, send_status)
+        finally:
+            try:
+                body = anonymize_label(json.loads(b"".join(chunks)))
+            except ValueError:
+                body = None
+            if body is not None:
+                query = scope.get("query_string", b"").decode()
+                await run_blocking_io(
+                    capture.write,
+                    {
+                        "arrival": arrival,
+                        "method": scope["method"],
+                        "path": f"{scope['path']}?{query}" if query else scope["path"],
+                        "status": status,
+                        "body": body,
+                    },
+                )
@@ -0,0 +1 @@
+"""Package contains modules for validating labels without rendering them."""
@@ -0,0 +1,114 @@
+"""Module for validating label data and checking its texts fit the layout."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.models import LabelData
+from app.service_layer import validate_label_data
+from app.services.create.classes import select_template
+from app.services.create.text_metrics import text_width
+from app.services.profiling.stages import render_stage
+
+# Tolerance for rounding errors when comparing a text width to its cell.
+TEXT_FIT_TOLERANCE = 1e-6
+
+
+def format_validation_error(error: ValidationError) -> list[dict[str, str]]:
+    """Format a validation error as a list of field-level errors.
+
+    Args:
+    ----
+        error (ValidationError): The validation error.
+
+    Returns:
+    -------
+        list[dict[str, str]]: The field location, message and type of every error.
+
+    """
+    return [
+        {
+            "loc": ".".join(str(loc) for loc in detail["loc"]),
+            "msg": detail["msg"],
+            "type": detail["type"],
+        }
+        for detail in error.errors(include_url=False)
+    ]
+
+
+def check_text_fit(label_data: LabelData) -> list[dict[str, str]]:
+    """Check that every variable text of the label fits its cell on one line.
+
+    Args:
+    ----
+        label_data (LabelData): The complete label data.
+
+    Returns:
+    -------
+        list[dict[str, str]]: The field location, message and type of every
+            text that overflows its cell.
+
+    """
+    render_plan = select_template(
+        left=label_data.lens_specs.left is not None,
+        right=label_data.lens_specs.right is not None,
+    )
+
+    errors = []
+    for text_box in render_plan.get_text_boxes(label_data):
+        width = text_width(text_box.font_family, text_box.size_pt, text_box.text)
+        if width > text_box.width + TEXT_FIT_TOLERANCE:
+            errors.append(
+                {
+                    "loc": text_box.loc,
+                    "msg": (
+                        f"Text is {width:.2f} mm wide and does not fit its "
+                        f"{text_box.width:.2f} mm cell."
+                    ),
+                    "type": "text_overflow",
+                },
+            )
+
+    return errors
+
+
+def validate_label_payload(payload: Any) -> dict[str, Any]:  # noqa: ANN401
+    """Validate a label payload without rendering it.
+
+    Runs the `LabelData` model checks, the left/right lens presence rule and
+    the text fit check, stopping at the first stage that fails.
+
+    Args:
+    ----
+        payload (Any): The label payload, as decoded from JSON.
+
+    Returns:
+    -------
+        dict[str, Any]: Whether the label is valid and its field-level errors.
+
+    """
+    with render_stage("validate"):
+        try:
+            label_data = LabelData.model_validate(payload)
+        except ValidationError as error:
+            return {"valid": False, "errors": format_validation_error(error)}
+
+        try:
+            validate_label_data(label_data)
+        except ValueError as error:
+            return {
+                "valid": False,
+                "errors": [
+                    {
+                        "loc": "lens_specs",
+                        "msg": str(error),
+                        "type": "missing_lens_specs",
+                    },
+                ],
+            }
+
+        errors = check_text_fit(label_data)
+
+    return {"valid": not errors, "errors": errors}
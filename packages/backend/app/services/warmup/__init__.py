@@ -0,0 +1 @@
+"""Package contains modules for warming up the render pipeline."""
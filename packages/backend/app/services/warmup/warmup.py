@@ -0,0 +1,98 @@
+"""Module for warming up the render pipeline before serving traffic."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from loguru import logger
+
+from app.models import LabelData
+from app.services.create.create_pdf import render_label_pdf
+from app.services.create.text_metrics import FONT_FILES, get_glyph_advance_table
+
+_LENS_DATA = {
+    "batch": "25-0001",
+    "bc": "8.60",
+    "bc_toric": "8.40",
+    "dia": "14.20",
+    "pwr": "-1.00",
+    "cyl": "-0.75",
+    "ax": "180",
+    "add": "+2.00",
+    "sag": "1004",
+    "sag_toric": "1002",
+}
+
+# One throwaway label per template: single lens and double lens.
+WARMUP_LABELS = [
+    {
+        "patient_info": {"name": "Warm", "surname": "Up"},
+        "description": "Warm-up label",
+        "production_date": "01/01/2025",
+        "due_date": "01/01/2026",
+        "lens_specs": lens_specs,
+    }
+    for lens_specs in (
+        {"left": _LENS_DATA},
+        {"left": _LENS_DATA, "right": _LENS_DATA},
+    )
+]
+
+_ready = threading.Event()
+
+
+def warm_up() -> float:
+    """Preload the fonts and assets by rendering a label with every template.
+
+    Returns
+    -------
+        float: The duration of the warm-up, in seconds.
+
+    """
+    start = time.perf_counter()
+
+    for font_family in FONT_FILES:
+        get_glyph_advance_table(font_family)
+
+    for payload in WARMUP_LABELS:
+        render_label_pdf(LabelData.model_validate(payload))
+
+    return time.perf_counter() - start
+
+
+def run_warm_up() -> None:
+    """Warm up the render pipeline and mark the application as ready.
+
+    A failing warm-up is logged and does not keep the application from
+    becoming ready, since the first real label would simply pay the cost.
+    """
+    try:
+        duration = warm_up()
+    except Exception:  # noqa: BLE001
+        logger.exception("Render pipeline warm-up failed")
+    else:
+        logger.info(f"Render pipeline warmed up in {duration:.2f}s")
+
+    mark_ready()
+
+
+def mark_ready() -> None:
+    """Mark the application as ready to serve labels."""
+    _ready.set()
+
+
+def is_ready() -> bool:
+    """Check whether the warm-up has completed.
+
+    Returns
+    -------
+        bool: True once the application is ready to serve labels.
+
+    """
+    return _ready.is_set()
+
+
+def reset_readiness() -> None:
+    """Mark the application as not ready, until the next warm-up completes."""
+    _ready.clear()
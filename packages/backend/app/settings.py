@@ -0,0 +1,102 @@
+"""Application settings, overridable through environment variables."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+APP_DIR = Path(__file__).parent
+
+
+class Settings(BaseSettings):
+    """Runtime configuration of the backend.
+
+    Every field can be overridden with an environment variable prefixed by
+    `FREEDOM_LABEL_`, e.g. `FREEDOM_LABEL_STORAGE_MODE=data`.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="FREEDOM_LABEL_")
+
+    # "pdf" persists the rendered PDF file, "data" persists only the label
+    # payload and re-renders the PDF on demand.
+    storage_mode: Literal["pdf", "data"] = "pdf"
+    pdf_output_dir: Path = APP_DIR / "services" / "pdf_output"
+    rendered_pdf_cache_size: int = 32
+    # Processes rendering bulk imports in parallel, 0 means one per CPU core.
+    import_jobs: int = 0
+    preview_cache_size: int = 64
+    preview_cache_max_bytes: int = 8 * 1024 * 1024
+    # Render a throwaway label per template at startup, before reporting ready.
+    warm_up: bool = True
+    # Spare label documents, with page and fonts set up, kept per page size.
+    document_pool_size: int = 2
+    # Persist the labels of /label/create-print, after piping them to the printer.
+    persist_printed_labels: bool = False
+    # Renders in progress at once, and waiting for a slot before answering 429.
+    max_concurrent_renders: int = 2
+    max_queued_renders: int = 16
+    # Print jobs queued or being printed before answering 429.
+    max_queued_print_jobs: int = 32
+    # Label layouts kept for the output engines, by content hash.
+    layout_cache_size: int = 256
+    # Sample the stacks of the busy threads, for /admin/profile/stacks. The
+    # sampler backs off when sampling takes more than its overhead of the time.
+    profiler_enabled: bool = False
+    profiler_interval_seconds: float = 0.01
+    profiler_max_overhead: float = 0.02
+    profiler_retention_seconds: int = 3600
+    # Profile the requests sent with `profile=1` or `X-Profile: 1`, keeping
+    # their profiles for /admin/profile/requests/{request_id}.
+    request_profiling_enabled: bool = False
+    profile_store_size: int = 32
+    # Shut the worker down gracefully, for its supervisor to restart it, after
+    # this many renders or this much memory growth. 0 disables the limit.
+    recycle_after_renders: int = 0
+    recycle_after_growth_mb: int = 0
+    # Append the JSON bodies posted to the label endpoints, with the patient
+    # names replaced by placeholders, to this file for replay.
+    capture_path: Path | None = None
+    # "lpr" sends the labels to the printer, "fake" waits as long as printing
+    # takes instead, to replay traffic without a printer.
+    printer_backend: Literal["lpr", "fake"] = "lpr"
+    fake_print_seconds: float = 1.0
+    # Threads running the blocking file and spooler I/O, 0 means 4 more than
+    # the CPU cores, up to 32.
+    io_threads: int = 0
+    # Measure the event loop lag every interval, 0 disables it, and log the
+    # stack of the loop whenever it is blocked for longer than the threshold.
+    loop_monitor_interval_seconds: float = 0.25
+    loop_block_threshold_seconds: float = 0.5
+    # Lag within the last 10 seconds from which /health/saturation answers 503.
+    loop_saturation_lag_seconds: float = 1.0
+    # Poll the state of the printer from CUPS every interval, 0 disables it.
+    printer_status_interval_seconds: float = 10.0
+    # "fail" refuses the print requests while the last poll found the printer
+    # unable to print, "queue" queues them with a warning.
+    printer_unavailable_policy: Literal["fail", "queue"] = "fail"
+    # Time given to the renders and print jobs in progress to complete on
+    # shutdown, before the pending print jobs are left for the next process.
+    shutdown_deadline_seconds: float = 10.0
+    # SQLite journal of the print jobs, defaults to the output directory.
+    print_queue_path: Path | None = None
+    # Print job transitions within this interval share a single commit.
+    print_queue_group_commit_seconds: float = 0.005
+    # Attempts to print a job before failing it, retried after a delay doubling
+    # from the backoff, up to 30 seconds.
+    print_max_attempts: int = 3
+    print_retry_backoff_seconds: float = 1.0
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the application settings, loaded once per process.
+
+    Returns
+    -------
+        Settings: The application settings.
+
+    """
+    return Settings()
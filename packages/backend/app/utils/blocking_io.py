@@ -0,0 +1,114 @@
+"""Bounded thread pool running the blocking filesystem and subprocess work."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
+
+from app.metrics import IO_POOL_QUEUED, IO_POOL_WAIT
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Threads of the pool beyond the CPU cores, waiting on the disk or the spooler.
+IO_THREADS_PER_HOST = 4
+MAX_IO_THREADS = 32
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_io_threads() -> int:
+    """Get the amount of threads running the blocking I/O.
+
+    Returns
+    -------
+        int: The amount of threads.
+
+    """
+    return get_settings().io_threads or min(
+        MAX_IO_THREADS,
+        (os.cpu_count() or 1) + IO_THREADS_PER_HOST,
+    )
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the thread pool running the blocking I/O.
+
+    Returns
+    -------
+        ThreadPoolExecutor: The I/O thread pool.
+
+    """
+    global _executor  # noqa: PLW0603
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_get_io_threads(),
+            thread_name_prefix="blocking-io",
+        )
+    return _executor
+
+
+def shutdown_io_executor() -> None:
+    """Shut down the I/O thread pool, if it has been created."""
+    global _executor  # noqa: PLW0603
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def run_blocking_io(
+    func: Callable[P, R],
+    /,
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> R:
+    """Run a blocking function in the I/O thread pool, as `asyncio.to_thread`.
+
+    The context variables are copied to the worker thread, and the time spent
+    waiting for a thread is measured as `label_io_pool_wait_seconds`.
+
+    Args:
+    ----
+        func (Callable[P, R]): The blocking function.
+        *args (P.args): The positional arguments of the function.
+        **kwargs (P.kwargs): The keyword arguments of the function.
+
+    Returns:
+    -------
+        R: The result of the function.
+
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    submitted = time.perf_counter()
+    # Popped once, by the thread starting the call or by its cancellation.
+    queued = [submitted]
+    IO_POOL_QUEUED.inc()
+
+    def dequeue() -> None:
+        with contextlib.suppress(IndexError):
+            queued.pop()
+            IO_POOL_QUEUED.dec()
+
+    def run() -> R:
+        dequeue()
+        IO_POOL_WAIT.observe(time.perf_counter() - submitted)
+        return call()
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_io_executor(),
+            run,
+        )
+    finally:
+        dequeue()
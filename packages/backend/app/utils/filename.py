@@ -1,8 +1,13 @@
 """Filename generator."""
 
+import re
 import secrets
 from datetime import datetime, timezone
 
+PDF_SUFFIX = ".pdf"
+
+_LABEL_ID_PATTERN = re.compile(r"^[\w-]+$")
+
 
 def generate_random_filename() -> str:
     """Generate random filename.
@@ -14,4 +19,28 @@ def generate_random_filename() -> str:
     """
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
     random_int = secrets.randbelow(9000) + 1000
-    return f"{timestamp}_{random_int}.pdf"
+    return f"{timestamp}_{random_int}{PDF_SUFFIX}"
+
+
+def get_label_id(filename: str) -> str:
+    """Get the label id from a label filename, i.e. the filename without suffix.
+
+    Args:
+    ----
+        filename (str): The label filename, with or without the ".pdf" suffix.
+
+    Raises:
+    ------
+        ValueError: If the filename contains characters not allowed in a label id.
+
+    Returns:
+    -------
+        str: The label id.
+
+    """
+    label_id = filename.removesuffix(PDF_SUFFIX)
+    if not _LABEL_ID_PATTERN.match(label_id):
+        error_message = f"Invalid label id: {filename}."
+        raise ValueError(error_message)
+
+    return label_id
@@ -0,0 +1,141 @@
+"""Thread-safe in-memory LRU cache."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Least-recently-used cache bounded by entries and, optionally, by size.
+
+    Attributes
+    ----------
+        max_entries (int): The maximum number of entries kept in the cache.
+        max_bytes (int | None): The maximum total size of the cached values,
+            as measured by `sizeof`. If None, only `max_entries` applies.
+
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+    ) -> None:
+        """Initialise the cache.
+
+        Args:
+        ----
+            max_entries (int): The maximum number of entries.
+            max_bytes (int | None, optional): The maximum total size of the
+                values. Defaults to None.
+            sizeof (Callable[[V], int] | None, optional): The function measuring
+                the size of a value. Defaults to `len`.
+
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof: Callable[[V], int] = sizeof or len  # type: ignore[assignment]
+        self._data: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        """Return whether the key is cached, without refreshing it."""
+        return key in self._data
+
+    @property
+    def total_bytes(self) -> int:
+        """Return the total size of the cached values."""
+        return self._total_bytes
+
+    def get(self, key: K) -> V | None:
+        """Return the cached value and mark it as recently used.
+
+        Args:
+        ----
+            key (K): The cache key.
+
+        Returns:
+        -------
+            V | None: The cached value, or None if the key is not cached.
+
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entries if needed.
+
+        Args:
+        ----
+            key (K): The cache key.
+            value (V): The value to cache.
+
+        """
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if self.max_entries <= 0 or (
+            self.max_bytes is not None and size > self.max_bytes
+        ):
+            return
+
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._data[key] = (value, size)
+            self._total_bytes += size
+            self._evict()
+
+    def pop(self, key: K) -> V | None:
+        """Remove a value from the cache.
+
+        Args:
+        ----
+            key (K): The cache key.
+
+        Returns:
+        -------
+            V | None: The removed value, or None if the key was not cached.
+
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return None
+            self._total_bytes -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        """Remove every cached value."""
+        with self._lock:
+            self._data.clear()
+            self._total_bytes = 0
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries until the bounds are respected."""
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self._total_bytes > self.max_bytes
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self._total_bytes -= size
@@ -0,0 +1,39 @@
+"""Custom HTTP responses."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from fastapi.responses import StreamingResponse
+
+if TYPE_CHECKING:
+    from starlette.types import Receive, Scope, Send
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streaming response sent while the request body is still being read.
+
+    `StreamingResponse` listens for the client disconnection by consuming the
+    ASGI receive channel, which would swallow the request body chunks that the
+    response generator is reading.
+    """
+
+    async def __call__(
+        self,
+        scope: Scope,  # noqa: ARG002
+        receive: Receive,  # noqa: ARG002
+        send: Send,
+    ) -> None:
+        """Stream the response without consuming the receive channel.
+
+        Args:
+        ----
+            scope (Scope): The ASGI connection scope.
+            receive (Receive): The ASGI receive channel, left to the generator.
+            send (Send): The ASGI send channel.
+
+        """
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,59 @@
+"""Coalescing of concurrent identical calls into a single execution."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+    from typing import Any
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Run at most one call per key at a time, sharing its result.
+
+    The first caller of a key (the leader) starts the call; callers of the same
+    key arriving while it is in flight (the followers) await its result
+    instead of starting their own. The call is shielded, so a leader that is
+    cancelled, e.g. by a client disconnect, does not fail its followers.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the SingleFlight."""
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        """Return the amount of calls in flight."""
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: K,
+        call: Callable[[], Coroutine[Any, Any, V]],
+    ) -> tuple[V, bool]:
+        """Run the call, or join the call of the same key already in flight.
+
+        Args:
+        ----
+            key (K): The key identifying identical calls.
+            call (Callable[[], Coroutine[Any, Any, V]]): The call, only invoked
+                by the leader.
+
+        Returns:
+        -------
+            tuple[V, bool]: The result of the call, and whether it was shared
+                with a call already in flight.
+
+        """
+        future = self._calls.get(key)
+        shared = future is not None
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(future), shared
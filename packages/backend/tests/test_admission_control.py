@@ -0,0 +1,90 @@
+"""Test cases for the admission control of renders and print jobs."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from httpx import AsyncClient
+
+from app import service_layer
+from app.main import app
+from app.models import LabelData
+from app.services.lifecycle.admission_control import (
+    AdmissionController,
+    OverloadedError,
+    get_render_admission,
+)
+from app.services.storage.label_store import LabelStore
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+HTTP_STATUS_TOO_MANY_REQUESTS = 429
+
+
+@pytest.mark.anyio()
+async def test_admission_controller_bounds_the_queue() -> None:
+    """Test that work beyond the slots waits, and beyond the queue is refused."""
+    controller = AdmissionController("test", max_concurrency=1, max_queued=1)
+    controller.estimator.service_time = 2.5
+    released = asyncio.Event()
+
+    async def work() -> None:
+        async with controller.admit():
+            await released.wait()
+
+    running = asyncio.ensure_future(work())
+    waiting = asyncio.ensure_future(work())
+    await asyncio.sleep(0)
+    assert (controller.in_flight, controller.queued) == (1, 1)
+
+    with pytest.raises(OverloadedError) as error_info:
+        async with controller.admit():
+            pass
+    # Two units of work of 2.5s each on a single slot.
+    assert error_info.value.retry_after == 5  # noqa: PLR2004
+
+    released.set()
+    await asyncio.gather(running, waiting)
+    assert (controller.in_flight, controller.queued) == (0, 0)
+
+
+@pytest.mark.anyio()
+async def test_create_label_overloaded(
+    label_payload: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a saturated render queue answers 429 with Retry-After."""
+    admission = get_render_admission()
+    monkeypatch.setattr(admission, "max_concurrency", 0)
+    monkeypatch.setattr(admission, "max_queued", 0)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/label/create", json=label_payload)
+
+    assert response.status_code == HTTP_STATUS_TOO_MANY_REQUESTS
+    assert response.headers["X-Error-Code"] == "OVERLOADED_ERROR"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.anyio()
+async def test_stored_label_preview_overloaded(
+    label_payload: dict[str, Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the previews of stored labels go through the render admission."""
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+    label_store.save_record("stored", LabelData.model_validate(label_payload))
+    monkeypatch.setattr(service_layer, "get_label_store", lambda: label_store)
+    admission = get_render_admission()
+    monkeypatch.setattr(admission, "max_concurrency", 0)
+    monkeypatch.setattr(admission, "max_queued", 0)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/label/stored/preview.png")
+
+    assert response.status_code == HTTP_STATUS_TOO_MANY_REQUESTS
+    assert response.headers["X-Error-Code"] == "OVERLOADED_ERROR"
@@ -0,0 +1,34 @@
+"""Test cases for the thread pool running the blocking I/O."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.profiling.stages import current_endpoint
+from app.utils.blocking_io import run_blocking_io
+
+
+def _endpoint_and_thread() -> tuple[str, str]:
+    """Return the endpoint seen by the worker thread, and its name."""
+    return current_endpoint.get(), threading.current_thread().name
+
+
+@pytest.mark.anyio()
+async def test_blocking_io_runs_in_the_pool_with_the_context() -> None:
+    """Test that the call runs in the pool, sees the context and is measured."""
+    count_before = REGISTRY.get_sample_value("label_io_pool_wait_seconds_count")
+    current_endpoint.set("POST /label/create")
+
+    endpoint, thread_name = await run_blocking_io(_endpoint_and_thread)
+
+    assert endpoint == "POST /label/create"
+    assert thread_name.startswith("blocking-io")
+    assert count_before is not None
+    assert (
+        REGISTRY.get_sample_value("label_io_pool_wait_seconds_count")
+        == count_before + 1
+    )
+    assert REGISTRY.get_sample_value("label_io_pool_queued") == 0
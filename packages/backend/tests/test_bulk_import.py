@@ -0,0 +1,83 @@
+"""Test cases for the bulk import of labels."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from httpx import AsyncClient
+
+from app import service_layer
+from app.main import app
+from app.services.importer import bulk_import
+from app.services.importer.bulk_import import unflatten_csv_row
+from app.services.storage.label_store import LabelStore
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_UNSUPPORTED_MEDIA_TYPE = 415
+
+
+def test_unflatten_csv_row() -> None:
+    """Test that dotted CSV columns are nested and empty lens sides dropped."""
+    header = [
+        "patient_info.name",
+        "lens_specs.left.bc",
+        "lens_specs.left.bc_toric",
+        "lens_specs.right.bc",
+    ]
+
+    payload = unflatten_csv_row(header, ["John", "8.60", "", ""])
+
+    assert payload == {
+        "patient_info": {"name": "John"},
+        "lens_specs": {"left": {"bc": "8.60"}},
+    }
+
+
+@pytest.mark.anyio()
+async def test_import_labels_ndjson(
+    label_payload: dict[str, Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the import endpoint with a valid and an invalid NDJSON row."""
+    invalid_payload = {**label_payload, "lens_specs": {}}
+    body = f"{json.dumps(label_payload)}\n{json.dumps(invalid_payload)}\n"
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+    monkeypatch.setattr(service_layer, "get_label_store", lambda: label_store)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        monkeypatch.setattr(bulk_import, "get_import_executor", lambda: executor)
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post(
+                "/label/import",
+                content=body,
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+
+    assert response.status_code == HTTP_STATUS_OK
+    results = [json.loads(line) for line in response.text.splitlines()]
+    results_by_row = {result.get("row"): result for result in results}
+    assert results_by_row[1]["status"] == "ok"
+    assert results_by_row[1]["pdf_filename"].endswith(".pdf")
+    assert label_store.pdf_path(results_by_row[1]["pdf_filename"]).exists()
+    assert results_by_row[2]["status"] == "error"
+    assert results[-1] == {"status": "done", "total": 2, "ok": 1, "failed": 1}
+
+
+@pytest.mark.anyio()
+async def test_import_labels_unsupported_content_type() -> None:
+    """Test the import endpoint with an unsupported content type."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post(
+            "/label/import",
+            content="{}",
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert response.status_code == HTTP_STATUS_UNSUPPORTED_MEDIA_TYPE
@@ -0,0 +1,31 @@
+"""Test cases for the command line interface."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from app.cli import main
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def test_render_command(
+    label_payload: dict[str, Any],
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that the render command renders the valid rows and reports the rest."""
+    input_path = tmp_path / "labels.ndjson"
+    input_path.write_text(f"{json.dumps(label_payload)}\nnot json\n")
+    output_dir = tmp_path / "out"
+
+    exit_code = main(["render", str(input_path), "--out", str(output_dir)])
+
+    assert exit_code == 1
+    assert [path.name for path in output_dir.iterdir()] == ["label-000001.pdf"]
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["total"], summary["ok"], summary["failed"]) == (2, 1, 1)
@@ -0,0 +1,12 @@
+"""Test cases for the import-time budget of the application."""
+
+from __future__ import annotations
+
+from app.benchmarks.cold_start import measure_import
+
+
+def test_app_import_does_not_load_renderer() -> None:
+    """Test that fpdf, fontTools and Pillow are only imported on first render."""
+    _, renderer_imported = measure_import()
+
+    assert renderer_imported is False
@@ -0,0 +1,45 @@
+"""Test cases for the pool of pre-initialised PDF documents."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fpdf import FPDF
+
+from app.models import LabelData
+from app.services.create.create_pdf import render_label_pdf
+from app.services.create.document_pool import DocumentPool
+
+
+def test_document_pool_hands_out_clones() -> None:
+    """Test that each document is a distinct clone of the prototype."""
+    built: list[FPDF] = []
+
+    def factory() -> FPDF:
+        document = FPDF()
+        document.add_page()
+        built.append(document)
+        return document
+
+    pool = DocumentPool(factory, max_size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.replenish()
+
+    assert len(built) == 1
+    assert first is not second
+    assert built[0] not in (first, second)
+    assert first.page == second.page == 1
+    assert len(pool) == pool.max_size
+
+
+def test_pooled_documents_do_not_share_font_subsets(
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that a render subsets the fonts of its own document only."""
+    render_label_pdf(LabelData.model_validate(label_payload))
+
+    label_payload["patient_info"]["surname"] = "Quixote 3"
+    pdf = render_label_pdf(LabelData.model_validate(label_payload))
+
+    assert pdf.startswith(b"%PDF-")
@@ -0,0 +1,81 @@
+"""Test cases for the output engines of the label layouts."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.models import LabelData
+from app.services.create.create_pdf import get_layout_cache, render_label_layout
+from app.services.create.layout import LineSegment, TextRun
+
+HTTP_STATUS_OK = 200
+
+
+def test_layout_places_the_label_on_the_page(label_payload: dict[str, Any]) -> None:
+    """Test that the label data is laid out, every element within the page."""
+    layout = render_label_layout(LabelData.model_validate(label_payload))
+
+    texts = {
+        element.text for element in layout.elements if isinstance(element, TextRun)
+    }
+    assert {"John", "Doe", "22/08/2025", "01/08/2026", "25-0001"} <= texts
+    for element in layout.elements:
+        assert 0 <= element.x <= element.x + element.w <= layout.width
+        assert 0 <= element.y <= element.y + element.h <= layout.height
+
+
+def test_layout_records_the_table_borders(label_payload: dict[str, Any]) -> None:
+    """Test that the borders of the lens specification tables are laid out."""
+    lens_specs = label_payload["lens_specs"]
+    label_payload["lens_specs"] = {
+        "left": lens_specs["left"],
+        "right": lens_specs["left"],
+    }
+
+    layout = render_label_layout(LabelData.model_validate(label_payload))
+
+    assert any(isinstance(element, LineSegment) for element in layout.elements)
+
+
+def test_label_layout_is_cached(label_payload: dict[str, Any]) -> None:
+    """Test that a label is laid out once, whatever the output format."""
+    label_data = LabelData.model_validate(label_payload)
+    get_layout_cache().clear()
+
+    layout = render_label_layout(label_data)
+
+    assert render_label_layout(label_data) is layout
+    assert len(get_layout_cache()) == 1
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize(
+    ("output_format", "media_type", "signature"),
+    [
+        ("pdf", "application/pdf", b"%PDF-"),
+        ("png", "image/png", b"\x89PNG"),
+        ("svg", "image/svg+xml", b"<svg "),
+        ("json", "application/json", b'{"unit": "mm"'),
+    ],
+)
+async def test_render_label(
+    label_payload: dict[str, Any],
+    output_format: str,
+    media_type: str,
+    signature: bytes,
+) -> None:
+    """Test that the label is rendered in every output format."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post(
+            "/label/render",
+            params={"format": output_format},
+            json=label_payload,
+        )
+
+    assert response.status_code == HTTP_STATUS_OK
+    assert response.headers["content-type"].startswith(media_type)
+    assert response.content.startswith(signature)
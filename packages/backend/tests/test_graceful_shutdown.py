@@ -0,0 +1,30 @@
+"""Test cases for refusing new work on shutdown."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.lifecycle.graceful_shutdown import get_render_tracker
+
+HTTP_STATUS_SERVICE_UNAVAILABLE = 503
+
+
+@pytest.mark.anyio()
+async def test_create_label_refused_while_shutting_down(
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that new labels are refused once the shutdown has started."""
+    get_render_tracker().stop_accepting()
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post("/label/create", json=label_payload)
+    finally:
+        get_render_tracker().resume()
+
+    assert response.status_code == HTTP_STATUS_SERVICE_UNAVAILABLE
+    assert response.headers["X-Error-Code"] == "SHUTTING_DOWN_ERROR"
+    assert "Retry-After" in response.headers
@@ -0,0 +1,47 @@
+"""Test cases for the label store."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from app.models import LabelData
+from app.services.storage.label_store import LabelStore
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_label_stored_as_data_is_rendered_on_demand(
+    tmp_path: Path,
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that a label stored as data is re-rendered when loaded."""
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+    label_data = LabelData.model_validate(label_payload)
+
+    record_path = label_store.save_record("20250101-000000_1234.pdf", label_data)
+
+    assert record_path.suffix == ".json"
+    assert not label_store.pdf_path("20250101-000000_1234").exists()
+    pdf_bytes = label_store.load_pdf("20250101-000000_1234.pdf")
+    assert pdf_bytes.startswith(b"%PDF")
+    assert label_store.load_pdf("20250101-000000_1234") is pdf_bytes
+
+
+def test_label_store_missing_label(tmp_path: Path) -> None:
+    """Test that loading an unknown label raises FileNotFoundError."""
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+
+    with pytest.raises(FileNotFoundError):
+        label_store.load_pdf("20250101-000000_1234.pdf")
+
+
+def test_label_store_rejects_paths(tmp_path: Path) -> None:
+    """Test that label ids cannot escape the output directory."""
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+
+    with pytest.raises(ValueError, match="Invalid label id"):
+        label_store.load_pdf("../secret.pdf")
+    assert not label_store.has_record("../secret.pdf")
@@ -0,0 +1,58 @@
+"""Test cases for the validation of labels without rendering."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.validate.label_validation import validate_label_payload
+
+HTTP_STATUS_OK = 200
+
+
+def test_validate_label_payload_valid(label_payload: dict[str, Any]) -> None:
+    """Test that a valid label has no errors."""
+    assert validate_label_payload(label_payload) == {"valid": True, "errors": []}
+
+
+def test_validate_label_payload_shrinks_long_text(
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that texts wider than their cell at the nominal size are shrunk to fit."""
+    label_payload["description"] = "W" * 24
+    label_payload["patient_info"]["surname"] = "Wolfeschlegelsteinhausen"
+
+    assert validate_label_payload(label_payload) == {"valid": True, "errors": []}
+
+
+def test_validate_label_payload_text_overflow(label_payload: dict[str, Any]) -> None:
+    """Test that texts not fitting their cell at the minimum size are reported."""
+    label_payload["patient_info"]["surname"] = "W" * 30
+
+    result = validate_label_payload(label_payload)
+
+    assert result["valid"] is False
+    assert [error["loc"] for error in result["errors"]] == ["patient_info.surname"]
+    assert {error["type"] for error in result["errors"]} == {"text_overflow"}
+
+
+@pytest.mark.anyio()
+async def test_validate_label_batch(label_payload: dict[str, Any]) -> None:
+    """Test the validate endpoint with a batch of labels."""
+    missing_lens_specs = {**label_payload, "lens_specs": {}}
+    invalid_date = {**label_payload, "due_date": "2026-08-01"}
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post(
+            "/label/validate",
+            json=[label_payload, missing_lens_specs, invalid_date],
+        )
+
+    assert response.status_code == HTTP_STATUS_OK
+    valid, missing, invalid = response.json()
+    assert valid["valid"] is True
+    assert missing["errors"][0]["type"] == "missing_lens_specs"
+    assert invalid["errors"][0]["loc"] == "due_date"
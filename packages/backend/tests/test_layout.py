@@ -0,0 +1,30 @@
+"""Test cases for the layout-only mode of the label templates."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+
+HTTP_STATUS_OK = 200
+
+
+@pytest.mark.anyio()
+async def test_create_label_layout(label_payload: dict[str, Any]) -> None:
+    """Test that the layout has the boxes of the label, within the page."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/label/layout", json=label_payload)
+
+    assert response.status_code == HTTP_STATUS_OK
+    layout = response.json()
+    assert (layout["unit"], layout["width"], layout["height"]) == ("mm", 50, 30)
+
+    texts = {box["text"] for box in layout["boxes"] if box["type"] == "text"}
+    assert {"OCCHIALERIA", "Scleral lens F2mid", "Doe"} <= texts
+    assert "logo.png" in {box.get("src") for box in layout["boxes"]}
+    for box in layout["boxes"]:
+        assert 0 <= box["x"] <= box["x"] + box["w"] <= layout["width"]
+        assert 0 <= box["y"] <= box["y"] + box["h"] <= layout["height"]
@@ -0,0 +1,54 @@
+"""Test cases for the synthetic prescriptions and the load test summary."""
+
+from __future__ import annotations
+
+import random
+
+from app.benchmarks.load_test import (
+    MAX_NAME_LENGTH,
+    RequestResult,
+    generate_label,
+    summarize,
+)
+from app.models import LabelData
+from app.service_layer import validate_label_data
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_TOO_MANY_REQUESTS = 429
+
+
+def test_generated_labels_are_valid() -> None:
+    """Test that the labels are valid and cover the templates and edge cases."""
+    rng = random.Random(0)  # noqa: S311
+
+    labels = [LabelData.model_validate(generate_label(rng)) for _ in range(500)]
+
+    for label in labels:
+        validate_label_data(label)
+    sides = {
+        (label.lens_specs.left is None, label.lens_specs.right is None)
+        for label in labels
+    }
+    assert sides == {(False, True), (True, False), (False, False)}
+    assert any(len(label.patient_info.name) == MAX_NAME_LENGTH for label in labels)
+    assert any(
+        lens is not None and lens.bc_toric is not None
+        for label in labels
+        for lens in (label.lens_specs.left, label.lens_specs.right)
+    )
+
+
+def test_summary_reports_throughput_latency_and_errors() -> None:
+    """Test that the percentiles only cover the successful requests."""
+    results = [RequestResult("create", HTTP_STATUS_OK, n / 100) for n in range(1, 101)]
+    results.append(RequestResult("create-print", HTTP_STATUS_TOO_MANY_REQUESTS, 0.001))
+    results.append(RequestResult("create-print", None, 60))
+
+    summary = summarize(results, elapsed=10)
+
+    assert summary["create"]["throughput_rps"] == 10  # noqa: PLR2004
+    assert round(summary["create"]["p50_ms"]) == 505  # noqa: PLR2004
+    assert round(summary["create"]["p99_ms"]) == 990  # noqa: PLR2004
+    assert summary["create-print"]["error_rate"] == 1
+    assert summary["create-print"]["statuses"] == {"429": 1, "failed": 1}
+    assert summary["all"]["requests"] == 102  # noqa: PLR2004
@@ -0,0 +1,39 @@
+"""Test cases for the event loop lag monitor."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from loguru import logger
+
+from app.services.profiling.loop_monitor import LoopMonitor
+
+
+def _block_the_loop(seconds: float) -> None:
+    """Block the event loop, as a render called inline would."""
+    time.sleep(seconds)
+
+
+@pytest.mark.anyio()
+async def test_blocked_loop_is_measured_and_its_stack_logged() -> None:
+    """Test that blocking the loop shows in the lag and logs the blocking code."""
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.1, saturation_lag=0.2)
+    messages: list[str] = []
+    handler_id = logger.add(messages.append, level="WARNING")
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        assert monitor.lag is not None
+        assert not monitor.saturated
+
+        _block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+        logger.remove(handler_id)
+
+    assert monitor.lag >= 0.25  # noqa: PLR2004
+    assert monitor.saturated
+    assert any("_block_the_loop" in message for message in messages)
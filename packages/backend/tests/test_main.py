@@ -7,6 +7,7 @@ from app.main import app
 
 HTTP_STATUS_OK = 200
 HTTP_STATUS_ERROR = 422
+HTTP_STATUS_NOT_FOUND = 404
 
 
 @pytest.mark.anyio()
@@ -72,3 +73,11 @@ async def test_create_label_validation_error() -> None:
             },
         )
     assert response.status_code == HTTP_STATUS_ERROR
+
+
+@pytest.mark.anyio()
+async def test_get_label_pdf_not_found() -> None:
+    """Test the label download endpoint with an unknown label."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/label/19700101-000000_1000/pdf")
+    assert response.status_code == HTTP_STATUS_NOT_FOUND
@@ -0,0 +1,65 @@
+"""Test cases for the label PNG previews."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from httpx import AsyncClient
+
+from app import service_layer
+from app.main import app
+from app.models import LabelData
+from app.services.preview import preview_png
+from app.services.storage.label_store import LabelStore
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_SERVICE_UNAVAILABLE = 503
+
+
+def test_preview_label_data_is_cached(
+    monkeypatch: pytest.MonkeyPatch,
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that repeated previews of the same label are served from the cache."""
+    rasterized: list[int] = []
+
+    def fake_render_label(*_args: Any, dpi: int, **_kwargs: Any) -> bytes:  # noqa: ANN401
+        rasterized.append(dpi)
+        return b"\x89PNG"
+
+    monkeypatch.setattr(preview_png, "render_label", fake_render_label)
+    preview_png.get_preview_cache().clear()
+    label_data = LabelData.model_validate(label_payload)
+
+    first = preview_png.preview_label_data(label_data, dpi=100)
+    second = preview_png.preview_label_data(label_data, dpi=100)
+    preview_png.preview_label_data(label_data, dpi=200)
+
+    assert first == second == b"\x89PNG"
+    assert rasterized == [100, 200]
+
+
+@pytest.mark.anyio()
+async def test_stored_label_preview_is_drawn_from_its_data(
+    label_payload: dict[str, Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a stored label is previewed in-process, from its data record."""
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+    label_store.save_record("stored", LabelData.model_validate(label_payload))
+    label_store.save_pdf("legacy", b"%PDF-")
+    monkeypatch.setattr(service_layer, "get_label_store", lambda: label_store)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        stored = await ac.get("/label/stored/preview.png", params={"dpi": 100})
+        legacy = await ac.get("/label/legacy/preview.png")
+
+    assert stored.status_code == HTTP_STATUS_OK
+    assert stored.content.startswith(b"\x89PNG")
+    assert legacy.status_code == HTTP_STATUS_SERVICE_UNAVAILABLE
+    assert legacy.headers["X-Error-Code"] == "PREVIEW_UNAVAILABLE_ERROR"
@@ -0,0 +1,74 @@
+"""Test cases for piping labels rendered in memory to the print spooler."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.lifecycle.graceful_shutdown import get_render_tracker
+from app.services.print import print_pdf
+from app.services.storage.label_store import get_label_store
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_BAD_GATEWAY = 502
+
+
+@pytest.fixture()
+def spooled_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Replace the spooler with a command writing its input to a file."""
+    spooled_path = tmp_path / "spooled.pdf"
+    monkeypatch.setattr(
+        print_pdf,
+        "LPR_COMMAND",
+        [
+            sys.executable,
+            "-c",
+            "import sys; open(sys.argv[1], 'wb').write(sys.stdin.buffer.read())",
+            str(spooled_path),
+        ],
+    )
+    return spooled_path
+
+
+@pytest.mark.anyio()
+@pytest.mark.parametrize("persist", [False, True])
+async def test_create_print_label_pipes_pdf(
+    label_payload: dict[str, Any],
+    spooled_path: Path,
+    persist: bool,
+) -> None:
+    """Test that the label is piped to the spooler, and persisted if enabled."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post(
+            "/label/create-print",
+            json=label_payload,
+            params={"persist": persist},
+        )
+    await asyncio.to_thread(get_render_tracker().wait_idle, 5)
+
+    assert response.status_code == HTTP_STATUS_OK
+    assert spooled_path.read_bytes().startswith(b"%PDF-")
+    pdf_path = get_label_store().pdf_path(response.json()["pdf_filename"])
+    assert pdf_path.exists() == persist
+
+
+def test_print_label_pdf_bytes_raises_on_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a failing spooler raises a PrintError."""
+    monkeypatch.setattr(
+        print_pdf,
+        "LPR_COMMAND",
+        [sys.executable, "-c", "import sys; sys.exit('printer offline')"],
+    )
+
+    with pytest.raises(print_pdf.PrintError, match="printer offline"):
+        print_pdf.print_label_pdf_bytes(b"%PDF-", file_name="label.pdf")
@@ -0,0 +1,205 @@
+"""Test cases for the durable print queue."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from app import service_layer
+from app.models import LabelData
+from app.services.print.print_journal import PrintJob, PrintJournal
+from app.services.print.print_queue import PrintQueue
+from app.services.storage.label_store import LabelStore
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+
+class CountingPrintJournal(PrintJournal):
+    """Print journal counting its commits."""
+
+    commits = 0
+
+    def record(self, jobs: Iterable[PrintJob]) -> None:
+        """Record a batch of jobs and count the commit."""
+        self.commits += 1
+        super().record(jobs)
+
+
+@pytest.mark.anyio()
+async def test_print_queue_replays_unfinished_jobs(tmp_path: Path) -> None:
+    """Test that jobs not printed by the deadline are replayed by the next queue."""
+    journal_path = tmp_path / "print_queue.sqlite3"
+    printer_released = threading.Event()
+    printed: list[str] = []
+
+    def blocked_printer(pdf_filename: str, _pdf_bytes: bytes | None) -> str:
+        printer_released.wait()
+        return pdf_filename
+
+    print_queue = PrintQueue(
+        printer=blocked_printer,
+        journal=PrintJournal(journal_path),
+    )
+    print_queue.enqueue("first.pdf")
+    print_queue.enqueue("second.pdf")
+
+    pending = await print_queue.drain(timeout=0.05)
+    printer_released.set()
+
+    assert [job.pdf_filename for job in pending] == ["first.pdf", "second.pdf"]
+
+    def printer(pdf_filename: str, _pdf_bytes: bytes | None) -> str:
+        printed.append(pdf_filename)
+        return pdf_filename
+
+    journal = PrintJournal(journal_path)
+    next_print_queue = PrintQueue(printer=printer, journal=journal)
+    assert next_print_queue.start() == len(pending)
+    assert await next_print_queue.drain(timeout=1) == []
+    assert printed == ["first.pdf", "second.pdf"]
+    assert journal.unfinished() == []
+
+
+@pytest.mark.anyio()
+async def test_print_queue_group_commits_transitions(tmp_path: Path) -> None:
+    """Test that the transitions of jobs queued together share commits."""
+    journal = CountingPrintJournal(tmp_path / "print_queue.sqlite3")
+    print_queue = PrintQueue(
+        printer=lambda pdf_filename, _pdf_bytes: pdf_filename,
+        journal=journal,
+    )
+    jobs_amount = 20
+
+    results = [print_queue.enqueue(f"{index}.pdf") for index in range(jobs_amount)]
+    for result in results:
+        await result
+    await print_queue.drain(timeout=1)
+
+    # Each job goes through queued, printing and done.
+    assert journal.commits < jobs_amount * 3
+    assert journal.unfinished() == []
+
+
+@pytest.mark.anyio()
+async def test_print_queue_prints_in_memory_labels(tmp_path: Path) -> None:
+    """Test that a label rendered in memory is printed without journaling it."""
+    journal = CountingPrintJournal(tmp_path / "print_queue.sqlite3")
+    printed: list[bytes | None] = []
+
+    def printer(pdf_filename: str, pdf_bytes: bytes | None) -> str:
+        printed.append(pdf_bytes)
+        return pdf_filename
+
+    print_queue = PrintQueue(printer=printer, journal=journal)
+
+    await print_queue.enqueue("label.pdf", pdf_bytes=b"%PDF-", journaled=False)
+    await print_queue.drain(timeout=1)
+
+    assert printed == [b"%PDF-"]
+    assert journal.commits == 0
+
+
+@pytest.mark.anyio()
+async def test_printed_label_is_journaled_once_persisted(
+    label_payload: dict[str, Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a printed label is journaled once persisted, and replayed."""
+    journal_path = tmp_path / "print_queue.sqlite3"
+    label_store = LabelStore(output_dir=tmp_path, cache_size=1)
+    persist_started = threading.Event()
+    persist_released = threading.Event()
+    printer_started = threading.Event()
+    printer_released = threading.Event()
+    persist_label = service_layer._persist_label  # noqa: SLF001
+
+    def blocked_persist(*args: Any) -> str:  # noqa: ANN401
+        persist_started.set()
+        persist_released.wait()
+        return persist_label(*args)
+
+    def blocked_printer(pdf_filename: str, _pdf_bytes: bytes | None) -> str:
+        printer_started.set()
+        printer_released.wait()
+        return pdf_filename
+
+    print_queue = PrintQueue(
+        printer=blocked_printer,
+        journal=PrintJournal(journal_path),
+    )
+    monkeypatch.setattr(service_layer, "_persist_label", blocked_persist)
+    monkeypatch.setattr(service_layer, "get_label_store", lambda: label_store)
+    monkeypatch.setattr(service_layer, "get_print_queue", lambda: print_queue)
+
+    printing = asyncio.ensure_future(
+        service_layer.create_print_label(
+            LabelData.model_validate(label_payload),
+            persist=True,
+        ),
+    )
+    try:
+        # The label is printed from memory while it is written, and a crash
+        # meanwhile leaves no job to replay.
+        assert await asyncio.to_thread(persist_started.wait, 5)
+        assert await asyncio.to_thread(printer_started.wait, 5)
+        await asyncio.sleep(print_queue.group_commit_interval * 10)
+        assert PrintJournal(journal_path).unfinished() == []
+
+        # A crash once the label is written replays it from storage.
+        persist_released.set()
+        for _ in range(100):
+            if PrintJournal(journal_path).unfinished():
+                break
+            await asyncio.sleep(print_queue.group_commit_interval)
+        pending = await print_queue.drain(timeout=0)
+    finally:
+        persist_released.set()
+        printer_released.set()
+        printing.cancel()
+
+    assert len(pending) == 1
+    replayed: list[bool] = []
+
+    def printer(pdf_filename: str, _pdf_bytes: bytes | None) -> str:
+        replayed.append(label_store.pdf_path(pdf_filename).exists())
+        return pdf_filename
+
+    next_print_queue = PrintQueue(printer=printer, journal=PrintJournal(journal_path))
+    assert next_print_queue.start() == 1
+    assert await next_print_queue.drain(timeout=1) == []
+    assert replayed == [True]
+
+
+@pytest.mark.anyio()
+async def test_print_queue_retries_failed_jobs(tmp_path: Path) -> None:
+    """Test that a failed job is retried, and failed once out of attempts."""
+    journal = PrintJournal(tmp_path / "print_queue.sqlite3")
+    failures = {"flaky.pdf": 1, "broken.pdf": 3}
+
+    def printer(pdf_filename: str, _pdf_bytes: bytes | None) -> str:
+        if failures[pdf_filename]:
+            failures[pdf_filename] -= 1
+            error_message = "lpr: scheduler not responding"
+            raise RuntimeError(error_message)
+        return pdf_filename
+
+    print_queue = PrintQueue(
+        printer=printer,
+        journal=journal,
+        max_attempts=2,
+        retry_backoff=0.01,
+    )
+
+    assert await print_queue.enqueue("flaky.pdf") == "flaky.pdf"
+    with pytest.raises(RuntimeError, match="scheduler not responding"):
+        await print_queue.enqueue("broken.pdf")
+    await print_queue.drain(timeout=1)
+
+    assert failures == {"flaky.pdf": 0, "broken.pdf": 1}
+    assert journal.unfinished() == []
@@ -0,0 +1,96 @@
+"""Test cases for the cached printer status and the print pre-flight check."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.print.printer_status import (
+    PrinterState,
+    PrinterStatus,
+    get_printer_poller,
+    parse_lpstat,
+)
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_SERVICE_UNAVAILABLE = 503
+
+PRINTER_OUTPUT = """\
+printer SN_420B disabled since Mon 19 Oct 2026 09:12:03 CEST -
+\tMedia empty
+\tForm mounted:
+\tContent types: any
+\tDescription: SN_420B
+\tAlerts: media-empty-error paused
+\tConnection: direct
+"""
+QUEUE_OUTPUT = """\
+SN_420B accepting requests since Mon 19 Oct 2026 09:12:03 CEST
+SN_420B-41              pi             2048   Mon 19 Oct 2026 09:14:10 CEST
+SN_420B-42              pi             2048   Mon 19 Oct 2026 09:14:12 CEST
+"""
+
+
+def test_parse_lpstat() -> None:
+    """Test that the state, reasons, message and queue are read from lpstat."""
+    status = parse_lpstat("SN_420B", PRINTER_OUTPUT, QUEUE_OUTPUT)
+
+    assert status.state == PrinterState.disabled
+    assert status.reasons == ("media-empty-error", "paused")
+    assert status.message == "Media empty"
+    assert status.accepting is True
+    assert status.queued_jobs == 2  # noqa: PLR2004
+    assert status.problem == "The printer SN_420B is disabled: Media empty"
+
+    idle = parse_lpstat(
+        "SN_420B",
+        "printer SN_420B is idle.  enabled since Mon 19 Oct 2026\n\tAlerts: none\n",
+        "SN_420B accepting requests since Mon 19 Oct 2026\n",
+    )
+    assert idle.state == PrinterState.idle
+    assert idle.problem is None
+
+
+@pytest.mark.anyio()
+async def test_print_request_fails_fast_while_printer_unavailable(
+    label_payload: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a cached problem refuses the print with 503, shown in /printers."""
+    poller = get_printer_poller()
+    monkeypatch.setattr(poller, "interval", 10.0)
+    monkeypatch.setattr(poller, "policy", "fail")
+    monkeypatch.setattr(
+        poller,
+        "status",
+        parse_lpstat("SN_420B", PRINTER_OUTPUT, QUEUE_OUTPUT),
+    )
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post("/label/create-print", json=label_payload)
+        printers = await ac.get("/printers")
+
+    assert response.status_code == HTTP_STATUS_SERVICE_UNAVAILABLE
+    assert response.headers["X-Error-Code"] == "PRINTER_UNAVAILABLE_ERROR"
+    assert response.headers["Retry-After"] == "10"
+
+    assert printers.status_code == HTTP_STATUS_OK
+    assert printers.json()[0]["state"] == "disabled"
+    assert printers.json()[0]["ready"] is False
+
+
+def test_stale_status_is_unknown(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an outdated status refuses nothing."""
+    poller = get_printer_poller()
+    monkeypatch.setattr(poller, "interval", 10.0)
+    monkeypatch.setattr(
+        poller,
+        "status",
+        PrinterStatus("SN_420B", PrinterState.disabled, checked_at=0.0),
+    )
+
+    assert poller.current().state == PrinterState.unknown
+    poller.ensure_ready()
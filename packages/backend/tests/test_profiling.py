@@ -0,0 +1,117 @@
+"""Test cases for the sampling profiler."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.profiling.sampler import StackSampler
+from app.services.profiling.stages import current_endpoint, render_stage
+from app.settings import get_settings
+
+HTTP_STATUS_CONFLICT = 409
+HTTP_STATUS_NOT_FOUND = 404
+
+
+def _busy_render(started: threading.Event, done: threading.Event) -> None:
+    """Work inside a render stage of an endpoint until done."""
+    current_endpoint.set("POST /label/create")
+    with render_stage("render"):
+        started.set()
+        while not done.is_set():
+            sum(range(100))
+
+
+def test_sampler_collapses_the_stacks_of_the_render_stages() -> None:
+    """Test that the stacks are rooted at their endpoint and render stage."""
+    sampler = StackSampler(interval=0.01, max_overhead=0.5, retention_seconds=60)
+    started, done = threading.Event(), threading.Event()
+    worker = threading.Thread(target=_busy_render, args=(started, done))
+    worker.start()
+    started.wait()
+    try:
+        sampler.sample()
+        sampler.sample()
+    finally:
+        done.set()
+        worker.join()
+
+    stacks = sampler.collapsed_stacks(60, endpoint="POST /label/create")
+
+    stack, count = stacks.splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("POST /label/create;render;")
+    assert any(frame.endswith(":_busy_render") for frame in stack.split(";"))
+    assert int(count) >= 1
+    assert sampler.collapsed_stacks(60, endpoint="GET /health") == ""
+
+
+@pytest.mark.anyio()
+async def test_profile_stacks_need_the_profiler() -> None:
+    """Test that the stacks cannot be downloaded with the profiler disabled."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/admin/profile/stacks")
+
+    assert response.status_code == HTTP_STATUS_CONFLICT
+    assert response.headers["X-Error-Code"] == "PROFILER_DISABLED_ERROR"
+
+
+@pytest.mark.anyio()
+async def test_responses_carry_the_timings_of_their_stages(
+    label_payload: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a profiled request is timed by stage and its profile kept."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        ignored = await ac.post(
+            "/label/validate",
+            params={"profile": "1"},
+            headers={"X-Request-ID": "validate-0"},
+            json=label_payload,
+        )
+        monkeypatch.setattr(get_settings(), "request_profiling_enabled", True)
+        response = await ac.post(
+            "/label/validate",
+            params={"profile": "1"},
+            headers={"X-Request-ID": "validate-1"},
+            json=label_payload,
+        )
+        not_profiled = await ac.get("/admin/profile/requests/validate-0")
+        profile = await ac.get("/admin/profile/requests/validate-1")
+        missing = await ac.get("/admin/profile/requests/unknown")
+
+    assert ignored.headers["X-Request-ID"] == "validate-0"
+    assert not_profiled.status_code == HTTP_STATUS_NOT_FOUND
+    assert response.headers["X-Request-ID"] == "validate-1"
+    timings = response.headers["Server-Timing"].split(", ")
+    assert timings[0].startswith("validate;dur=")
+    assert timings[-1].startswith("total;dur=")
+    assert profile.json()["endpoint"] == "POST /label/validate"
+    assert "validate" in profile.json()["stages"]
+    assert profile.json()["functions"]
+    assert missing.status_code == HTTP_STATUS_NOT_FOUND
+    assert missing.headers["X-Error-Code"] == "PROFILE_NOT_FOUND_ERROR"
+
+
+@pytest.mark.anyio()
+async def test_memory_snapshots_are_compared_by_module() -> None:
+    """Test that the growth between two snapshots is reported by module."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        first = await ac.post("/admin/memory/snapshots")
+        retained = [bytearray(1024) for _ in range(1000)]
+        second = await ac.post("/admin/memory/snapshots")
+        diff = await ac.get(
+            f"/admin/memory/snapshots/{second.json()['snapshot_id']}/diff",
+        )
+        missing = await ac.get(
+            f"/admin/memory/snapshots/{first.json()['snapshot_id']}/diff",
+        )
+        await ac.delete("/admin/memory/snapshots")
+
+    modules = {row["module"]: row for row in diff.json()}
+    assert modules["tests.test_profiling"]["size_diff_bytes"] >= len(retained) * 1024
+    assert missing.status_code == HTTP_STATUS_NOT_FOUND
+    assert missing.headers["X-Error-Code"] == "SNAPSHOT_NOT_FOUND_ERROR"
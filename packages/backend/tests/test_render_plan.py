@@ -0,0 +1,60 @@
+"""Test cases for the compiled render plans of the label templates."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
+
+from app.models import LabelData
+from app.services.create import text_metrics
+from app.services.create.classes import RENDER_PLANS, TEMPLATE_MAP
+from app.services.create.layout import TextRun
+from app.services.create.models import LensSpecType
+from app.services.create.render_plan import compile_template
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_template_version_is_the_hash_of_the_definition() -> None:
+    """Test that the version changes with the definition, and only with it."""
+    definition = TEMPLATE_MAP[LensSpecType.double]
+    plan = RENDER_PLANS[LensSpecType.double]
+    moved = replace(definition, fields=definition.fields[1:])
+
+    versions = {render_plan.version for render_plan in RENDER_PLANS.values()}
+
+    assert len(versions) == len(RENDER_PLANS)
+    assert compile_template(definition).version == plan.version
+    assert compile_template(moved).version not in versions
+
+
+def test_template_version_changes_with_the_font_metrics(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the version changes with the fonts and the fitting limits."""
+    definition = TEMPLATE_MAP[LensSpecType.double]
+    plan = RENDER_PLANS[LensSpecType.double]
+    monkeypatch.setattr(text_metrics, "MIN_FONT_SIZE_PT", 3.0)
+    text_metrics.get_metrics_digest.cache_clear()
+    try:
+        assert compile_template(definition).version != plan.version
+    finally:
+        text_metrics.get_metrics_digest.cache_clear()
+
+
+def test_plan_binds_the_label_data(label_payload: dict[str, Any]) -> None:
+    """Test that binding the label data lays out its texts, fitted to the cells."""
+    plan = RENDER_PLANS[LensSpecType.left]
+
+    layout = plan.bind(LabelData.model_validate(label_payload), show_borders=False)
+
+    texts = {
+        element.text: element
+        for element in layout.elements
+        if isinstance(element, TextRun)
+    }
+    assert {"OCCHIALERIA", "OS", "John", "Doe", "Scleral lens F2mid"} <= set(texts)
+    assert texts["John"].size == texts["Doe"].size
+    for run in texts.values():
+        assert run.x + run.w <= plan.width
@@ -0,0 +1,61 @@
+"""Test cases for the coalescing of concurrent identical label creations."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app import service_layer
+from app.models import LabelData
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from pathlib import Path
+
+
+def _coalesced_total() -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "label_render_requests_total",
+            {"outcome": "coalesced"},
+        )
+        or 0
+    )
+
+
+@pytest.mark.anyio()
+async def test_identical_concurrent_creations_render_once(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that followers await the render of an identical label in flight."""
+    rendered: list[LabelData] = []
+
+    async def slow_store_label(
+        label_data: LabelData,
+        show_borders: bool = False,  # noqa: ARG001
+        executor: Executor | None = None,  # noqa: ARG001
+    ) -> tuple[str, str]:
+        await asyncio.sleep(0.05)
+        rendered.append(label_data)
+        return str(tmp_path / f"{len(rendered)}.pdf"), f"{len(rendered)}.pdf"
+
+    monkeypatch.setattr(service_layer, "store_label", slow_store_label)
+    label_data = LabelData.model_validate(label_payload)
+    other_label_data = label_data.model_copy(update={"description": "Other lens"})
+    coalesced_before = _coalesced_total()
+
+    first, second, other = await asyncio.gather(
+        service_layer.create_label(label_data),
+        service_layer.create_label(label_data.model_copy()),
+        service_layer.create_label(other_label_data),
+    )
+
+    assert len(rendered) == 2  # noqa: PLR2004
+    assert first == second
+    assert other != first
+    assert _coalesced_total() == coalesced_before + 1
@@ -0,0 +1,31 @@
+"""Test cases for the measurement and fitting of label texts."""
+
+from __future__ import annotations
+
+from app.services.create.text_metrics import (
+    MIN_FONT_SIZE_PT,
+    fit_font_size,
+    text_width,
+)
+
+
+def test_fit_font_size_keeps_nominal_size_when_text_fits() -> None:
+    """Test that short texts keep the nominal font size."""
+    assert fit_font_size("openSansRegular", "8.60", 10, 7) == 7  # noqa: PLR2004
+
+
+def test_fit_font_size_shrinks_text_to_cell_width() -> None:
+    """Test that long texts get the largest size at which they fit."""
+    text = "Wolfeschlegelsteinhausen"
+    width = 22
+
+    size_pt = fit_font_size("openSansBold", text, width, 8)
+
+    assert MIN_FONT_SIZE_PT <= size_pt < 8  # noqa: PLR2004
+    assert text_width("openSansBold", size_pt, text) <= width
+    assert text_width("openSansBold", size_pt + 0.1, text) > width
+
+
+def test_fit_font_size_stops_at_minimum_size() -> None:
+    """Test that texts never shrink below the minimum legible size."""
+    assert fit_font_size("openSansBold", "W" * 200, 22, 8) == MIN_FONT_SIZE_PT
@@ -0,0 +1,55 @@
+"""Test cases for capturing the label requests and replaying them."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from httpx import AsyncClient
+
+from app.benchmarks.replay import load_capture
+from app.main import app
+from app.services.traffic import capture
+from app.services.traffic.capture import TrafficCapture, anonymize_label
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_patient_names_are_replaced_by_placeholders(
+    label_payload: dict[str, Any],
+) -> None:
+    """Test that the names keep their length, and the rest of the label."""
+    label_payload["patient_info"] = {"name": "Anna Maria", "surname": "Dell'Acqua"}
+
+    anonymized = anonymize_label([label_payload])[0]
+
+    assert anonymized["patient_info"] == {"name": "Xxxx Xxxxx", "surname": "Xxxx'Xxxxx"}
+    assert anonymized["lens_specs"] == label_payload["lens_specs"]
+
+
+@pytest.mark.anyio()
+async def test_label_requests_are_captured_for_replay(
+    label_payload: dict[str, Any],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the label bodies are captured, and the other requests are not."""
+    capture_path = tmp_path / "capture.ndjson"
+    traffic_capture = TrafficCapture(capture_path)
+    monkeypatch.setattr(capture, "get_traffic_capture", lambda: traffic_capture)
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        await ac.post("/label/validate", json=label_payload)
+        await ac.get("/health")
+        await ac.post("/label/validate", params={"debug": "1"}, json=[label_payload])
+
+    records = load_capture(capture_path)
+    assert [record["path"] for record in records] == [
+        "/label/validate",
+        "/label/validate?debug=1",
+    ]
+    assert records[0]["status"] == 200  # noqa: PLR2004
+    assert records[0]["body"]["patient_info"] == {"name": "Xxxx", "surname": "Xxx"}
+    assert json.loads(capture_path.read_text().splitlines()[1])["body"][0]["lens_specs"]
@@ -0,0 +1,30 @@
+"""Test cases for the render pipeline warm-up and the readiness endpoint."""
+
+from __future__ import annotations
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.warmup.warmup import is_ready, reset_readiness, run_warm_up
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_SERVICE_UNAVAILABLE = 503
+
+
+@pytest.mark.anyio()
+async def test_ready_after_warm_up() -> None:
+    """Test that the readiness endpoint waits for the warm-up to complete."""
+    reset_readiness()
+
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/ready")
+        assert response.status_code == HTTP_STATUS_SERVICE_UNAVAILABLE
+        assert response.headers["X-Error-Code"] == "NOT_READY_ERROR"
+
+        run_warm_up()
+
+        assert is_ready()
+        response = await ac.get("/ready")
+        assert response.status_code == HTTP_STATUS_OK
+        assert response.json() == {"status": "ready"}
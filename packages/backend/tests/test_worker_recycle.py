@@ -0,0 +1,25 @@
+"""Test cases for the recycling of the worker."""
+
+from __future__ import annotations
+
+from app.services.lifecycle.worker_recycle import WorkerRecycler
+
+MB = 2**20
+
+
+def test_worker_is_recycled_after_its_renders() -> None:
+    """Test that the worker is recycled once it completed its renders."""
+    recycler = WorkerRecycler(max_renders=100, max_growth_bytes=0)
+
+    assert recycler.check(renders=99, rss_bytes=None) is None
+    assert recycler.check(renders=100, rss_bytes=None) == "100 renders completed"
+
+
+def test_worker_is_recycled_after_its_memory_growth() -> None:
+    """Test that the growth is measured from the first resident set size."""
+    recycler = WorkerRecycler(max_renders=0, max_growth_bytes=64 * MB)
+
+    assert recycler.check(renders=1, rss_bytes=100 * MB) is None
+    assert recycler.check(renders=2, rss_bytes=150 * MB) is None
+    assert recycler.check(renders=3, rss_bytes=170 * MB) == "memory grew by 70 MB"
+    assert not WorkerRecycler(max_renders=0, max_growth_bytes=0).enabled